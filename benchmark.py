@@ -0,0 +1,304 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+create_post.py 的基准测试：生成 10、1000、10000 篇的合成文章库，
+统计解析、渲染、同步和配置更新等操作的耗时，结果追加到历史文件中便于前后对比
+"""
+
+import os
+import io
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+import tempfile
+from contextlib import contextmanager, redirect_stdout
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import create_post
+
+DEFAULT_SIZES = (10, 1000, 10000)
+RESULTS_PATH = 'benchmark-results.jsonl'
+RESULTS_VERSION = 1
+# 每次更新配置都会读写整个 posts-config.json，只抽样更新固定篇数，看单次耗时随文章数的变化
+CONFIG_UPDATE_SAMPLES = 20
+# 每篇文章属于一个主题，正文一半的词取自主题词表，真实文章库中的词汇也是按主题聚集的
+TOPIC_COUNT = 200
+TOPIC_TERMS = 12
+
+CJK_TERMS = (
+    '资源', '加载', '卸载', '纹理', '预制体', '特效', '材质', '渲染', '管线', '性能', '内存', '打包',
+    '场景', '动画', '界面', '脚本', '组件', '引用', '计数', '缓存', '异步', '协程', '热更新', '配置',
+    '规范', '美术', '程序', '流程', '工具', '编辑器', '图集', '合批', '着色器', '粒子', '层级', '节点',
+)
+CJK_CONNECTORS = ('的', '在', '需要', '可以', '通过', '导致', '避免', '使用', '处理', '统一', '减少', '保证')
+EN_TERMS = (
+    'Unity', 'AssetBundle', 'prefab', 'UGUI', 'Shader', 'MonoBehaviour', 'DrawCall', 'Addressables',
+    'Lua', 'Git', 'CI', 'Profiler', 'GC', 'Atlas', 'Canvas', 'Timeline',
+)
+EN_WORDS = (
+    'the', 'asset', 'pipeline', 'loads', 'texture', 'memory', 'reference', 'count', 'when', 'scene',
+    'build', 'runtime', 'cache', 'release', 'bundle', 'should', 'avoid', 'duplicate', 'material', 'render',
+    'batch', 'update', 'tool', 'editor', 'workflow', 'script', 'component', 'layer', 'before', 'after',
+)
+CATEGORIES = ('代码解析', '美术规范', '工作流程', '性能优化', '工具开发', '随笔')
+TAGS = ('美术', '程序', 'Unity', '性能', '工具', '资源管理', 'UI', '特效', 'Shader', '流程')
+CODE_SNIPPETS = {
+    'python': 'def {name}(path):\n    """{comment}"""\n    with open(path, "rb") as f:\n        data = f.read()\n    return len(data) * {number}\n',
+    'javascript': 'function {name}(items) {{\n  // {comment}\n  return items.filter(item => item.size > {number}).map(item => item.id);\n}}\n',
+    'csharp': 'public class {Name} : MonoBehaviour\n{{\n    // {comment}\n    private int count = {number};\n    void Start() {{ Debug.Log("{name}: " + count); }}\n}}\n',
+    'bash': '# {comment}\nfor f in assets/*.png; do\n  echo "{name} $f"\ndone\nexit {number}\n',
+    'json': '{{\n  "name": "{name}",\n  "count": {number},\n  "enabled": true\n}}\n',
+}
+COVER_IMAGE = 'https://images.unsplash.com/photo-1555066931-4365d14bab8c?auto=format&fit=crop&w=1170&q=80'
+
+def random_cjk_word(rng):
+    return ''.join(chr(rng.randint(0x4e00, 0x9fa5)) for _ in range(rng.randint(2, 3)))
+
+def cjk_sentence(rng, topic):
+    """由通用术语、主题词和连接词拼成的中文句子，偶尔夹带英文术语和行内代码"""
+    parts = []
+    for _ in range(rng.randint(3, 8)):
+        parts.append(rng.choice(topic if rng.random() < 0.5 else CJK_TERMS))
+        parts.append(rng.choice(CJK_CONNECTORS))
+    if rng.random() < 0.3:
+        parts.insert(rng.randrange(len(parts)), f" {rng.choice(EN_TERMS)} ")
+    if rng.random() < 0.15:
+        parts.append(f" `{rng.choice(EN_WORDS)}_{rng.choice(EN_WORDS)}` ")
+    return ''.join(parts) + rng.choice('。。，；！')
+
+def english_sentence(rng):
+    words = [rng.choice(EN_WORDS) for _ in range(rng.randint(6, 16))]
+    if rng.random() < 0.3:
+        words.insert(rng.randrange(len(words)), f"**{rng.choice(EN_TERMS)}**")
+    return ' '.join(words).capitalize() + '.'
+
+def paragraph(rng, topic):
+    if rng.random() < 0.75:
+        return ''.join(cjk_sentence(rng, topic) for _ in range(rng.randint(2, 6)))
+    return ' '.join(english_sentence(rng) for _ in range(rng.randint(2, 5)))
+
+def code_block(rng, topic):
+    language = rng.choice(tuple(CODE_SNIPPETS))
+    name = f"{rng.choice(EN_WORDS)}_{rng.choice(EN_WORDS)}"
+    code = CODE_SNIPPETS[language].format(
+        name=name,
+        Name=name.title().replace('_', ''),
+        comment=cjk_sentence(rng, topic),
+        number=rng.randint(1, 4096),
+    )
+    return f"```{language}\n{code}```"
+
+def markdown_block(rng, topic):
+    """随机生成一个 Markdown 块：段落为主，夹杂标题、列表、代码、引用、表格、图片和链接"""
+    kind = rng.random()
+    if kind < 0.45:
+        return paragraph(rng, topic)
+    if kind < 0.55:
+        return f"{'#' * rng.randint(2, 3)} {rng.choice(CJK_TERMS)}{rng.choice(CJK_TERMS)}"
+    if kind < 0.65:
+        marker = rng.choice(('-', '*', '1.'))
+        return '\n'.join(f"{marker} {cjk_sentence(rng, topic)}" for _ in range(rng.randint(3, 6)))
+    if kind < 0.8:
+        return code_block(rng, topic)
+    if kind < 0.85:
+        return f"> {cjk_sentence(rng, topic)}"
+    if kind < 0.9:
+        rows = [f"| {rng.choice(CJK_TERMS)} | {rng.randint(1, 999)} | {rng.choice(EN_WORDS)} |" for _ in range(rng.randint(2, 5))]
+        return '\n'.join(['| 名称 | 数量 | 说明 |', '| --- | ---: | :---: |'] + rows)
+    if kind < 0.95:
+        return f"![{rng.choice(CJK_TERMS)}示意图](https://images.unsplash.com/photo-{rng.randint(10 ** 9, 10 ** 10)}?w=800)"
+    return f"参考 [{rng.choice(EN_TERMS)} 文档](https://example.com/{rng.choice(EN_WORDS)}/{rng.randint(1, 999)}) 了解{rng.choice(CJK_TERMS)}。"
+
+def synthetic_post(rng, post_number, topic):
+    """生成一篇带 front matter 的合成文章；篇幅按对数正态分布，少数文章很长"""
+    block_count = max(5, min(400, int(rng.lognormvariate(3.2, 0.7))))
+    title = f"{rng.choice(topic)}{rng.choice(CJK_TERMS)}{rng.choice(('实践', '笔记', '规范', '分析'))} {post_number}"
+    lines = [
+        '---',
+        f"title: {title}",
+        f"category: [{rng.choice(CATEGORIES)}]",
+        f"date: {date(2020, 1, 1) + timedelta(days=post_number % 2000)}",
+        f"cover_image: {COVER_IMAGE}",
+        f"tags: [{', '.join(rng.sample(TAGS, rng.randint(1, 3)))}]",
+    ]
+    if rng.random() < 0.5:
+        lines.append(f"excerpt: {cjk_sentence(rng, topic)}")
+    lines.append('---')
+    lines.append(f"# {title}")
+    body = '\n\n'.join(markdown_block(rng, topic) for _ in range(block_count))
+    return '\n'.join(lines) + '\n\n' + body + '\n'
+
+def write_corpus(size, seed):
+    """在当前目录写出 size 篇合成文章（post1.md ... postN.md）和博客配置"""
+    rng = random.Random(f"{seed}-{size}")
+    blog_config = dict(create_post.DEFAULT_BLOG_CONFIG, render_mode='static')
+    with open(create_post.BLOG_CONFIG_PATH, 'w', encoding='utf-8') as f:
+        json.dump(blog_config, f, ensure_ascii=False, indent=2)
+    topics = [[random_cjk_word(rng) for _ in range(TOPIC_TERMS)] for _ in range(TOPIC_COUNT)]
+    total_bytes = 0
+    for post_number in range(1, size + 1):
+        text = synthetic_post(rng, post_number, rng.choice(topics))
+        with open(f"post{post_number}.md", 'w', encoding='utf-8') as f:
+            f.write(text)
+        total_bytes += len(text.encode('utf-8'))
+    return total_bytes
+
+@contextmanager
+def quiet():
+    """屏蔽被测函数的逐篇输出"""
+    with redirect_stdout(io.StringIO()):
+        yield
+
+@contextmanager
+def answer_input(answer):
+    """让交互函数中的 input() 直接得到 answer"""
+    create_post.input = lambda prompt='': answer
+    try:
+        yield
+    finally:
+        del create_post.input
+
+def measure(results, name, count, func):
+    """执行 func 并记录耗时；count 是处理的文章（或操作）数，用于计算单篇耗时"""
+    started = time.perf_counter()
+    value = func()
+    elapsed = time.perf_counter() - started
+    results[name] = {
+        "count": count,
+        "total_ms": round(elapsed * 1000, 3),
+        "per_item_us": round(elapsed * 1e6 / max(count, 1), 3),
+    }
+    return value
+
+def run_size(size, seed, jobs):
+    """在临时目录中生成 size 篇文章并依次测量各项操作"""
+    results = {}
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix=f'blog-bench-{size}-') as workdir:
+        os.chdir(workdir)
+        try:
+            corpus_bytes = write_corpus(size, seed)
+            blog_config = create_post.load_blog_config()
+            dynamic_config = dict(blog_config, render_mode='dynamic')
+            md_files = [f"post{n}.md" for n in range(1, size + 1)]
+
+            posts = measure(results, 'parse_markdown_file', size,
+                            lambda: [create_post.parse_markdown_file(md, blog_config) for md in md_files])
+            for post_number, post_data in enumerate(posts, 1):
+                post_data['post_number'] = post_number
+            measure(results, 'calculate_reading_time', size,
+                    lambda: [create_post.calculate_reading_time(post['content'], blog_config) for post in posts])
+
+            static_assets = create_post.write_post_assets(blog_config)
+            dynamic_assets = create_post.write_post_assets(dynamic_config)
+            measure(results, 'create_post_html[static]', size, lambda: [
+                create_post.create_post_html(post, f"post{post['post_number']}.html", blog_config, static_assets)
+                for post in posts
+            ])
+            measure(results, 'create_post_html[dynamic]', size, lambda: [
+                create_post.create_post_html(post, f"post{post['post_number']}.html", dynamic_config, dynamic_assets)
+                for post in posts
+            ])
+
+            with quiet():
+                measure(results, 'build_posts[full]', size, lambda: create_post.build_posts(force=True, jobs=jobs))
+                measure(results, 'build_posts[noop]', size, lambda: create_post.build_posts(jobs=jobs))
+
+            repository = create_post.PostsRepository(warn=False)
+            html_files = [f"post{n}.html" for n in range(1, size + 1)]
+            measure(results, 'parse_existing_post', size,
+                    lambda: [create_post.parse_existing_post(html, repository) for html in html_files])
+
+            with quiet(), answer_input('y'):
+                measure(results, 'sync_all_posts', size, lambda: create_post.sync_all_posts(jobs=jobs))
+
+            samples = posts[:: max(1, size // CONFIG_UPDATE_SAMPLES)][:CONFIG_UPDATE_SAMPLES]
+            with quiet():
+                measure(results, 'update_posts_config', len(samples), lambda: [
+                    create_post.update_posts_config(post, f"post{post['post_number']}.html", is_new_post=False)
+                    for post in samples
+                ])
+        finally:
+            os.chdir(cwd)
+    return {"corpus_bytes": corpus_bytes, "operations": results}
+
+def load_previous_run(results_path):
+    """读取历史文件中的最后一次结果"""
+    if not os.path.exists(results_path):
+        return None
+    previous = None
+    with open(results_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                run = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            if run.get('version') == RESULTS_VERSION:
+                previous = run
+    return previous
+
+def format_change(current, previous):
+    if not previous:
+        return ''
+    change = (current - previous) / previous * 100
+    return f"{change:+.1f}%"
+
+def print_results(run, previous):
+    """按文章数打印各操作的总耗时、单篇耗时和与上次结果的差异"""
+    for size, size_result in run['sizes'].items():
+        previous_ops = ((previous or {}).get('sizes', {}).get(size) or {}).get('operations', {})
+        print(f"\n{size} 篇文章 (语料 {size_result['corpus_bytes'] / 1024 / 1024:.1f} MB)")
+        print(f"  {'操作':<28}{'次数':>6}{'总耗时 ms':>11}{'单篇 µs':>10}{'与上次相比':>9}")
+        for name, result in size_result['operations'].items():
+            before = previous_ops.get(name, {}).get('per_item_us')
+            print(f"  {name:<30}{result['count']:>8}{result['total_ms']:>14.1f}{result['per_item_us']:>12.1f}"
+                  f"{format_change(result['per_item_us'], before):>14}")
+
+    # 单篇耗时随文章数增长说明存在与文章总数相关的开销（例如 O(n²) 的处理）
+    sizes = list(run['sizes'])
+    if len(sizes) > 1:
+        smallest, largest = run['sizes'][sizes[0]], run['sizes'][sizes[-1]]
+        print(f"\n单篇耗时增长倍数（{sizes[-1]} 篇 / {sizes[0]} 篇）:")
+        for name, result in largest['operations'].items():
+            base = smallest['operations'].get(name, {}).get('per_item_us')
+            if base:
+                print(f"  {name:<30}{result['per_item_us'] / base:>8.2f}x")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='create_post.py 基准测试（合成文章库）')
+    parser.add_argument('--sizes', type=int, nargs='+', default=list(DEFAULT_SIZES), help='文章数（默认: 10 1000 10000）')
+    parser.add_argument('--seed', type=int, default=1, help='生成语料的随机种子，相同种子生成相同的文章')
+    parser.add_argument('--jobs', type=int, default=None, help='构建和同步使用的并行进程数（默认: CPU 核心数）')
+    parser.add_argument('--output', default=RESULTS_PATH, help=f'结果历史文件（默认: {RESULTS_PATH}）')
+    parser.add_argument('--no-save', action='store_true', help='只打印结果，不写入历史文件')
+    args = parser.parse_args(argv)
+
+    create_post.configure_stdio()
+    output = os.path.abspath(args.output)
+    previous = load_previous_run(output)
+    run = {
+        "version": RESULTS_VERSION,
+        "date": datetime.now().isoformat(timespec='seconds'),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "jobs": create_post.get_worker_count(args.jobs),
+        "seed": args.seed,
+        "sizes": {},
+    }
+    for size in args.sizes:
+        print(f"正在测试 {size} 篇文章...", flush=True)
+        run['sizes'][str(size)] = run_size(size, args.seed, args.jobs)
+
+    print_results(run, previous)
+    if not args.no_save:
+        with open(output, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(run, ensure_ascii=False) + '\n')
+        print(f"\n结果已追加到: {output}")
+
+if __name__ == '__main__':
+    main()
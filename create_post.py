@@ -1,21 +1,154 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 """
-博客文章生成工具 - 动态模式版
-使用JavaScript动态解析Markdown文件
+博客文章生成工具
+默认使用JavaScript动态解析Markdown文件（dynamic 模式），也可以在构建时渲染成最终HTML（static 模式）
 """
 
-import os
-import re
-import shutil
+import os
+import re
+import glob
+import shutil
 import json
+import gzip
+import heapq
+import math
+import hashlib
+import itertools
+import functools
+import argparse
+import textwrap
+import time
+import select
+import struct
+import string
+import tempfile
+from contextlib import contextmanager, nullcontext
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 from html import escape, unescape
+from html.parser import HTMLParser
+from urllib.parse import quote, unquote
 import sys
 
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:  # 未安装 Pillow 时只记录本地图片的尺寸，不生成缩放变体
+    Image = ImageOps = None
+
+try:
+    import brotli
+except ImportError:  # 未安装 brotli 时只生成 .gz
+    brotli = None
+
 POST_FILE_PATTERN = re.compile(r'^post(\d+)\.html$')
+POST_SOURCE_PATTERN = re.compile(r'^post(\d+)\.md$')
+FRONT_MATTER_KEY_PATTERN = re.compile(r'^([A-Za-z_][\w-]*)[ \t]*:[ \t]*(.*)$')
+# 引号字符串或行内列表后面的 # 注释（普通文本中的 # 保留，避免截断含 # 的标题）
+YAML_TRAILING_COMMENT_PATTERN = re.compile(
+    r'("(?:\\.|[^"\\])*"|\'(?:\'\'|[^\'])*\'|\[.*\])[ \t]+#.*', re.DOTALL
+)
+# front matter 解析规则变化会影响生成的页面和配置，计入模板版本
+FRONT_MATTER_VERSION = 3
+TEXT_STATS_VERSION = 1
+CODE_FENCE_PATTERN = re.compile(r'^ {0,3}(`{3,}|~{3,})(.*)$')
+TEXT_STATS_PATTERN = re.compile(
+    r'(?P<image>!\[[^\]\n]*\]\([^)\n]*\)|<img\b[^>]*>)'
+    r'|(?P<url>\]\([^)\n]*\)|<https?://[^>\s]*>|https?://[^\s<>()\[\]]+)'
+    r'|(?P<cjk>[\u4e00-\u9fff]+)'
+    r'|(?P<word>[a-zA-Z]+)'
+)
 CONFIG_PATH = 'posts-config.json'
+BLOG_CONFIG_PATH = 'blog_config.json'
+ASSETS_DIR = 'assets'
+# 预压缩：站点文件旁写出最高压缩级别的 .gz 和 .br，run_server.py 按 Accept-Encoding 直接发送
+PRECOMPRESS_DIRS = ('.', ASSETS_DIR)
+# 根目录中除文章和生成的 JSON 外，只压缩页面引用的固定文件；README、草稿、博客配置等不在站点中
+PRECOMPRESS_SITE_FILES = ('index.html', 'art-theme.css', 'favicon.svg')
+PRECOMPRESS_EXTENSIONS = ('.html', '.md', '.css', '.js', '.json', '.svg', '.txt', '.xml')
+PRECOMPRESS_MIN_BYTES = 256
+BUILD_MANIFEST_PATH = '.build-manifest.json'
+BUILD_MANIFEST_VERSION = 1
+POST_INDEX_PATH = '.post-index.json'
+POST_INDEX_VERSION = 3
+POST_METADATA_FIELDS = (
+    'title', 'category', 'date', 'cover_image', 'tags', 'excerpt', 'reading_time',
+    'word_count', 'code_block_count', 'image_count',
+)
+# 正文统计字段及其在 posts-config.json 中的键名
+POST_STATS_FIELDS = (('word_count', 'wordCount'), ('code_block_count', 'codeBlockCount'), ('image_count', 'imageCount'))
+POSTS_CONFIG_JSON_OPTIONS = {'ensure_ascii': False, 'indent': 2}
+# 构建清单和元数据索引只是本地缓存，检索索引由浏览器下载，都使用紧凑格式以便走 C 编码器
+CACHE_JSON_OPTIONS = {'ensure_ascii': False, 'separators': (',', ':'), 'sort_keys': True}
+# 首页分页：posts-manifest.json 记录总数、分类和最新文章，文章列表按 posts_per_page 拆成分页文件
+POSTS_MANIFEST_PATH = 'posts-manifest.json'
+POSTS_MANIFEST_VERSION = 2
+RECENT_POSTS_COUNT = 5
+SEARCH_INDEX_PATH = 'search-index.json'
+SEARCH_INDEX_VERSION = 2
+# 检索词：连续汉字取相邻两字，英文单词和数字整体作为一个词；index.html 中的切分规则与此一致
+SEARCH_TOKEN_PATTERN = re.compile(r'[\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff]+|[a-z0-9]+')
+# 链接和图片地址不参与检索，链接文字和图片说明保留
+SEARCH_SKIP_PATTERN = re.compile(r'(?<=\])\([^)\n]*\)|<img\b[^>]*>|<https?://[^>\s]*>|https?://[^\s<>()\[\]]+')
+# 每个分片的目标大小；检索词按开头的字分到分片，浏览器只下载查询用到的分片
+SEARCH_SHARD_BYTES = 256 * 1024
+SEARCH_MAX_SHARDS = 256
+# 相关文章：每篇缓存词频最高的检索词，按 TF-IDF 权重取关键词计算余弦相似度，前几篇的编号写入配置条目的 related
+RELATED_INDEX_PATH = '.related-index.json'
+# 每篇文章的相关文章列表（标题、链接、分类和日期），页面读到末尾附近时只下载自己的这一个小文件
+RELATED_FILE_PATTERN = re.compile(r'^related-(\d+)\.json$')
+RELATED_INDEX_VERSION = 1
+RELATED_POSTS_COUNT = 5
+RELATED_TERMS_PER_POST = 120
+RELATED_KEYWORDS_PER_POST = 64
+# 标题、标签和分类比正文更能代表主题，按倍数计入词频
+RELATED_TITLE_WEIGHT = 3
+RELATED_TAG_WEIGHT = 4
+# 超过半数文章都有的词区分不出主题，不作为关键词（也避免沿很长的倒排列表累加）
+RELATED_MAX_DOCUMENT_RATIO = 0.5
+# 文章数或改动篇数超过上次全量计算时的 10% 时重新统计文档频率并全量计算
+RELATED_REFRESH_RATIO = 0.1
+# 构建后补充到配置条目的字段，不参与条目比较和构建记录中的配置哈希
+DERIVED_CONFIG_FIELDS = ('related',)
+PARALLEL_MIN_POSTS = 8
+# --profile 报告：各阶段和各篇文章的耗时与读写量，终端表格列出最慢的几篇
+PROFILE_REPORT_PATH = 'profile-report.json'
+PROFILE_REPORT_VERSION = 1
+PROFILE_TOP_POSTS = 10
+WATCH_INTERVAL = 0.05
+# IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_DELETE：覆盖直接保存和“写临时文件再改名”两种保存方式
+INOTIFY_EVENTS = 0x008 | 0x040 | 0x080 | 0x200
 DEFAULT_COVER_IMAGE = "https://images.unsplash.com/photo-1555066931-4365d14bab8c?auto=format&fit=crop&w=1170&q=80"
+# 本地图片：按这些宽度（不超过原图宽度）生成 WebP 变体，变体文件名带原图内容哈希，重复构建时直接复用
+IMAGE_VARIANT_WIDTHS = (480, 960, 1600)
+IMAGE_VARIANT_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.webp')
+IMAGE_VARIANTS_VERSION = 1
+IMAGE_WEBP_QUALITY = 80
+# 文章正文和封面最宽 900px，浏览器按 sizes 从 srcset 中选择合适的宽度
+IMAGE_SIZES = '(max-width: 900px) 100vw, 900px'
+# Unsplash 封面通过 w 参数取不同宽度
+REMOTE_COVER_WIDTHS = (480, 800, 1170)
+UNSPLASH_WIDTH_PATTERN = re.compile(r'^(https://images\.unsplash\.com/[^?#]*\?(?:[^#]*&)?w=)\d+')
+MD_IMAGE_SOURCE_PATTERN = re.compile(r'!\[[^\]\n]*\]\(\s*<?([^\s()>]+(?:\([^\s()]*\)[^\s()>]*)*)')
+COVER_IMAGE_LINE_PATTERN = re.compile(r'^cover_image[ \t]*:[ \t]*["\']?([^"\'\s]+)', re.MULTILINE)
+HTML_IMAGE_PATTERN = re.compile(r'<img src="([^"]*)"([^>]*)>')
+RENDER_MODES = ('dynamic', 'static')
+DEFAULT_BLOG_CONFIG = {
+    "reading_speed_chinese": 300,
+    "reading_speed_english": 200,
+    "render_mode": "dynamic",
+    "posts_per_page": 10,
+    "supported_languages": ["python", "javascript", "css", "bash", "json", "markdown", "yaml", "csharp"],
+}
+
+class PostsConfigError(Exception):
+    """posts-config.json 无法解析时抛出，避免用空配置覆盖已有文章"""
 
 def configure_stdio():
     """让 Windows 控制台也能稳定输出中文和图标"""
@@ -48,7 +181,7 @@ def get_next_post_number():
     return max(numbers) + 1 if numbers else 1
 
 def load_posts_config(config_path=CONFIG_PATH, warn=True):
-    """读取 posts-config.json，缺失或损坏时返回默认结构"""
+    """读取 posts-config.json，缺失时返回默认结构，损坏时抛出 PostsConfigError"""
     if not os.path.exists(config_path):
         if warn:
             print(f"未找到 {config_path}，将创建新配置文件")
@@ -57,27 +190,301 @@ def load_posts_config(config_path=CONFIG_PATH, warn=True):
     try:
         with open(config_path, 'r', encoding='utf-8') as f:
             config = json.load(f)
-    except json.JSONDecodeError:
-        if warn:
-            print(f"警告: {config_path} 格式错误，将创建新配置")
-        return new_posts_config()
+    except json.JSONDecodeError as e:
+        raise PostsConfigError(
+            f"{config_path} 格式错误（第 {e.lineno} 行第 {e.colno} 列），请修复后重试，文件未做任何修改"
+        ) from e
 
-    if not isinstance(config, dict):
-        return new_posts_config()
+    if not isinstance(config, dict) or not isinstance(config.setdefault('posts', []), list):
+        raise PostsConfigError(f"{config_path} 结构无效：应为包含 posts 列表的对象，文件未做任何修改")
+    return config
 
-    posts = config.get('posts')
-    if not isinstance(posts, list):
-        config['posts'] = []
+def load_blog_config(config_path=BLOG_CONFIG_PATH):
+    """读取 blog_config.json，缺失或损坏时使用默认设置"""
+    config = dict(DEFAULT_BLOG_CONFIG)
+    if not os.path.exists(config_path):
+        return config
+
+    try:
+        with open(config_path, 'r', encoding='utf-8') as f:
+            loaded = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        print(f"警告: {config_path} 读取失败，将使用默认设置")
+        return config
+
+    if isinstance(loaded, dict):
+        config.update(loaded)
     return config
 
+def get_render_mode(blog_config=None):
+    """获取文章渲染模式：static 在构建时渲染，dynamic 在浏览器中解析 Markdown"""
+    if blog_config is None:
+        blog_config = load_blog_config()
+    render_mode = blog_config.get('render_mode')
+    return render_mode if render_mode in RENDER_MODES else DEFAULT_BLOG_CONFIG['render_mode']
+
+def get_posts_per_page(blog_config=None):
+    """首页每页文章数，无效设置时使用默认值"""
+    if blog_config is None:
+        blog_config = load_blog_config()
+    posts_per_page = blog_config.get('posts_per_page')
+    if isinstance(posts_per_page, int) and not isinstance(posts_per_page, bool) and posts_per_page > 0:
+        return posts_per_page
+    return DEFAULT_BLOG_CONFIG['posts_per_page']
+
+def hash_bytes(data):
+    """计算内容哈希，用于构建缓存比对"""
+    return hashlib.sha256(data).hexdigest()
+
+def hash_file(path):
+    """分块计算文件哈希，避免一次读入大文件"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(65536), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def get_versioned_url(path):
+    """在地址后附加内容哈希 ?v=，内容变化时地址随之变化，浏览器和 CDN 可以长期缓存；文件不存在时返回原地址"""
+    if not os.path.exists(path):
+        return path
+    return f"{path}?v={hash_file(path)[:10]}"
+
+def write_text_atomic(path, text):
+    """先写入同目录临时文件再原子替换，写入中途崩溃也不会留下半个文件"""
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, temp_path = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", suffix='.tmp', dir=directory)
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        # mkstemp 创建的文件只有当前用户可读，保持原文件权限以免静态服务器无法读取
+        mode = os.stat(path).st_mode & 0o777 if os.path.exists(path) else 0o644
+        os.chmod(temp_path, mode)
+        os.replace(temp_path, path)
+    except BaseException:
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+        raise
+
+def write_json_atomic(path, data, **dump_options):
+    """原子写入 JSON 文件"""
+    write_text_atomic(path, json.dumps(data, **dump_options))
+
+def try_lock_file(lock_file):
+    """尝试获取排他锁，已被其他进程持有时抛出 OSError"""
+    if fcntl is not None:
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    else:
+        lock_file.seek(0)
+        msvcrt.locking(lock_file.fileno(), msvcrt.LK_NBLCK, 1)
+
+def unlock_file(lock_file):
+    """释放排他锁"""
+    if fcntl is not None:
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+    else:
+        lock_file.seek(0)
+        msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+
+@contextmanager
+def file_lock(path):
+    """对 path 加进程间排他锁（锁文件为 path.lock），其他进程持锁时等待"""
+    with open(f"{path}.lock", 'a+b') as lock_file:
+        try:
+            try_lock_file(lock_file)
+        except OSError:
+            print(f"等待其他进程释放 {path} ...", file=sys.stderr)
+            while True:
+                time.sleep(0.1)
+                try:
+                    try_lock_file(lock_file)
+                    break
+                except OSError:
+                    pass
+        try:
+            yield
+        finally:
+            unlock_file(lock_file)
+
+# 当前的性能分析器，只在 profiling() 的 with 块内不为 None
+PROFILER = None
+
+class BuildProfiler:
+    """--profile 模式的计时器：按阶段和文章累计墙钟时间、CPU 时间和读写字节数
+
+    读写字节数取自 Linux 的 /proc/self/io（包含缓存命中的读写），其他系统记为 None。
+    同一篇文章的各阶段互不嵌套，之和就是它的总耗时；search_index 等整体阶段包含其中读取配置等子阶段。
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.started_cpu = time.process_time()
+        # 读取 /proc/self/io 本身也计入 rchar，累计扣除
+        self.io_overhead = 0
+        self.started_io = self.read_io()
+        self.stages = {}
+        self.posts = {}
+
+    def read_io(self):
+        """返回进程累计的 (读字节数, 写字节数)"""
+        try:
+            with open('/proc/self/io', 'rb') as f:
+                data = f.read()
+        except OSError:
+            return None
+        fields = dict(line.split(b':', 1) for line in data.splitlines() if b':' in line)
+        read_bytes = int(fields[b'rchar']) - self.io_overhead
+        self.io_overhead += len(data)
+        return read_bytes, int(fields[b'wchar'])
+
+    @contextmanager
+    def stage(self, name, post=None):
+        """统计一个阶段；传入 post 时同时计入这篇文章（按文件名去掉扩展名归并 .md 和 .html）"""
+        io_before = self.read_io()
+        cpu_before = time.process_time()
+        wall_before = time.perf_counter()
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - wall_before
+            cpu = time.process_time() - cpu_before
+            io_after = self.read_io()
+            io = (io_after[0] - io_before[0], io_after[1] - io_before[1]) if io_before and io_after else None
+            self.add(self.stages.setdefault(name, new_profile_entry()), wall, cpu, io)
+            if post is not None:
+                entry = self.posts.setdefault(os.path.splitext(os.path.basename(post))[0], new_profile_entry())
+                self.add(entry, wall, cpu, io)
+                entry.setdefault('stages', {})
+                entry['stages'][name] = entry['stages'].get(name, 0) + wall
+
+    @staticmethod
+    def add(entry, wall, cpu, io):
+        entry['calls'] += 1
+        entry['wall'] += wall
+        entry['cpu'] += cpu
+        if io is None:
+            entry['read'] = entry['written'] = None
+        elif entry['read'] is not None:
+            entry['read'] += io[0]
+            entry['written'] += io[1]
+
+    def report(self, top=PROFILE_TOP_POSTS):
+        """生成 JSON 报告：总计、各阶段（按耗时降序）、各篇文章和最慢的 top 篇"""
+        io = self.read_io()
+        total = new_profile_entry()
+        total['calls'] = 1
+        total['wall'] = time.perf_counter() - self.started
+        total['cpu'] = time.process_time() - self.started_cpu
+        if io and self.started_io:
+            total['read'] = io[0] - self.started_io[0]
+            total['written'] = io[1] - self.started_io[1]
+        else:
+            total['read'] = total['written'] = None
+
+        stages = sorted(self.stages.items(), key=lambda item: item[1]['wall'], reverse=True)
+        posts = sorted(self.posts.items(), key=lambda item: item[1]['wall'], reverse=True)
+        return {
+            "version": PROFILE_REPORT_VERSION,
+            "command": sys.argv[1:],
+            "date": datetime.now().isoformat(timespec='seconds'),
+            "total": format_profile_entry(total),
+            "stages": {name: format_profile_entry(entry) for name, entry in stages},
+            "posts": {name: format_profile_entry(entry) for name, entry in posts},
+            "slowest": [name for name, _ in posts[:top]],
+        }
+
+def new_profile_entry():
+    return {"calls": 0, "wall": 0.0, "cpu": 0.0, "read": 0, "written": 0}
+
+def format_profile_entry(entry):
+    """把秒换算为毫秒写入报告"""
+    result = {
+        "calls": entry['calls'],
+        "wall_ms": round(entry['wall'] * 1000, 3),
+        "cpu_ms": round(entry['cpu'] * 1000, 3),
+        "bytes_read": entry['read'],
+        "bytes_written": entry['written'],
+    }
+    if 'stages' in entry:
+        result['stages_ms'] = {name: round(wall * 1000, 3) for name, wall in entry['stages'].items()}
+    return result
+
+def format_profile_bytes(size):
+    """把字节数格式化为便于阅读的单位"""
+    if size is None:
+        return '-'
+    for unit in ('B', 'KB', 'MB'):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == 'B' else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+def print_profile_report(report, report_path, file=sys.stderr):
+    """打印各阶段耗时和最慢的文章；输出到 stderr，不影响 import --json 的标准输出"""
+    total = report['total']
+    print(f"\n性能分析: 总耗时 {total['wall_ms']:.1f} ms, CPU {total['cpu_ms']:.1f} ms, "
+          f"读取 {format_profile_bytes(total['bytes_read'])}, 写入 {format_profile_bytes(total['bytes_written'])}", file=file)
+    print(f"  {'阶段':<14}{'次数':>6}{'墙钟 ms':>10}{'CPU ms':>12}{'读取':>10}{'写入':>10}", file=file)
+    for name, stage in report['stages'].items():
+        print(f"  {name:<16}{stage['calls']:>8}{stage['wall_ms']:>12.1f}{stage['cpu_ms']:>12.1f}"
+              f"{format_profile_bytes(stage['bytes_read']):>12}{format_profile_bytes(stage['bytes_written']):>12}", file=file)
+
+    if report['slowest']:
+        print(f"\n  最慢的 {len(report['slowest'])} 篇文章:", file=file)
+        for name in report['slowest']:
+            post = report['posts'][name]
+            slowest_stage = max(post['stages_ms'].items(), key=lambda item: item[1])[0]
+            print(f"  {name:<16}{post['wall_ms']:>10.1f} ms  CPU {post['cpu_ms']:>8.1f} ms  "
+                  f"读取 {format_profile_bytes(post['bytes_read']):>9}  写入 {format_profile_bytes(post['bytes_written']):>9}  "
+                  f"主要阶段: {slowest_stage}", file=file)
+    print(f"\n报告已写入: {report_path}", file=file)
+
+@contextmanager
+def profile_stage(name, post=None):
+    """开启 --profile 时统计 with 块的耗时和读写量，否则什么也不做"""
+    if PROFILER is None:
+        yield
+        return
+    with PROFILER.stage(name, post):
+        yield
+
+def profiled(name):
+    """装饰器：开启 --profile 时把整个函数计为一个阶段"""
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with profile_stage(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+@contextmanager
+def profiling(report_path=PROFILE_REPORT_PATH):
+    """在 with 块内开启性能分析，结束后写出 JSON 报告并打印最慢的文章
+
+    分析期间逐篇文章都在当前进程串行处理，各阶段的 CPU 时间和读写字节数才能准确归属。
+    """
+    global PROFILER
+    PROFILER = BuildProfiler()
+    try:
+        yield PROFILER
+    finally:
+        profiler, PROFILER = PROFILER, None
+        report = profiler.report()
+        write_json_atomic(report_path, report, ensure_ascii=False, indent=2)
+        print_profile_report(report, report_path)
+
 def save_posts_config(config, config_path=CONFIG_PATH):
-    """保存 posts-config.json"""
-    with open(config_path, 'w', encoding='utf-8') as f:
-        json.dump(config, f, ensure_ascii=False, indent=2)
+    """原子保存 posts-config.json"""
+    write_json_atomic(config_path, config, **POSTS_CONFIG_JSON_OPTIONS)
 
 def build_post_config(post_data, post_filename):
     """构建首页使用的文章配置对象"""
-    return {
+    post_config = {
         "id": post_data.get('post_number', 0),
         "title": post_data.get('title', '无标题'),
         "excerpt": post_data.get('excerpt') or '暂无摘要',
@@ -88,102 +495,1429 @@ def build_post_config(post_data, post_filename):
         "image": post_data.get('cover_image', DEFAULT_COVER_IMAGE),
         "link": post_filename
     }
+    # 本地封面的 WebP 变体，首页按缩略图的显示宽度选择
+    variants = get_image_variants(post_config['image'])
+    if variants and variants['srcset']:
+        post_config['imageSrcset'] = variants['srcset']
+    # 正文统计由生成工具预先算好，首页直接读取
+    for field, key in POST_STATS_FIELDS:
+        if field in post_data:
+            post_config[key] = post_data[field]
+    return post_config
+
+class PostsRepository:
+    """posts-config.json 的内存仓库：一次读取，按 link 和 id 索引，一次写回
+
+    条目只能通过仓库方法修改：写回时复用未改动条目上次的编码结果。
+    """
+
+    def __init__(self, config_path=CONFIG_PATH, warn=True):
+        self.config_path = config_path
+        with profile_stage('config_load'):
+            self.config = load_posts_config(config_path, warn)
+        self.signature = get_file_signature(config_path) if os.path.exists(config_path) else None
+        self.changed = False
+        self.encoded = {}
+        self.pages = {}
+        self.reindex()
+
+    @property
+    def posts(self):
+        return self.config['posts']
+
+    def reindex(self):
+        """重建 link 和 id 索引，同一键出现多次时以靠前的条目为准"""
+        self.by_link = {}
+        self.by_id = {}
+        for post in self.posts:
+            self.by_link.setdefault(post.get('link'), post)
+            self.by_id.setdefault(post.get('id'), post)
+
+    def get(self, post_filename):
+        """按文件名查找配置条目"""
+        return self.by_link.get(post_filename)
+
+    def get_excerpt(self, post_filename):
+        """读取文章摘要"""
+        post = self.get(post_filename)
+        return post.get('excerpt') if post else None
+
+    def find(self, post_id, post_filename):
+        """按编号或文件名查找配置条目"""
+        post = self.by_id.get(post_id)
+        return post if post is not None else self.get(post_filename)
+
+    def add(self, post_config):
+        """在列表顶部添加条目（最新的文章在最前面）"""
+        self.posts.insert(0, post_config)
+        self.by_link[post_config.get('link')] = post_config
+        self.by_id[post_config.get('id')] = post_config
+        self.changed = True
+
+    def replace(self, post, post_config):
+        """原地替换条目，保持其在列表中的位置"""
+        for field, lookup in (('link', self.by_link), ('id', self.by_id)):
+            if lookup.get(post.get(field)) is post:
+                del lookup[post.get(field)]
+        self.encoded.pop(id(post), None)
+        derived = {field: post[field] for field in DERIVED_CONFIG_FIELDS if field in post and field not in post_config}
+        post.clear()
+        post.update(post_config)
+        # 相关文章等派生字段保留到下次重新计算
+        post.update(derived)
+        self.by_link.setdefault(post.get('link'), post)
+        self.by_id.setdefault(post.get('id'), post)
+        self.changed = True
+
+    def set_related(self, post, related):
+        """更新条目的相关文章编号列表，related 为 None 时删除该字段；返回是否有改动"""
+        if post.get('related') == related:
+            return False
+        self.encoded.pop(id(post), None)
+        if related is None:
+            del post['related']
+        else:
+            post['related'] = related
+        self.changed = True
+        return True
+
+    def remove(self, post_filename):
+        """删除指定文件名的所有条目，返回是否有删除"""
+        if post_filename not in self.by_link:
+            return False
+        self.config['posts'] = [post for post in self.posts if post.get('link') != post_filename]
+        self.reindex()
+        self.changed = True
+        return True
+
+    def replace_all(self, posts):
+        """整体替换文章列表"""
+        self.config['posts'] = posts
+        self.reindex()
+        self.changed = True
+
+    def is_current(self):
+        """磁盘上的文件自上次读取或写回后没有被其他进程改动"""
+        if not os.path.exists(self.config_path):
+            return self.signature is None
+        return get_file_signature(self.config_path) == self.signature
+
+    def encode_posts(self):
+        """按 save_posts_config 的缩进格式编码每个条目，只重新编码改动过的条目；有非对象条目时返回 None"""
+        if not all(isinstance(post, dict) for post in self.posts):
+            return None
+
+        encoded = {}
+        chunks = []
+        for post in self.posts:
+            cached = self.encoded.get(id(post))
+            if cached is None or cached[0] is not post:
+                text = json.dumps(post, **POSTS_CONFIG_JSON_OPTIONS)
+                cached = (post, '    ' + text.replace('\n', '\n    '))
+            encoded[id(post)] = cached
+            chunks.append(cached[1])
+        self.encoded = encoded
+        return chunks
+
+    def encode(self):
+        """按 save_posts_config 的格式序列化配置，只重新编码改动过的条目"""
+        chunks = self.encode_posts() if list(self.config) == ['posts'] and self.posts else None
+        if chunks is None:
+            return json.dumps(self.config, **POSTS_CONFIG_JSON_OPTIONS)
+        return join_encoded_posts(chunks)
+
+    def save(self):
+        """原子写回 posts-config.json，并同步更新首页分页文件"""
+        with profile_stage('config_save'):
+            write_text_atomic(self.config_path, self.encode())
+        self.signature = get_file_signature(self.config_path)
+        self.changed = False
+        write_post_pages(self)
+
+def join_encoded_posts(chunks):
+    """把编码好的条目拼成 {"posts": [...]} 文本，格式与 posts-config.json 相同"""
+    return '{\n  "posts": [\n' + ',\n'.join(chunks) + '\n  ]\n}'
+
+def normalize_category(category):
+    """与首页相同的分类名：去掉两侧方括号，空值归为“未分类”"""
+    return re.sub(r'^\[|\]$', '', str(category or '未分类')) or '未分类'
+
+def get_posts_config_version(posts):
+    """posts-config.json 的签名摘要，用来判断分页文件是否对应当前配置"""
+    return hash_bytes(json.dumps(posts.signature).encode('utf-8'))[:16]
+
+@profiled('pages')
+def write_post_pages(posts, blog_config=None, manifest_path=POSTS_MANIFEST_PATH):
+    """把文章列表按 posts_per_page 拆成分页文件写入 assets/，并写出首页先读取的 posts-manifest.json
+
+    分页文件按内容哈希命名，内容不变的页面复用上次的结果，不重新写入。
+    调用方需持有 posts-config.json 的锁。
+    """
+    per_page = get_posts_per_page(blog_config)
+    entries = [post for post in posts.posts if isinstance(post, dict)]
+    chunks = posts.encode_posts()
+    if chunks is None:
+        chunks = ['    ' + json.dumps(post, **POSTS_CONFIG_JSON_OPTIONS).replace('\n', '\n    ') for post in entries]
+
+    pages = {}
+    for start in range(0, len(chunks), per_page):
+        key = (len(pages) + 1, tuple(chunks[start:start + per_page]))
+        page_path = posts.pages.get(key)
+        if page_path is None:
+            page_path = write_fingerprinted_asset(f'posts-page-{key[0]}', 'json', join_encoded_posts(key[1]))
+        pages[key] = page_path
+    posts.pages = pages
+
+    categories = {}
+    for post in entries:
+        category = normalize_category(post.get('category'))
+        categories[category] = categories.get(category, 0) + 1
+
+    write_json_atomic(manifest_path, {
+        "version": POSTS_MANIFEST_VERSION,
+        "config": get_posts_config_version(posts),
+        "configUrl": get_versioned_url(posts.config_path),
+        "total": len(entries),
+        "perPage": per_page,
+        "pages": list(pages.values()),
+        "categories": categories,
+        "recent": entries[:RECENT_POSTS_COUNT],
+    }, **CACHE_JSON_OPTIONS)
+
+    # 清单写好后再清理不再引用的旧分页
+    page_paths = set(pages.values())
+    for path in glob.glob(os.path.join(ASSETS_DIR, 'posts-page-*.json')):
+        if path.replace(os.sep, '/') not in page_paths:
+            os.remove(path)
+
+def is_post_pages_current(posts, blog_config=None, manifest_path=POSTS_MANIFEST_PATH):
+    """分页文件存在且与当前配置、posts_per_page 一致"""
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        return (
+            manifest.get('version') == POSTS_MANIFEST_VERSION
+            and manifest.get('config') == get_posts_config_version(posts)
+            and manifest.get('perPage') == get_posts_per_page(blog_config)
+            and all(os.path.exists(path) for path in manifest.get('pages', []))
+        )
+    except (OSError, ValueError, AttributeError, TypeError):
+        return False
+
+@contextmanager
+def posts_transaction(config_path=CONFIG_PATH, warn=True, posts=None):
+    """posts-config.json 事务：持锁读取，批量增删改后一次原子写回；事务中抛出异常时不写入
+
+    传入上一次事务得到的 posts 时，若文件未被其他进程改动则直接复用，省去重新读取和解析。
+    """
+    with file_lock(config_path):
+        if posts is None or posts.config_path != config_path or not posts.is_current():
+            posts = PostsRepository(config_path, warn)
+        try:
+            yield posts
+        except BaseException:
+            # 内存中的修改没有写回，下次事务必须重新读取
+            posts.signature = False
+            raise
+        if posts.changed:
+            posts.save()
+
+def calculate_text_stats(content, blog_config=None):
+    """单遍统计正文：跳过围栏代码块和链接地址，返回阅读时间、字数、代码块数和图片数
+
+    字数 = 中文字符数 + 英文单词数；阅读速度取自 blog_config.json。
+    """
+    if blog_config is None:
+        blog_config = load_blog_config()
+
+    chinese_chars = english_words = code_blocks = images = 0
+    fence = None
+    for line in content.split('\n'):
+        fence_match = CODE_FENCE_PATTERN.match(line)
+        if fence is not None:
+            # 结束标记须与开始标记字符相同、长度不短于开始标记，且后面没有其他内容
+            if fence_match and fence_match.group(1)[0] == fence[0] and len(fence_match.group(1)) >= len(fence) \
+                    and not fence_match.group(2).strip():
+                fence = None
+            continue
+        if fence_match and not (fence_match.group(1)[0] == '`' and '`' in fence_match.group(2)):
+            fence = fence_match.group(1)
+            code_blocks += 1
+            continue
+
+        for match in TEXT_STATS_PATTERN.finditer(line):
+            kind = match.lastgroup
+            if kind == 'cjk':
+                chinese_chars += match.end() - match.start()
+            elif kind == 'word':
+                english_words += 1
+            elif kind == 'image':
+                images += 1
+
+    minutes = (chinese_chars / blog_config['reading_speed_chinese']) + (english_words / blog_config['reading_speed_english'])
+    return {
+        'reading_time': max(1, int(minutes)),
+        'word_count': chinese_chars + english_words,
+        'code_block_count': code_blocks,
+        'image_count': images,
+    }
+
+def calculate_reading_time(content, blog_config=None):
+    """根据内容估算阅读时间"""
+    return calculate_text_stats(content, blog_config)['reading_time']
 
-def calculate_reading_time(content):
-    """根据内容估算阅读时间"""
-    chinese_chars = len(re.findall(r'[\u4e00-\u9fff]', content))
-    english_words = len(re.findall(r'[a-zA-Z]+', content))
-    minutes = (chinese_chars / 300) + (english_words / 200)
-    return max(1, int(minutes))
-
-def parse_markdown_file(md_file_path):
-    """解析 Markdown 文件，提取元数据和内容"""
-    if not os.path.exists(md_file_path):
-        print(f"错误: 找不到文件 {md_file_path}")
-        return None
-    
-    with open(md_file_path, 'r', encoding='utf-8') as f:
-        content = f.read()
-    
-    post_data = {}
-    
-    # 检查是否有 YAML front matter
-    front_matter_match = re.match(r'^---\s*\n(.*?)\n---\s*\n(.*)$', content, re.DOTALL)
-    if front_matter_match:
-        # 有 front matter，解析元数据
-        front_matter = front_matter_match.group(1)
-        post_data['content'] = front_matter_match.group(2).strip()
-        
-        # 解析 front matter 中的键值对
-        for line in front_matter.split('\n'):
-            line = line.strip()
-            if ':' in line:
-                key, value = line.split(':', 1)
-                key = key.strip()
-                value = value.strip().strip('"').strip("'")
-                
-                if key == 'title':
-                    post_data['title'] = value
-                elif key == 'category':
-                    post_data['category'] = value
-                elif key == 'date':
-                    post_data['date'] = value
-                elif key == 'cover_image':
-                    post_data['cover_image'] = value
-                elif key == 'excerpt':
-                    post_data['excerpt'] = value
-                elif key == 'tags':
-                    post_data['tags'] = [tag.strip() for tag in value.split(',') if tag.strip()]
-    else:
-        # 没有 front matter，使用文件名和默认值
-        post_data['content'] = content.strip()
-        
-        # 从文件名提取标题（去掉扩展名）
-        base_name = os.path.splitext(os.path.basename(md_file_path))[0]
-        post_data['title'] = base_name
-    
-    # 设置默认值
-    if 'title' not in post_data or not post_data['title']:
-        base_name = os.path.splitext(os.path.basename(md_file_path))[0]
-        post_data['title'] = base_name
-    
-    if 'category' not in post_data:
-        post_data['category'] = '其他'
-    
-    if 'date' not in post_data:
-        post_data['date'] = datetime.now().strftime("%Y年%m月%d日")
-    
-    if 'cover_image' not in post_data:
-        post_data['cover_image'] = DEFAULT_COVER_IMAGE
-    
-    if 'excerpt' not in post_data:
-        # 从内容前几行提取摘要
-        content_lines = post_data['content'].split('\n')
-        excerpt = ''
-        for line in content_lines[:3]:
-            line = line.strip()
-            if line and not line.startswith('#'):
-                excerpt = line[:100]  # 取前100个字符
-                break
-        post_data['excerpt'] = excerpt if excerpt else "点击阅读全文..."
-    
-    if 'tags' not in post_data:
-        post_data['tags'] = []
-    
-    # 计算阅读时间
-    post_data['reading_time'] = calculate_reading_time(post_data['content'])
-    
-    # 动态模式标记
-    post_data['mode'] = 'dynamic'
-    
-    return post_data
+def read_front_matter_lines(f):
+    """从文件开头逐行读取 front matter，读到结束的 --- 即停止
+
+    返回 (front matter 各行, 已读出的正文部分)；没有 front matter 时前者为 None，
+    已读出的行原样返回，调用方需要正文时接着读取文件剩余内容即可。
+    """
+    # Windows 记事本保存的 UTF-8 文件带 BOM，浏览器解码时同样会去掉
+    first = f.readline().lstrip('\ufeff')
+    if first.rstrip() != '---' or not first.endswith('\n'):
+        return None, first
+
+    lines = []
+    for line in f:
+        if line.rstrip() == '---':
+            return lines, ''
+        lines.append(line)
+    # 没有结束标记，整个文件都按正文处理
+    return None, first + ''.join(lines)
+
+def parse_yaml_scalar(text):
+    """解析单个标量：去掉引号并处理转义，其余原样返回"""
+    text = text.strip()
+    match = YAML_TRAILING_COMMENT_PATTERN.fullmatch(text)
+    if match:
+        text = match.group(1)
+    if len(text) >= 2 and text[0] == text[-1] == '"':
+        try:
+            return json.loads(text)
+        except ValueError:
+            return text[1:-1]
+    if len(text) >= 2 and text[0] == text[-1] == "'":
+        return text[1:-1].replace("''", "'")
+    return text
+
+def fold_yaml_lines(lines):
+    """按 YAML 规则折叠多行文本：相邻行以空格连接，空行变为换行"""
+    result = ''
+    breaks = 0
+    for line in lines:
+        text = line.strip()
+        if not text:
+            breaks += 1
+            continue
+        if result:
+            result += '\n' * breaks if breaks else ' '
+        result += text
+        breaks = 0
+    return result
+
+def parse_yaml_block_scalar(indicator, lines):
+    """解析 | 和 > 多行文本；结尾换行只在带 + 时保留"""
+    while lines and not lines[-1].strip():
+        lines = lines[:-1]
+    indents = [len(line) - len(line.lstrip()) for line in lines if line.strip()]
+    indent = min(indents) if indents else 0
+    lines = [line[indent:] for line in lines]
+    text = '\n'.join(lines) if indicator[0] == '|' else fold_yaml_lines(lines)
+    return text + '\n' if indicator.endswith('+') else text
+
+def parse_yaml_flow_sequence(text):
+    """解析 [a, "b, c", 'd'] 形式的行内列表"""
+    inner = text.strip()
+    if inner.startswith('[') and inner.endswith(']'):
+        inner = inner[1:-1]
+    items = re.findall(r'\s*("(?:\\.|[^"\\])*"|\'(?:\'\'|[^\'])*\'|[^,]*?)\s*(?:,|$)', inner)
+    return [parse_yaml_scalar(item) for item in items if item.strip()]
+
+def parse_yaml_value(value, block):
+    """解析一个键的值，block 为紧随其后的缩进行"""
+    if re.fullmatch(r'[|>][+-]?', value):
+        return parse_yaml_block_scalar(value, block)
+
+    continuation = [line.strip() for line in block]
+    if not value:
+        items = [line for line in continuation if line]
+        if items and all(item == '-' or item.startswith('- ') for item in items):
+            return [parse_yaml_scalar(item[1:]) for item in items]
+        return fold_yaml_lines(continuation)
+
+    text = fold_yaml_lines([value] + continuation)
+    if value.startswith('['):
+        match = YAML_TRAILING_COMMENT_PATTERN.fullmatch(text)
+        return parse_yaml_flow_sequence(match.group(1) if match else text)
+    # 普通文本不处理行内 # 注释，避免截断含 # 的标题
+    return parse_yaml_scalar(text)
+
+def parse_front_matter(lines):
+    """解析 front matter 中常用的 YAML 写法：引号字符串、[a, b] 与 "- a" 列表、| 与 > 多行文本、缩进续行"""
+    lines = [line.rstrip('\r\n') for line in lines]
+    values = {}
+    i = 0
+    while i < len(lines):
+        match = FRONT_MATTER_KEY_PATTERN.match(lines[i])
+        i += 1
+        if not match:
+            continue
+
+        # 值可以延续到后面的缩进行、空行和 "- " 列表项
+        block = []
+        while i < len(lines) and (not lines[i].strip() or lines[i][0].isspace() or lines[i].startswith('-')):
+            block.append(lines[i])
+            i += 1
+        values[match.group(1)] = parse_yaml_value(match.group(2).strip(), block)
+    return values
+
+def front_matter_text(value):
+    """把 front matter 值转成文本，列表以逗号连接"""
+    if isinstance(value, list):
+        return ', '.join(str(item) for item in value)
+    return str(value)
+
+def get_front_matter_metadata(values, md_file_path):
+    """从 front matter 值中取出文章元数据，标题缺失时使用文件名"""
+    post_data = {}
+    for key in ('title', 'category', 'date', 'cover_image', 'excerpt'):
+        if key in values:
+            post_data[key] = front_matter_text(values[key])
+    if 'tags' in values:
+        tags = values['tags'] if isinstance(values['tags'], list) else str(values['tags']).split(',')
+        post_data['tags'] = [str(tag).strip() for tag in tags if str(tag).strip()]
+
+    if not post_data.get('title'):
+        post_data['title'] = os.path.splitext(os.path.basename(md_file_path))[0]
+    return post_data
+
+def get_default_excerpt(content_lines):
+    """从正文前几行提取摘要"""
+    for line in content_lines[:3]:
+        line = line.strip()
+        if line and not line.startswith('#'):
+            return line[:100]  # 取前100个字符
+    return "点击阅读全文..."
+
+def apply_post_defaults(post_data):
+    """补齐 front matter 中缺失的元数据"""
+    post_data.setdefault('category', '其他')
+    post_data.setdefault('date', datetime.now().strftime("%Y年%m月%d日"))
+    post_data.setdefault('cover_image', DEFAULT_COVER_IMAGE)
+    post_data.setdefault('tags', [])
+    # 动态模式标记
+    post_data['mode'] = 'dynamic'
+    return post_data
+
+def read_post_metadata(md_file_path):
+    """只读取 Markdown 文件头部的元数据，不读取正文（没有摘要时只多读正文开头几行）
+
+    不含 content 和 reading_time，需要这两项时使用 parse_markdown_file。
+    """
+    with open(md_file_path, 'r', encoding='utf-8') as f:
+        front_matter, head = read_front_matter_lines(f)
+        post_data = get_front_matter_metadata(parse_front_matter(front_matter or []), md_file_path)
+        if 'excerpt' not in post_data:
+            content_lines = []
+            for line in itertools.chain([head] if head else [], f):
+                if content_lines or line.strip():
+                    content_lines.append(line.rstrip('\r\n'))
+                if len(content_lines) == 3:
+                    break
+            post_data['excerpt'] = get_default_excerpt(content_lines)
+    return apply_post_defaults(post_data)
+
+def parse_markdown_file(md_file_path, blog_config=None):
+    """解析 Markdown 文件，提取元数据、内容和正文统计"""
+    if not os.path.exists(md_file_path):
+        print(f"错误: 找不到文件 {md_file_path}", file=sys.stderr)
+        return None
+    
+    with profile_stage('read', md_file_path), open(md_file_path, 'r', encoding='utf-8') as f:
+        front_matter, head = read_front_matter_lines(f)
+        content = (head + f.read()).strip()
+    
+    with profile_stage('front_matter', md_file_path):
+        post_data = get_front_matter_metadata(parse_front_matter(front_matter or []), md_file_path)
+        post_data['content'] = content
+        if 'excerpt' not in post_data:
+            post_data['excerpt'] = get_default_excerpt(content.split('\n'))
+    
+    # 计算阅读时间、字数、代码块和图片数量
+    with profile_stage('text_stats', md_file_path):
+        post_data.update(calculate_text_stats(content, blog_config))
+    return apply_post_defaults(post_data)
 
-def create_post_html(post_data, post_filename):
-    """生成动态解析Markdown的文章页面 HTML"""
-    # 获取对应的Markdown文件名
-    md_filename = post_filename.replace('.html', '.md')
-    
-    post_template = '''<!DOCTYPE html>
+# 构建时 Markdown 渲染（输出与 marked.js 的 GFM 模式保持一致）
+MARKDOWN_RENDERER_VERSION = 4
+MARKDOWN_ESCAPABLE = set('!"#$%&\'()*+,-./:;<=>?@[\\]^_`{|}~')
+MD_FENCE_PATTERN = re.compile(r'^( {0,3})(`{3,}|~{3,})[ \t]*([^`]*?)[ \t]*$')
+MD_HEADING_PATTERN = re.compile(r'^ {0,3}(#{1,6})(?:[ \t]+(.*?))?(?:[ \t]+#+)?[ \t]*$')
+MD_HR_PATTERN = re.compile(r'^ {0,3}(?:(?:-[ \t]*){3,}|(?:_[ \t]*){3,}|(?:\*[ \t]*){3,})$')
+MD_SETEXT_PATTERN = re.compile(r'^ {0,3}(=+|-+)[ \t]*$')
+MD_LIST_PATTERN = re.compile(r'^( {0,3})([*+-]|\d{1,9}[.)])([ \t]+|$)')
+MD_TABLE_DELIMITER_PATTERN = re.compile(r'^ {0,3}\|?[ \t]*:?-+:?[ \t]*(?:\|[ \t]*:?-+:?[ \t]*)*\|?[ \t]*$')
+MD_REFERENCE_PATTERN = re.compile(r'^ {0,3}\[([^\]]+)\]:[ \t]*<?([^\s>]+)>?(?:[ \t]+["\'(](.*)["\')])?[ \t]*$')
+MD_TASK_PATTERN = re.compile(r'^\[([ xX])\][ \t]+')
+MD_ENTITY_PATTERN = re.compile(r'&(?:#\d+|#[xX][0-9a-fA-F]+|[a-zA-Z][a-zA-Z0-9]*);')
+MD_AUTOLINK_PATTERN = re.compile(r'<((?:https?|ftp)://[^\s<>]+|mailto:[^\s<>]+|[^\s<>@]+@[^\s<>@]+\.[^\s<>@]+)>')
+MD_BARE_URL_PATTERN = re.compile(r'(?:https?://|www\.)[^\s<]*[^\s<?!.,:*_~)\]\'"]')
+MD_OPEN_TAG = r'<[a-zA-Z][a-zA-Z0-9-]*(?:\s+[a-zA-Z_:][\w.:-]*(?:\s*=\s*(?:[^\s"\'=<>`]+|\'[^\']*\'|"[^"]*"))?)*\s*/?>'
+MD_CLOSE_TAG = r'</[a-zA-Z][a-zA-Z0-9-]*\s*>'
+MD_INLINE_HTML_PATTERN = re.compile(r'<!--[\s\S]*?-->|' + MD_OPEN_TAG + '|' + MD_CLOSE_TAG)
+# HTML 块（CommonMark 的 7 种起始条件）：(起始模式, 结束模式)，结束模式为 None 时到空行结束
+MD_HTML_BLOCK_TAGS = (
+    'address|article|aside|base|basefont|blockquote|body|caption|center|col|colgroup|dd|details|dialog|dir|div|dl|dt'
+    '|fieldset|figcaption|figure|footer|form|frame|frameset|h[1-6]|head|header|hr|html|iframe|legend|li|link|main'
+    '|menu|menuitem|nav|noframes|ol|optgroup|option|p|param|search|section|summary|table|tbody|td|tfoot|th|thead'
+    '|title|tr|track|ul'
+)
+MD_HTML_BLOCK_PATTERNS = (
+    (re.compile(r'^ {0,3}<(?:script|pre|style|textarea)(?:\s|>|$)', re.IGNORECASE),
+     re.compile(r'</(?:script|pre|style|textarea)>', re.IGNORECASE)),
+    (re.compile(r'^ {0,3}<!--'), re.compile(r'-->')),
+    (re.compile(r'^ {0,3}<\?'), re.compile(r'\?>')),
+    (re.compile(r'^ {0,3}<![a-zA-Z]'), re.compile(r'>')),
+    (re.compile(r'^ {0,3}<!\[CDATA\['), re.compile(r'\]\]>')),
+    (re.compile(r'^ {0,3}</?(?:' + MD_HTML_BLOCK_TAGS + r')(?:\s|/?>|$)', re.IGNORECASE), None),
+)
+# 第 7 种：单独一行的完整标签，不能打断段落
+MD_HTML_TAG_LINE_PATTERN = re.compile(r'^ {0,3}(?:' + MD_OPEN_TAG + '|' + MD_CLOSE_TAG + r')\s*$')
+MD_LINK_TARGET_PATTERN = re.compile(r'\(\s*<?([^\s>()]*(?:\([^\s()]*\)[^\s>()]*)*)>?(?:\s+(?:"([^"]*)"|\'([^\']*)\'|\(([^)]*)\)))?\s*\)')
+MD_EMPHASIS_PATTERNS = (
+    ('strong', re.compile(r'\*\*(?=\S)(.+?)(?<=\S)\*\*(?!\*)', re.DOTALL)),
+    ('strong', re.compile(r'__(?=\S)(.+?)(?<=\S)__(?!\w)', re.DOTALL)),
+    ('del', re.compile(r'~~(?=\S)(.+?)(?<=\S)~~', re.DOTALL)),
+    ('em', re.compile(r'\*(?=[^\s*])(.+?)(?<=[^\s*])\*(?!\*)', re.DOTALL)),
+    ('em', re.compile(r'_(?=[^\s_])(.+?)(?<=[^\s_])_(?!\w)', re.DOTALL)),
+)
+MD_UNSAFE_URL_PATTERN = re.compile(r'^\s*(?:javascript|vbscript|data(?!:image/(?:png|gif|jpe?g|webp);)):', re.IGNORECASE)
+# 原始 HTML 白名单，与页面脚本中 DOMPurify 的默认配置一致：其他标签去掉但保留内容，注释直接删除
+HTML_ALLOWED_TAGS = frozenset((
+    'a abbr acronym address area article aside audio b bdi bdo big blink blockquote br button canvas caption center '
+    'cite code col colgroup data datalist dd del details dfn dialog dir div dl dt em fieldset figcaption figure font '
+    'footer form h1 h2 h3 h4 h5 h6 header hgroup hr i img input ins kbd label legend li main map mark marquee menu '
+    'menuitem meter nav nobr ol optgroup option output p picture pre progress q rp rt ruby s samp search section '
+    'select small source spacer span strike strong style sub summary sup table tbody td textarea tfoot th thead time '
+    'tr track tt u ul var video wbr'
+).split())
+HTML_ALLOWED_ATTRIBUTES = frozenset((
+    'accept action align alt autocapitalize autocomplete autopictureinpicture autoplay background bgcolor border '
+    'capture cellpadding cellspacing checked cite class clear color cols colspan controls controlslist coords '
+    'crossorigin datetime decoding default dir disabled disablepictureinpicture disableremoteplayback download '
+    'draggable enctype enterkeyhint face for headers height hidden high href hreflang id inputmode integrity ismap '
+    'kind label lang list loading loop low max maxlength media method min minlength multiple muted name nonce '
+    'noshade novalidate nowrap open optimum pattern placeholder playsinline popover popovertarget '
+    'popovertargetaction poster preload pubdate radiogroup readonly rel required rev reversed role rows rowspan '
+    'spellcheck scope selected shape size sizes slot span srclang start src srcset step style summary tabindex '
+    'title translate type usemap valign value width wrap xmlns'
+).split())
+# 连同内容一起删除的标签
+HTML_DROP_CONTENT_TAGS = frozenset((
+    'script iframe noscript noembed noframes object embed template title xmp plaintext svg math head'
+).split())
+HTML_VOID_TAGS = frozenset('area base br col embed hr img input link meta source track wbr'.split())
+HTML_URL_ATTRIBUTES = frozenset(('href', 'src', 'action', 'formaction', 'poster', 'background', 'cite', 'xlink:href'))
+HTML_DATA_URI_TAGS = frozenset(('img', 'audio', 'video', 'source', 'track', 'picture'))
+HTML_DATA_ATTRIBUTE_PATTERN = re.compile(r'^(?:data|aria)-[\w.·-￿-]+$')
+HTML_ATTRIBUTE_WHITESPACE = re.compile('[\\u0000-\\u0020\\u00a0\\u1680\\u180e\\u2000-\\u2029\\u205f\\u3000]')
+HTML_SAFE_URL_PATTERN = re.compile(
+    r'^(?:(?:https?|ftps?|mailto|tel|callto|sms|cid|xmpp|matrix):|[^a-z]|[a-z+.\-]+(?:[^a-z+.\-:]|$))',
+    re.IGNORECASE,
+)
+
+def escape_markdown_text(text):
+    """转义 HTML 特殊字符，保留已有的实体（与 marked 的 escape 一致）"""
+    parts = []
+    last = 0
+    for match in MD_ENTITY_PATTERN.finditer(text):
+        parts.append(escape(text[last:match.start()]).replace('&#x27;', '&#39;'))
+        parts.append(match.group(0))
+        last = match.end()
+    parts.append(escape(text[last:]).replace('&#x27;', '&#39;'))
+    return ''.join(parts)
+
+def escape_markdown_code(text):
+    """转义代码内容，代码中的实体也原样显示"""
+    return escape(text).replace('&#x27;', '&#39;')
+
+def clean_markdown_url(url):
+    """过滤危险协议并按 encodeURI 规则编码链接"""
+    url = unescape(url)
+    if MD_UNSAFE_URL_PATTERN.match(url):
+        return None
+    return escape(quote(url, safe="!#$&'()*+,/:;=?@[]~%-._"))
+
+class HTMLSanitizer(HTMLParser):
+    """按白名单过滤 HTML，对应页面脚本中的 DOMPurify.sanitize
+
+    文本和实体原样保留；属性值按白名单过滤并重新转义；没有闭合的标签在末尾补上闭合标签，
+    多余的闭合标签直接丢弃，与浏览器解析后再序列化的结果一致。
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=False)
+        self.out = []
+        self.open_tags = []
+        self.skip_tag = None
+        self.skip_depth = 0
+
+    def handle_starttag(self, tag, attrs):
+        if self.skip_tag:
+            self.skip_depth += tag == self.skip_tag
+            return
+        if tag in HTML_DROP_CONTENT_TAGS:
+            self.skip_tag, self.skip_depth = tag, 1
+            return
+        if tag not in HTML_ALLOWED_TAGS:
+            return
+        self.out.append(f'<{tag}{self.format_attributes(tag, attrs)}>')
+        if tag not in HTML_VOID_TAGS:
+            self.open_tags.append(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        # 浏览器忽略 HTML 标签的自闭合斜杠
+        self.handle_starttag(tag, attrs)
+
+    def handle_endtag(self, tag):
+        if self.skip_tag:
+            if tag == self.skip_tag:
+                self.skip_depth -= 1
+                if not self.skip_depth:
+                    self.skip_tag = None
+            return
+        if tag not in self.open_tags:
+            return
+        while self.open_tags:
+            open_tag = self.open_tags.pop()
+            self.out.append(f'</{open_tag}>')
+            if open_tag == tag:
+                break
+
+    def handle_data(self, data):
+        if self.skip_tag:
+            return
+        if not self.open_tags or self.open_tags[-1] != 'style':
+            data = data.replace('<', '&lt;')
+        self.out.append(data)
+
+    def handle_entityref(self, name):
+        if not self.skip_tag:
+            self.out.append(f'&{name};')
+
+    def handle_charref(self, name):
+        if not self.skip_tag:
+            self.out.append(f'&#{name};')
+
+    def format_attributes(self, tag, attrs):
+        parts = []
+        for name, value in attrs:
+            if name not in HTML_ALLOWED_ATTRIBUTES and not HTML_DATA_ATTRIBUTE_PATTERN.match(name):
+                continue
+            value = value or ''
+            if name in HTML_URL_ATTRIBUTES:
+                url = HTML_ATTRIBUTE_WHITESPACE.sub('', value)
+                is_data_uri = url.lower().startswith('data:') and tag in HTML_DATA_URI_TAGS and name == 'src'
+                if not is_data_uri and not HTML_SAFE_URL_PATTERN.match(url):
+                    continue
+            parts.append(f' {name}="{escape(value)}"')
+        return ''.join(parts)
+
+    def close(self):
+        super().close()
+        while self.open_tags:
+            self.out.append(f'</{self.open_tags.pop()}>')
+
+def sanitize_html(html):
+    """过滤渲染结果中的原始 HTML，删除注释和不在白名单中的标签、属性"""
+    sanitizer = HTMLSanitizer()
+    sanitizer.feed(html)
+    sanitizer.close()
+    return ''.join(sanitizer.out)
+
+def get_line_indent(line):
+    """计算行首缩进（制表符按 4 个空格计算）"""
+    indent = 0
+    for char in line:
+        if char == ' ':
+            indent += 1
+        elif char == '\t':
+            indent += 4 - indent % 4
+        else:
+            break
+    return indent
+
+def strip_line_indent(line, width):
+    """去掉最多 width 列的行首缩进"""
+    removed = 0
+    index = 0
+    while index < len(line) and removed < width:
+        if line[index] == ' ':
+            removed += 1
+        elif line[index] == '\t':
+            tab_width = 4 - removed % 4
+            if removed + tab_width > width:
+                return ' ' * (removed + tab_width - width) + line[index + 1:]
+            removed += tab_width
+        else:
+            break
+        index += 1
+    return line[index:]
+
+def split_table_row(line):
+    """拆分表格行，忽略首尾竖线和转义的竖线"""
+    line = line.strip()
+    if line.startswith('|'):
+        line = line[1:]
+    if line.endswith('|') and not line.endswith('\\|'):
+        line = line[:-1]
+    cells = re.split(r'(?<!\\)\|', line)
+    return [cell.strip().replace('\\|', '|') for cell in cells]
+
+class MarkdownRenderer:
+    """把 Markdown 渲染成与 marked.js（gfm + breaks）一致的 HTML"""
+
+    def __init__(self, highlighter=None):
+        self.references = {}
+        self.highlighter = highlighter
+        # 输出中是否包含原样保留的 HTML，有时需要再经过 sanitize_html
+        self.has_raw_html = False
+
+    def render(self, text):
+        lines = text.replace('\r\n', '\n').replace('\r', '\n').split('\n')
+        lines = self.collect_references(lines)
+        return ''.join(html for _, html in self.parse_blocks(lines))
+
+    def collect_references(self, lines):
+        """提取链接引用定义 [id]: url "title"，代码块中的内容除外"""
+        remaining = []
+        fence = None
+        for line in lines:
+            fence_match = MD_FENCE_PATTERN.match(line)
+            if fence_match and (fence is None or fence_match.group(2)[0] == fence[0] and len(fence_match.group(2)) >= len(fence)):
+                fence = None if fence else fence_match.group(2)
+            if fence is None:
+                ref_match = MD_REFERENCE_PATTERN.match(line)
+                if ref_match:
+                    label = ref_match.group(1).strip().lower()
+                    self.references.setdefault(label, (ref_match.group(2), ref_match.group(3)))
+                    continue
+            remaining.append(line)
+        return remaining
+
+    # ---- 块级元素 ----
+
+    def starts_block(self, line):
+        """判断一行是否会打断段落"""
+        return bool(
+            MD_FENCE_PATTERN.match(line)
+            or self.match_html_block(line, interrupting=True)
+            or MD_HEADING_PATTERN.match(line)
+            or MD_HR_PATTERN.match(line)
+            or line.lstrip(' ').startswith('>')
+            or self.match_list_item(line, interrupting=True)
+        )
+
+    def match_html_block(self, line, interrupting=False):
+        """判断一行是否开始 HTML 块，返回 (结束模式,)；单独一行的完整标签不能打断段落"""
+        for start_pattern, end_pattern in MD_HTML_BLOCK_PATTERNS:
+            if start_pattern.match(line):
+                return (end_pattern,)
+        if not interrupting and MD_HTML_TAG_LINE_PATTERN.match(line):
+            return (None,)
+        return None
+
+    def match_list_item(self, line, interrupting=False):
+        match = MD_LIST_PATTERN.match(line)
+        if not match:
+            return None
+        if interrupting:
+            # 列表打断段落时必须有内容，有序列表只能从 1 开始
+            if not line[match.end():].strip():
+                return None
+            if match.group(2)[0].isdigit() and int(match.group(2)[:-1]) != 1:
+                return None
+        return match
+
+    def parse_blocks(self, lines):
+        """解析块级元素，返回 (类型, HTML) 列表"""
+        blocks = []
+        i = 0
+        count = len(lines)
+        while i < count:
+            line = lines[i]
+            if not line.strip():
+                i += 1
+                continue
+
+            fence_match = MD_FENCE_PATTERN.match(line)
+            if fence_match:
+                i = self.parse_fence(lines, i, fence_match, blocks)
+                continue
+
+            if get_line_indent(line) >= 4:
+                i = self.parse_indented_code(lines, i, blocks)
+                continue
+
+            html_block = self.match_html_block(line)
+            if html_block:
+                i = self.parse_html_block(lines, i, html_block[0], blocks)
+                continue
+
+            heading_match = MD_HEADING_PATTERN.match(line)
+            if heading_match:
+                level = len(heading_match.group(1))
+                text = self.render_inline((heading_match.group(2) or '').strip())
+                blocks.append(('heading', f'<h{level}>{text}</h{level}>\n'))
+                i += 1
+                continue
+
+            if MD_HR_PATTERN.match(line):
+                blocks.append(('hr', '<hr>\n'))
+                i += 1
+                continue
+
+            if line.lstrip(' ').startswith('>'):
+                i = self.parse_blockquote(lines, i, blocks)
+                continue
+
+            list_match = self.match_list_item(line)
+            if list_match:
+                i = self.parse_list(lines, i, blocks)
+                continue
+
+            if '|' in line and i + 1 < count and MD_TABLE_DELIMITER_PATTERN.match(lines[i + 1]):
+                header = split_table_row(line)
+                aligns = split_table_row(lines[i + 1])
+                if len(header) == len(aligns):
+                    i = self.parse_table(lines, i, header, aligns, blocks)
+                    continue
+
+            i = self.parse_paragraph(lines, i, blocks)
+        return blocks
+
+    def parse_fence(self, lines, i, fence_match, blocks):
+        indent = len(fence_match.group(1))
+        fence = fence_match.group(2)
+        lang = fence_match.group(3).split()[0] if fence_match.group(3).strip() else ''
+        code_lines = []
+        i += 1
+        while i < len(lines):
+            close_match = MD_FENCE_PATTERN.match(lines[i])
+            if (close_match and not close_match.group(3)
+                    and close_match.group(2)[0] == fence[0]
+                    and len(close_match.group(2)) >= len(fence)):
+                i += 1
+                break
+            code_lines.append(strip_line_indent(lines[i], indent))
+            i += 1
+        code_text = '\n'.join(code_lines)
+        highlighted = self.highlighter(code_text, lang) if lang and self.highlighter else None
+        code = (highlighted if highlighted is not None else escape_markdown_code(code_text)) + '\n'
+        if lang:
+            blocks.append(('code', f'<pre><code class="language-{escape(lang)}">{code}</code></pre>\n'))
+        else:
+            blocks.append(('code', f'<pre><code>{code}</code></pre>\n'))
+        return i
+
+    def parse_html_block(self, lines, i, end_pattern, blocks):
+        """原样保留 HTML 块：到结束模式所在行为止，没有结束模式时到空行为止"""
+        html_lines = []
+        while i < len(lines):
+            line = lines[i]
+            if end_pattern is None and not line.strip():
+                break
+            html_lines.append(line)
+            i += 1
+            if end_pattern is not None and end_pattern.search(line):
+                break
+        self.has_raw_html = True
+        blocks.append(('html', '\n'.join(html_lines) + '\n'))
+        return i
+
+    def parse_indented_code(self, lines, i, blocks):
+        code_lines = []
+        while i < len(lines) and (not lines[i].strip() or get_line_indent(lines[i]) >= 4):
+            code_lines.append(strip_line_indent(lines[i], 4))
+            i += 1
+        while code_lines and not code_lines[-1].strip():
+            code_lines.pop()
+        code = escape_markdown_code('\n'.join(code_lines)) + '\n'
+        blocks.append(('code', f'<pre><code>{code}</code></pre>\n'))
+        return i
+
+    def parse_blockquote(self, lines, i, blocks):
+        quote_lines = []
+        while i < len(lines):
+            line = lines[i]
+            stripped = line.lstrip(' ')
+            if stripped.startswith('>'):
+                content = stripped[1:]
+                quote_lines.append(content[1:] if content.startswith(' ') else content)
+            elif line.strip() and quote_lines and quote_lines[-1].strip() and not self.starts_block(line):
+                # 懒惰续行：段落后没有 > 的普通行仍属于引用
+                quote_lines.append(line)
+            else:
+                break
+            i += 1
+        inner = ''.join(html for _, html in self.parse_blocks(quote_lines))
+        blocks.append(('blockquote', f'<blockquote>\n{inner}</blockquote>\n'))
+        return i
+
+    def parse_list(self, lines, i, blocks):
+        first_match = self.match_list_item(lines[i])
+        ordered = first_match.group(2)[0].isdigit()
+        bullet = first_match.group(2)[-1]
+        start = int(first_match.group(2)[:-1]) if ordered else None
+
+        def continues_list(line):
+            match = self.match_list_item(line)
+            return match and match.group(2)[0].isdigit() == ordered and match.group(2)[-1] == bullet
+
+        items = []
+        loose = False
+        while i < len(lines) and continues_list(lines[i]):
+            match = self.match_list_item(lines[i])
+            marker_width = len(match.group(1)) + len(match.group(2))
+            spacing = match.group(3)
+            content_indent = marker_width + (len(spacing) if 0 < len(spacing) <= 4 else 1)
+            item_lines = [lines[i][match.end():] if len(spacing) <= 4 else lines[i][marker_width + 1:]]
+            i += 1
+
+            ended_with_blank = False
+            while i < len(lines):
+                line = lines[i]
+                if not line.strip():
+                    item_lines.append('')
+                    i += 1
+                    continue
+                indent = get_line_indent(line)
+                if indent >= content_indent:
+                    item_lines.append(strip_line_indent(line, content_indent))
+                    i += 1
+                    continue
+                previous_blank = not item_lines[-1].strip()
+                if not previous_blank and not self.starts_block(line) and not self.match_list_item(line):
+                    # 懒惰续行
+                    item_lines.append(line.strip())
+                    i += 1
+                    continue
+                break
+
+            while item_lines and not item_lines[-1].strip():
+                item_lines.pop()
+                ended_with_blank = True
+            next_is_item = i < len(lines) and continues_list(lines[i])
+            if ended_with_blank and next_is_item:
+                loose = True
+            inner_text = '\n'.join(item_lines)
+            if re.search(r'\n[ \t]*\n(?=\S)', inner_text.strip('\n')) and not self.blank_only_in_code(item_lines):
+                loose = True
+            items.append(item_lines)
+
+            if ended_with_blank and not next_is_item:
+                break
+
+        tag = 'ol' if ordered else 'ul'
+        start_attr = f' start="{start}"' if ordered and start != 1 else ''
+        html = [f'<{tag}{start_attr}>\n']
+        for item_lines in items:
+            html.append(self.render_list_item(item_lines, loose))
+        html.append(f'</{tag}>\n')
+        blocks.append(('list', ''.join(html)))
+        return i
+
+    def blank_only_in_code(self, item_lines):
+        """空行全部位于代码块内时不算松散列表"""
+        in_fence = False
+        seen_content = False
+        for line in item_lines:
+            if MD_FENCE_PATTERN.match(line):
+                in_fence = not in_fence
+            if not line.strip() and not in_fence and seen_content:
+                return False
+            seen_content = seen_content or bool(line.strip())
+        return True
+
+    def render_list_item(self, item_lines, loose):
+        checkbox = ''
+        if item_lines:
+            task_match = MD_TASK_PATTERN.match(item_lines[0])
+            if task_match:
+                checked = ' checked=""' if task_match.group(1).lower() == 'x' else ''
+                checkbox = f'<input{checked} disabled="" type="checkbox"> '
+                item_lines = [item_lines[0][task_match.end():]] + item_lines[1:]
+
+        parts = []
+        for kind, html in self.parse_blocks(item_lines):
+            if kind == 'paragraph' and not loose:
+                html = html[len('<p>'):-len('</p>\n')]
+                if parts and not parts[-1].endswith('\n'):
+                    parts.append('\n')
+            parts.append(html)
+        body = ''.join(parts)
+        if loose and body.startswith('<p>'):
+            body = '<p>' + checkbox + body[len('<p>'):]
+        else:
+            body = checkbox + body
+        return f'<li>{body}</li>\n'
+
+    def parse_table(self, lines, i, header, aligns, blocks):
+        align_values = []
+        for cell in aligns:
+            if cell.startswith(':') and cell.endswith(':'):
+                align_values.append('center')
+            elif cell.endswith(':'):
+                align_values.append('right')
+            elif cell.startswith(':'):
+                align_values.append('left')
+            else:
+                align_values.append(None)
+
+        def render_row(cells, cell_tag):
+            row = ['<tr>\n']
+            for index, align in enumerate(align_values):
+                cell = cells[index] if index < len(cells) else ''
+                align_attr = f' align="{align}"' if align else ''
+                row.append(f'<{cell_tag}{align_attr}>{self.render_inline(cell)}</{cell_tag}>\n')
+            row.append('</tr>\n')
+            return ''.join(row)
+
+        html = ['<table>\n<thead>\n', render_row(header, 'th'), '</thead>\n']
+        i += 2
+        body_rows = []
+        while i < len(lines) and lines[i].strip() and not self.starts_block(lines[i]):
+            body_rows.append(render_row(split_table_row(lines[i]), 'td'))
+            i += 1
+        if body_rows:
+            html.append('<tbody>' + ''.join(body_rows) + '</tbody>')
+        html.append('</table>\n')
+        blocks.append(('table', ''.join(html)))
+        return i
+
+    def parse_paragraph(self, lines, i, blocks):
+        para_lines = [lines[i].strip()]
+        i += 1
+        while i < len(lines):
+            line = lines[i]
+            if not line.strip():
+                break
+            setext_match = MD_SETEXT_PATTERN.match(line)
+            if setext_match:
+                level = 1 if setext_match.group(1)[0] == '=' else 2
+                text = self.render_inline('\n'.join(para_lines))
+                blocks.append(('heading', f'<h{level}>{text}</h{level}>\n'))
+                return i + 1
+            if self.starts_block(line):
+                break
+            if '|' in line and i + 1 < len(lines) and MD_TABLE_DELIMITER_PATTERN.match(lines[i + 1]):
+                break
+            para_lines.append(line.strip())
+            i += 1
+        blocks.append(('paragraph', f'<p>{self.render_inline(chr(10).join(para_lines))}</p>\n'))
+        return i
+
+    # ---- 行内元素 ----
+
+    def render_inline(self, text):
+        out = []
+        buffer = []
+        i = 0
+        length = len(text)
+
+        def flush():
+            if buffer:
+                out.append(escape_markdown_text(''.join(buffer)))
+                buffer.clear()
+
+        while i < length:
+            char = text[i]
+
+            if char == '\\' and i + 1 < length:
+                if text[i + 1] in MARKDOWN_ESCAPABLE:
+                    flush()
+                    out.append(escape_markdown_code(text[i + 1]))
+                    i += 2
+                    continue
+                if text[i + 1] == '\n':
+                    flush()
+                    out.append('<br>')
+                    i += 2
+                    continue
+
+            if char == '`':
+                run_end = i
+                while run_end < length and text[run_end] == '`':
+                    run_end += 1
+                fence = text[i:run_end]
+                close = text.find(fence, run_end)
+                while close != -1 and close + len(fence) < length and text[close + len(fence)] == '`':
+                    close = text.find(fence, close + len(fence) + 1)
+                if close != -1:
+                    flush()
+                    code = text[run_end:close].replace('\n', ' ')
+                    if len(code) > 2 and code.startswith(' ') and code.endswith(' ') and code.strip():
+                        code = code[1:-1]
+                    out.append(f'<code>{escape_markdown_code(code)}</code>')
+                    i = close + len(fence)
+                    continue
+                buffer.append(fence)
+                i = run_end
+                continue
+
+            if char == '\n':
+                flush()
+                # breaks: true，段落中的换行都转为 <br>
+                while out and out[-1].endswith(' '):
+                    out[-1] = out[-1].rstrip(' ')
+                out.append('<br>')
+                i += 1
+                while i < length and text[i] == ' ':
+                    i += 1
+                continue
+
+            if char == '<':
+                autolink_match = MD_AUTOLINK_PATTERN.match(text, i)
+                if autolink_match:
+                    flush()
+                    target = autolink_match.group(1)
+                    href = target if ':' in target.split('@')[0] else f'mailto:{target}'
+                    out.append(f'<a href="{escape(href)}">{escape_markdown_text(target)}</a>')
+                    i = autolink_match.end()
+                    continue
+                html_match = MD_INLINE_HTML_PATTERN.match(text, i)
+                if html_match:
+                    flush()
+                    self.has_raw_html = True
+                    out.append(html_match.group(0))
+                    i = html_match.end()
+                    continue
+
+            if char == '!' and text.startswith('![', i):
+                result = self.match_link(text, i + 1)
+                if result:
+                    flush()
+                    label, href, title, end = result
+                    src = clean_markdown_url(href)
+                    alt = self.plain_text(label)
+                    if src is None:
+                        out.append(alt)
+                    else:
+                        title_attr = f' title="{escape(title)}"' if title else ''
+                        out.append(f'<img src="{src}" alt="{alt}"{title_attr} loading="lazy">')
+                    i = end
+                    continue
+
+            if char == '[':
+                result = self.match_link(text, i)
+                if result:
+                    flush()
+                    label, href, title, end = result
+                    target = clean_markdown_url(href)
+                    inner = self.render_inline(label)
+                    if target is None:
+                        out.append(inner)
+                    else:
+                        title_attr = f' title="{escape(title)}"' if title else ''
+                        out.append(f'<a href="{target}"{title_attr}>{inner}</a>')
+                    i = end
+                    continue
+
+            if char in '*_~':
+                emphasis = self.match_emphasis(text, i)
+                if emphasis:
+                    flush()
+                    tag, inner, end = emphasis
+                    out.append(f'<{tag}>{self.render_inline(inner)}</{tag}>')
+                    i = end
+                    continue
+
+            if char in 'hw' and (i == 0 or not text[i - 1].isalnum()):
+                url_match = MD_BARE_URL_PATTERN.match(text, i)
+                if url_match:
+                    flush()
+                    url = url_match.group(0)
+                    href = url if url.startswith('http') else f'http://{url}'
+                    out.append(f'<a href="{clean_markdown_url(href)}">{escape_markdown_text(url)}</a>')
+                    i = url_match.end()
+                    continue
+
+            buffer.append(char)
+            i += 1
+
+        flush()
+        return ''.join(out).rstrip(' ')
+
+    def match_link(self, text, i):
+        """匹配 [文本](链接 "标题") 或引用式链接，返回 (文本, 链接, 标题, 结束位置)"""
+        depth = 0
+        j = i
+        while j < len(text):
+            if text[j] == '\\':
+                j += 2
+                continue
+            if text[j] == '`':
+                close = text.find('`', j + 1)
+                j = close + 1 if close != -1 else j + 1
+                continue
+            if text[j] == '[':
+                depth += 1
+            elif text[j] == ']':
+                depth -= 1
+                if depth == 0:
+                    break
+            j += 1
+        else:
+            return None
+
+        label = text[i + 1:j]
+        target_match = MD_LINK_TARGET_PATTERN.match(text, j + 1)
+        if target_match:
+            title = target_match.group(2) or target_match.group(3) or target_match.group(4)
+            return label, target_match.group(1), title, target_match.end()
+
+        ref_end = j + 1
+        ref_label = label
+        if text.startswith('[', j + 1):
+            close = text.find(']', j + 2)
+            if close != -1:
+                ref_label = text[j + 2:close] or label
+                ref_end = close + 1
+        reference = self.references.get(ref_label.strip().lower())
+        if reference:
+            return label, reference[0], reference[1], ref_end
+        return None
+
+    def match_emphasis(self, text, i):
+        for tag, pattern in MD_EMPHASIS_PATTERNS:
+            match = pattern.match(text, i)
+            if not match:
+                continue
+            # 下划线强调不能出现在单词中间
+            if text[i] == '_' and i > 0 and text[i - 1].isalnum():
+                continue
+            return tag, match.group(1), match.end()
+        return None
+
+    def plain_text(self, text):
+        """图片 alt 等场景使用的纯文本（已转义）：按行内规则渲染后只保留文字，与 marked 的 TextRenderer 一致"""
+        html = re.sub(r'<img src="[^"]*" alt="([^"]*)"[^>]*>', r'\1', self.render_inline(text))
+        return re.sub(r'<[^>]*>', '', html)
+
+# 构建时代码高亮：输出与 Prism.js 相同的 token 类名，直接套用 prism-tomorrow 主题
+HIGHLIGHT_ALIASES = {
+    'py': 'python',
+    'js': 'javascript',
+    'sh': 'bash',
+    'shell': 'bash',
+    'yml': 'yaml',
+    'md': 'markdown',
+    'cs': 'csharp',
+    'c#': 'csharp',
+    'dotnet': 'csharp',
+}
+HIGHLIGHT_GRAMMARS = {
+    'python': [
+        ('string', r'(?i:[rub]|rb|br|f|rf|fr)?(?:"""[\s\S]*?"""|\'\'\'[\s\S]*?\'\'\')'),
+        ('comment', r'#.*'),
+        ('string', r'(?i:[rub]|rb|br|f|rf|fr)?(?:"(?:\\.|[^\\"\n])*"|\'(?:\\.|[^\\\'\n])*\')'),
+        ('decorator annotation punctuation', r'^[ \t]*@[\w.]+'),
+        ('keyword', r'\b(?:and|as|assert|async|await|break|class|continue|def|del|elif|else|except|exec|finally|for|from|global|if|import|in|is|lambda|nonlocal|not|or|pass|print|raise|return|try|while|with|yield)\b'),
+        ('boolean', r'\b(?:False|None|True)\b'),
+        ('builtin', r'\b(?:abs|all|any|bool|bytes|callable|chr|dict|dir|enumerate|filter|float|format|getattr|hasattr|hash|input|int|isinstance|iter|len|list|map|max|min|next|object|open|ord|range|repr|reversed|round|set|setattr|sorted|str|sum|super|tuple|type|zip)\b(?=\s*\()'),
+        ('class-name', r'(?<=\bclass )[A-Za-z_]\w*'),
+        ('function', r'[A-Za-z_]\w*(?=\s*\()'),
+        ('number', r'\b0[box][\da-f_]+\b|(?:\b\d[\d_]*(?:\.\d[\d_]*)?|\B\.\d[\d_]*)(?:e[+-]?\d+)?j?\b'),
+        ('operator', r'[-+%=]=?|!=|:=|\*\*?=?|//?=?|<[<=>]?|>[=>]?|[&|^~]'),
+        ('punctuation', r'[{}[\];(),.:]'),
+    ],
+    'javascript': [
+        ('comment', r'//.*|/\*[\s\S]*?\*/'),
+        ('template-string string', r'`(?:\\[\s\S]|[^\\`])*`'),
+        ('string', r'"(?:\\.|[^\\"\n])*"|\'(?:\\.|[^\\\'\n])*\''),
+        ('keyword', r'\b(?:as|async|await|break|case|catch|class|const|continue|debugger|default|delete|do|else|export|extends|finally|for|from|function|get|if|import|in|instanceof|let|new|null|of|return|set|static|super|switch|this|throw|try|typeof|undefined|var|void|while|with|yield)\b'),
+        ('boolean', r'\b(?:false|true)\b'),
+        ('class-name', r'(?:(?<=\bclass )|(?<=\bnew )|(?<=\bextends ))[A-Za-z_$][\w$]*'),
+        ('function', r'[A-Za-z_$][\w$]*(?=\s*(?:\(|=\s*(?:async\s*)?(?:function\b|\([^()]*\)\s*=>)))'),
+        ('number', r'\b(?:0[xX][\dA-Fa-f]+|0[bB][01]+|0[oO][0-7]+|NaN|Infinity)\b|(?:\b\d+(?:\.\d*)?|\B\.\d+)(?:[Ee][+-]?\d+)?'),
+        ('operator', r'--|\+\+|\*\*=?|=>|&&=?|\|\|=?|[!=]==|<<=?|>>>?=?|[-+*/%&|^!=<>]=?|\.{3}|\?\?=?|\?\.?|[~:]'),
+        ('punctuation', r'[{}[\];(),.]'),
+    ],
+    'css': [
+        ('comment', r'/\*[\s\S]*?\*/'),
+        ('atrule', r'@[\w-]+[^;{]*'),
+        ('url', r'\burl\((?:"[^"\n]*"|\'[^\'\n]*\'|[^)\n]*)\)'),
+        ('selector', r'[^{}\s;][^{};]*?(?=\s*\{)'),
+        ('string', r'"(?:\\.|[^\\"\n])*"|\'(?:\\.|[^\\\'\n])*\''),
+        ('property', r'(?<![-\w])--[-\w]+(?=\s*:)|\b[-\w]+(?=\s*:)'),
+        ('important', r'!important\b'),
+        ('function', r'[-a-zA-Z\d]+(?=\()'),
+        ('punctuation', r'[(){};:,]'),
+    ],
+    'bash': [
+        ('shebang important', r'\A#!.*'),
+        ('comment', r'(?<![\w$])#.*'),
+        ('string', r'"(?:\\[\s\S]|\$\([^)]*\)|[^\\"])*"|\'[^\']*\''),
+        ('variable', r'\$(?:\w+|[#?*!@$-]|\{[^}]*\}|\([^)]*\))'),
+        ('keyword', r'\b(?:case|do|done|elif|else|esac|fi|for|function|if|in|select|then|until|while)\b'),
+        ('builtin', r'\b(?:alias|cd|echo|eval|exec|exit|export|local|printf|pwd|read|readonly|return|set|shift|source|test|trap|type|unset)\b'),
+        ('function', r'\b(?:apt|apt-get|cat|chmod|chown|cp|curl|find|git|grep|ln|ls|mkdir|mv|npm|pip|python|python3|rm|sed|sudo|tar|touch|wget)\b'),
+        ('boolean', r'\b(?:false|true)\b'),
+        ('number', r'(?<![\w-])\d+(?:\.\d+)?\b'),
+        ('operator', r'\d?<>|>\||\+=|=[=~]?|!=?|<<[<-]?|[&\d]?>>|\d[<>]&?|[<>][&=]?|&[>&]?|\|[&|]?'),
+        ('punctuation', r'\$?\(\(?|\)\)?|\.\.|[{}[\];\\]'),
+    ],
+    'json': [
+        ('comment', r'//.*|/\*[\s\S]*?\*/'),
+        ('property', r'"(?:\\.|[^\\"\r\n])*"(?=\s*:)'),
+        ('string', r'"(?:\\.|[^\\"\r\n])*"'),
+        ('number', r'-?\b\d+(?:\.\d+)?(?:[eE][+-]?\d+)?\b'),
+        ('punctuation', r'[{}[\],]'),
+        ('operator', r':'),
+        ('boolean', r'\b(?:false|true)\b'),
+        ('null keyword', r'\bnull\b'),
+    ],
+    'yaml': [
+        ('comment', r'#.*'),
+        ('directive important', r'^%.*'),
+        ('key atrule', r'[^\s#:,[\]{}\'"-][^:#\n]*?(?=[ \t]*:(?:[ \t]|$))'),
+        ('string', r'"(?:\\.|[^\\"\n])*"|\'(?:\'\'|[^\'\n])*\''),
+        ('boolean important', r'(?<=[:\-\s[,{])(?:true|false|yes|no|on|off)\b(?=[ \t]*(?:$|[,\]}#]))'),
+        ('null important', r'(?<=[:\-\s[,{])(?:null|~)(?=[ \t]*(?:$|[,\]}#]))'),
+        ('number', r'(?<=[:\-\s[,{])[+-]?(?:0x[\da-f]+|0o[0-7]+|(?:\d[\d_]*(?:\.\d*)?|\.\d+)(?:e[+-]?\d+)?)(?=[ \t]*(?:$|[,\]}#]))'),
+        ('important', r'[&*][^\s,[\]{}]+'),
+        ('punctuation', r'^---|^\.\.\.|[-:,[\]{}?|>]'),
+    ],
+    'markdown': [
+        ('title important', r'^#{1,6}.+'),
+        ('blockquote punctuation', r'^>(?:[\t ]*>)*'),
+        ('code keyword', r'^(?:```|~~~).*'),
+        ('hr punctuation', r'^(?:[-*_][ \t]*){3,}$'),
+        ('list punctuation', r'^[ \t]*(?:[*+-]|\d+\.)(?=[ \t])'),
+        ('code-snippet code keyword', r'`[^`\n]+`'),
+        ('bold', r'\*\*[^*\n]+\*\*|__[^_\n]+__'),
+        ('italic', r'\*[^*\n]+\*|_[^_\n]+_'),
+        ('strike', r'~~[^~\n]+~~'),
+        ('url', r'!?\[[^\]\n]*\]\([^)\n]*\)'),
+    ],
+    'csharp': [
+        ('comment', r'//.*|/\*[\s\S]*?\*/'),
+        ('string', r'\$?@"(?:""|[^"])*"|@\$"(?:""|[^"])*"|\$?"(?:\\.|[^\\"\n])*"'),
+        ('char string', r"'(?:\\.|[^\\'\n]){1,6}'"),
+        ('preprocessor property', r'^[ \t]*#[ \t]*[a-z]+.*'),
+        ('keyword', r'\b(?:abstract|as|async|await|base|break|case|catch|checked|class|const|continue|default|delegate|do|else|enum|event|explicit|extern|finally|fixed|for|foreach|get|goto|if|implicit|in|interface|internal|is|lock|namespace|new|null|operator|out|override|params|partial|private|protected|public|readonly|record|ref|return|sealed|set|sizeof|stackalloc|static|struct|switch|this|throw|try|typeof|unchecked|unsafe|using|value|var|virtual|void|volatile|when|where|while|yield|bool|byte|char|decimal|double|dynamic|float|int|long|object|sbyte|short|string|uint|ulong|ushort)\b'),
+        ('boolean', r'\b(?:false|true)\b'),
+        ('class-name', r'(?:(?<=\bclass )|(?<=\bstruct )|(?<=\binterface )|(?<=\benum )|(?<=\bnew )|(?<=\brecord ))[A-Za-z_]\w*|\b[A-Z]\w*(?=(?:<[\w\s,<>\[\]]*>)?(?:\[\])?\s+@?[A-Za-z_]\w*\s*[=;,)({])'),
+        ('function', r'[A-Za-z_]\w*(?=\s*(?:<[\w\s,<>\[\]]*>)?\s*\()'),
+        ('number', r'\b0(?:[xX][\dA-Fa-f_]+|[bB][01_]+)[uUlL]{0,2}\b|(?:\b\d[\d_]*(?:\.\d[\d_]*)?|\B\.\d+)(?:[eE][+-]?\d+)?[fFdDmMuUlL]{0,2}\b'),
+        ('operator', r'>>=?|<<=?|[-=]>|--|\+\+|&&|\|\||~|\?\?=?|[-+*/%&|^!=<>]=?|\?'),
+        ('punctuation', r'[{}[\];(),.:]'),
+    ],
+}
+HIGHLIGHT_PATTERNS = {}
+
+def get_highlight_pattern(language):
+    """把语言规则合并成一个正则，按规则顺序匹配，首次使用时编译"""
+    if language not in HIGHLIGHT_PATTERNS:
+        rules = HIGHLIGHT_GRAMMARS[language]
+        pattern = re.compile(
+            '|'.join(f'(?P<t{index}>{rule})' for index, (_, rule) in enumerate(rules)),
+            re.MULTILINE,
+        )
+        token_types = {f't{index}': token for index, (token, _) in enumerate(rules)}
+        HIGHLIGHT_PATTERNS[language] = (pattern, token_types)
+    return HIGHLIGHT_PATTERNS[language]
+
+def normalize_highlight_language(language):
+    """把 js、cs 等别名转换成 Prism 的语言名"""
+    language = language.lower()
+    return HIGHLIGHT_ALIASES.get(language, language)
+
+def highlight_code(code, language, supported_languages):
+    """生成 Prism 风格的 token 标记，不支持的语言返回 None"""
+    language = normalize_highlight_language(language)
+    if language not in supported_languages or language not in HIGHLIGHT_GRAMMARS:
+        return None
+
+    pattern, token_types = get_highlight_pattern(language)
+    parts = []
+    last = 0
+    for match in pattern.finditer(code):
+        if match.start() == match.end():
+            continue
+        if match.start() > last:
+            parts.append(escape_markdown_code(code[last:match.start()]))
+        parts.append(f'<span class="token {token_types[match.lastgroup]}">{escape_markdown_code(match.group(0))}</span>')
+        last = match.end()
+    parts.append(escape_markdown_code(code[last:]))
+    return ''.join(parts)
+
+def get_code_highlighter(blog_config):
+    """根据 blog_config.json 的 supported_languages 创建高亮函数"""
+    supported_languages = {
+        normalize_highlight_language(language)
+        for language in blog_config.get('supported_languages', [])
+    }
+    return lambda code, language: highlight_code(code, language, supported_languages)
+
+def render_markdown(content, highlighter=None):
+    """把 Markdown 渲染为 HTML（对应 marked.parse 加 DOMPurify.sanitize）"""
+    renderer = MarkdownRenderer(highlighter)
+    html = renderer.render(content)
+    # 渲染器自身的输出已经转义，只有保留了原始 HTML 时才需要过滤
+    return sanitize_html(html) if renderer.has_raw_html else html
+
+def shift_heading_levels(html):
+    """h1-h5 各下调一级，与页面脚本的标题处理一致"""
+    return re.sub(
+        r'<(/?)h([1-5])(\s[^>]*)?>',
+        lambda m: f'<{m.group(1)}h{int(m.group(2)) + 1}{m.group(3) or ""}>',
+        html,
+    )
+
+def render_line_numbers(code_html):
+    """生成 Prism line-numbers 插件的行号结构"""
+    line_count = code_html.count('\n') + 1 - (1 if code_html.endswith('\n') else 0)
+    return '<span aria-hidden="true" class="line-numbers-rows">' + '<span></span>' * line_count + '</span>'
+
+def wrap_code_blocks(html, line_numbers=False):
+    """为代码块添加语言标签和复制按钮，与页面脚本输出的结构一致"""
+    html = re.sub(
+        r'<pre><code class="language-(.*?)">([\s\S]*?)</code></pre>',
+        lambda m: f'''
+<div class="code-block-wrapper">
+  <div class="code-block-header">
+    <span class="code-language">{m.group(1)}</span>
+    <button type="button" class="copy-button code-copy-button">
+      <i class="fas fa-copy"></i> 复制代码
+    </button>
+  </div>
+  <pre class="line-numbers language-{m.group(1)}"><code class="language-{m.group(1)}">{m.group(2)}{render_line_numbers(m.group(2)) if line_numbers else ''}</code></pre>
+</div>''',
+        html,
+    )
+    return re.sub(
+        r'<pre><code>([\s\S]*?)</code></pre>',
+        lambda m: f'''
+<div class="code-block-wrapper">
+  <div class="code-block-header">
+    <span class="code-language">Text</span>
+    <button type="button" class="copy-button code-copy-button">
+      <i class="fas fa-copy"></i> 复制代码
+    </button>
+  </div>
+  <pre class="line-numbers"><code>{m.group(1)}</code></pre>
+</div>''',
+        html,
+    )
+
+def render_article_html(content, highlighter=None):
+    """构建时生成最终的文章正文 HTML，传入 highlighter 时同时完成代码高亮和行号"""
+    html = shift_heading_levels(render_markdown(content, highlighter))
+    return wrap_code_blocks(html, line_numbers=highlighter is not None)
+
+# 文章页面模板（花括号已为 str.format 转义）
+POST_TEMPLATE = '''<!DOCTYPE html>
 <html lang="zh-CN">
 <head>
     <meta charset="UTF-8">
@@ -196,1175 +1930,11 @@ def create_post_html(post_data, post_filename):
     <link rel="preconnect" href="https://cdn.jsdelivr.net" crossorigin>
     <link rel="preconnect" href="https://images.unsplash.com">
     <link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.4.0/css/all.min.css" integrity="sha384-iw3OoTErCYJJB9mCa8LNS2hbsQ7M3C0EpIsO/H5+EGAkPGc6rk+V8i04oW/K5xq0" crossorigin="anonymous">
-    <!-- Marked.js 库 -->
-    <script defer src="https://cdn.jsdelivr.net/npm/marked@18.0.5/lib/marked.umd.js" integrity="sha384-ZD0fTOwPMHi7zM6WTVIWJR21I07lq0ccnqz3J6WMvQKG9thh4y7TA1QE6PJu0Af8" crossorigin="anonymous"></script>
-    <script defer src="https://cdn.jsdelivr.net/npm/dompurify@3.4.10/dist/purify.min.js" integrity="sha384-eguRoJERj8ghOpzO//Rl7+ScQsQIR1cH+ajll7+fG+IpbNPlkZsQn9h8ccr+wPXx" crossorigin="anonymous"></script>
-    <!-- Prism.js 代码高亮 -->
+    <!-- Prism.js 代码高亮主题 -->
     <link href="https://cdnjs.cloudflare.com/ajax/libs/prism/1.29.0/themes/prism-tomorrow.min.css" rel="stylesheet" integrity="sha384-wFjoQjtV1y5jVHbt0p35Ui8aV8GVpEZkyF99OXWqP/eNJDU93D3Ugxkoyh6Y2I4A" crossorigin="anonymous">
-    <script defer src="https://cdnjs.cloudflare.com/ajax/libs/prism/1.29.0/prism.min.js" integrity="sha384-06z5D//U/xpvxZHuUz92xBvq3DqBBFi7Up53HRrbV7Jlv7Yvh/MZ7oenfUe9iCEt" crossorigin="anonymous"></script>
-    <script defer src="https://cdnjs.cloudflare.com/ajax/libs/prism/1.29.0/components/prism-python.min.js" integrity="sha384-WJdEkJKrbsqw0evQ4GB6mlsKe5cGTxBOw4KAEIa52ZLB7DDpliGkwdme/HMa5n1m" crossorigin="anonymous"></script>
-    <script defer src="https://cdnjs.cloudflare.com/ajax/libs/prism/1.29.0/components/prism-javascript.min.js" integrity="sha384-D44bgYYKvaiDh4cOGlj1dbSDpSctn2FSUj118HZGmZEShZcO2v//Q5vvhNy206pp" crossorigin="anonymous"></script>
-    <script defer src="https://cdnjs.cloudflare.com/ajax/libs/prism/1.29.0/components/prism-css.min.js" integrity="sha384-0mV13Neu0xhJFylI+HV43C+XiR13bGSeL7D0/7e6hK7sJgvyvK6HVjeQwmvXTstY" crossorigin="anonymous"></script>
-    <script defer src="https://cdnjs.cloudflare.com/ajax/libs/prism/1.29.0/components/prism-bash.min.js" integrity="sha384-9WmlN8ABpoFSSHvBGGjhvB3E/D8UkNB9HpLJjBQFC2VSQsM1odiQDv4NbEo+7l15" crossorigin="anonymous"></script>
-    <script defer src="https://cdnjs.cloudflare.com/ajax/libs/prism/1.29.0/components/prism-json.min.js" integrity="sha384-RhrmFFMb0ZCHImjFMpR/UE3VEtIVTCtNrtKQqXCzqXZNJala02N3UbVhi+qzw3CY" crossorigin="anonymous"></script>
-    <script defer src="https://cdnjs.cloudflare.com/ajax/libs/prism/1.29.0/components/prism-markdown.min.js" integrity="sha384-s888ApkYHxfPsp8n81g77Unl/0XYnYltLvWbwqKHcheRE8/dZPlT4IjW3mRGv/Hd" crossorigin="anonymous"></script>
-    <script defer src="https://cdnjs.cloudflare.com/ajax/libs/prism/1.29.0/components/prism-yaml.min.js" integrity="sha384-AKAiycghK0jDCjD+aavMHzDkLzRR7Yzcwh3+xL/295cvyVMe+cxQfyQC8xxGGcI8" crossorigin="anonymous"></script>
-    <script defer src="https://cdnjs.cloudflare.com/ajax/libs/prism/1.29.0/components/prism-csharp.min.js" integrity="sha384-nMKYzg6yfy0qgpaRpVhHvZp0gT5sgvmZYlFC0XAKZSp+zFUB9rE6zsdmIEiou4bV" crossorigin="anonymous"></script>
-    <script defer src="https://cdnjs.cloudflare.com/ajax/libs/prism/1.29.0/plugins/line-numbers/prism-line-numbers.min.js" integrity="sha384-6QJu8apxMmB9TiPVWzYKF5pRgKcz7snO0/QU+MrWmgBLECQjoa6erxX2VQ5t41Jd" crossorigin="anonymous"></script>
     <link href="https://cdnjs.cloudflare.com/ajax/libs/prism/1.29.0/plugins/line-numbers/prism-line-numbers.min.css" rel="stylesheet" integrity="sha384-nUkTNLI8COlMCRJ0FHIdX76If83145OTCLUx4gQyfnO0gGeO/sD9czGEUBxtkcUv" crossorigin="anonymous">
-    <style>
-        /* 全局样式 */
-        :root {{
-            --primary-color: #4a6fa5;
-            --secondary-color: #32a852;
-            --text-color: #333;
-            --text-light: #6c757d;
-            --background-color: #f5f7fa;
-            --card-bg: #ffffff;
-            --border-color: #eaeaea;
-            --shadow: 0 4px 12px rgba(0,0,0,0.05);
-            --shadow-heavy: 0 8px 24px rgba(0,0,0,0.1);
-        }}
-        
-        * {{
-            margin: 0;
-            padding: 0;
-            box-sizing: border-box;
-        }}
-        
-        body {{
-            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', 'Helvetica Neue', Arial, sans-serif;
-            background-color: var(--background-color);
-            color: var(--text-color);
-            line-height: 1.8;
-            font-size: 16px;
-        }}
-        
-        a {{
-            color: var(--primary-color);
-            text-decoration: none;
-            transition: color 0.2s;
-        }}
-        
-        a:hover {{
-            color: var(--secondary-color);
-            text-decoration: underline;
-        }}
-
-        a:focus-visible,
-        button:focus-visible {{
-            outline: 3px solid rgba(50, 168, 82, 0.85);
-            outline-offset: 3px;
-        }}
-        
-        /* 布局容器 */
-        .container {{
-            max-width: 900px;
-            margin: 0 auto;
-            padding: 0 20px;
-        }}
-        
-        /* 头部样式 */
-        header {{
-            background-color: var(--card-bg);
-            box-shadow: var(--shadow);
-            position: sticky;
-            top: 0;
-            z-index: 1000;
-            backdrop-filter: blur(10px);
-            background-color: rgba(255, 255, 255, 0.95);
-        }}
-        
-        .header-inner {{
-            max-width: 900px;
-            margin: 0 auto;
-            padding: 15px 20px;
-            display: flex;
-            justify-content: space-between;
-            align-items: center;
-        }}
-        
-        .logo {{
-            font-size: 1.4rem;
-            font-weight: 700;
-            color: var(--primary-color);
-        }}
-        
-        .logo span {{
-            color: var(--secondary-color);
-        }}
-        
-        .back-link {{
-            color: var(--primary-color);
-            text-decoration: none;
-            font-size: 0.95rem;
-            display: inline-flex;
-            align-items: center;
-            padding: 6px 12px;
-            border-radius: 4px;
-            background-color: rgba(74, 111, 165, 0.1);
-        }}
-        
-        .back-link i {{
-            margin-right: 6px;
-        }}
-        
-        .back-link:hover {{
-            background-color: rgba(74, 111, 165, 0.2);
-            text-decoration: none;
-        }}
-        
-        /* 文章头部 */
-        .article-header {{
-            margin-top: 40px;
-            margin-bottom: 30px;
-            padding: 20px;
-            background-color: var(--card-bg);
-            border-radius: 12px;
-            box-shadow: var(--shadow);
-        }}
-        
-        .article-title {{
-            font-size: 2.2rem;
-            margin-bottom: 15px;
-            color: #166088;
-            line-height: 1.3;
-        }}
-        
-        .article-meta {{
-            display: flex;
-            flex-wrap: wrap;
-            gap: 20px;
-            align-items: center;
-            color: var(--text-light);
-            font-size: 0.9rem;
-            margin-top: 20px;
-            padding-top: 15px;
-            border-top: 1px solid var(--border-color);
-        }}
-        
-        .article-meta-item {{
-            display: flex;
-            align-items: center;
-        }}
-        
-        .article-meta-item i {{
-            margin-right: 6px;
-            font-size: 0.9em;
-        }}
-        
-        .mode-badge {{
-            background-color: rgba(50, 168, 82, 0.1);
-            color: var(--secondary-color);
-            padding: 3px 8px;
-            border-radius: 12px;
-            font-size: 0.8rem;
-            font-weight: 500;
-        }}
-        
-        /* 封面图片 */
-        .article-cover {{
-            margin: 30px 0;
-            border-radius: 12px;
-            overflow: hidden;
-            box-shadow: var(--shadow-heavy);
-        }}
-        
-        .article-cover img {{
-            width: 100%;
-            height: 320px;
-            aspect-ratio: 3 / 2;
-            object-fit: cover;
-            transition: transform 0.3s ease;
-        }}
-        
-        .article-cover:hover img {{
-            transform: scale(1.02);
-        }}
-        
-        /* Markdown 内容区域 */
-        .markdown-content {{
-            font-size: 1.05rem;
-            line-height: 1.7;
-            margin: 40px 0;
-        }}
-        
-        .markdown-content > *:first-child {{
-            margin-top: 0 !important;
-        }}
-        
-        .markdown-content h1,
-        .markdown-content h2,
-        .markdown-content h3,
-        .markdown-content h4 {{
-            margin-top: 2em;
-            margin-bottom: 1em;
-            color: #166088;
-            font-weight: 600;
-            line-height: 1.3;
-        }}
-        
-        .markdown-content h1 {{
-            font-size: 1.8rem;
-            border-bottom: 2px solid var(--border-color);
-            padding-bottom: 10px;
-        }}
-        
-        .markdown-content h2 {{
-            font-size: 1.5rem;
-        }}
-        
-        .markdown-content h3 {{
-            font-size: 1.2rem;
-        }}
-        
-        .markdown-content h4 {{
-            font-size: 1.1rem;
-        }}
-        
-        .markdown-content p {{
-            margin: 1.2em 0;
-            text-align: justify;
-        }}
-        
-        .markdown-content img {{
-            max-width: 100%;
-            height: auto;
-            display: block;
-            margin: 2em auto;
-            border-radius: 8px;
-            box-shadow: var(--shadow);
-        }}
-        
-        .markdown-content ul,
-        .markdown-content ol {{
-            margin: 1.2em 0 1.2em 2em;
-        }}
-        
-        .markdown-content li {{
-            margin-bottom: 0.5em;
-        }}
-        
-        .markdown-content li > ul,
-        .markdown-content li > ol {{
-            margin-top: 0.5em;
-            margin-bottom: 0.5em;
-        }}
-        
-        .markdown-content blockquote {{
-            border-left: 4px solid var(--primary-color);
-            padding: 1em 1.5em;
-            margin: 2em 0;
-            background-color: rgba(74, 111, 165, 0.05);
-            border-radius: 0 8px 8px 0;
-            font-style: italic;
-            color: #555;
-        }}
-        
-        .markdown-content blockquote p:last-child {{
-            margin-bottom: 0;
-        }}
-        
-        .markdown-content hr {{
-            margin: 2.5em 0;
-            border: none;
-            border-top: 1px solid var(--border-color);
-        }}
-        
-        .markdown-content table {{
-            width: 100%;
-            margin: 1.5em 0;
-            border-collapse: collapse;
-            font-size: 0.95em;
-        }}
-        
-        .markdown-content th,
-        .markdown-content td {{
-            padding: 0.75em 1em;
-            border: 1px solid var(--border-color);
-            text-align: left;
-        }}
-        
-        .markdown-content th {{
-            background-color: rgba(74, 111, 165, 0.1);
-            font-weight: 600;
-        }}
-        
-        .markdown-content tr:nth-child(even) {{
-            background-color: rgba(0, 0, 0, 0.02);
-        }}
-        
-        .markdown-content code:not(pre code) {{
-            background-color: rgba(0, 0, 0, 0.08);
-            padding: 0.2em 0.4em;
-            border-radius: 3px;
-            font-family: 'SFMono-Regular', Consolas, 'Liberation Mono', Menlo, monospace;
-            font-size: 0.9em;
-            color: #d63384;
-        }}
-        
-        /* 代码块样式 */
-        .code-block-wrapper {{
-            margin: 2em 0;
-            border-radius: 8px;
-            overflow: hidden;
-            box-shadow: var(--shadow-heavy);
-        }}
-        
-        .code-block-header {{
-            background-color: #1a1a1a;
-            color: #e2e8f0;
-            padding: 0.75em 1.25em;
-            display: flex;
-            justify-content: space-between;
-            align-items: center;
-            font-family: 'SFMono-Regular', Consolas, 'Liberation Mono', Menlo, monospace;
-            font-size: 0.85rem;
-        }}
-        
-        .code-language {{
-            font-weight: 600;
-            text-transform: uppercase;
-            letter-spacing: 0.5px;
-        }}
-        
-        .copy-button {{
-            background-color: rgba(255, 255, 255, 0.1);
-            color: white;
-            border: 1px solid rgba(255, 255, 255, 0.2);
-            padding: 0.4em 1em;
-            border-radius: 4px;
-            cursor: pointer;
-            font-size: 0.85rem;
-            display: flex;
-            align-items: center;
-            gap: 6px;
-            transition: all 0.2s;
-        }}
-        
-        .copy-button:hover {{
-            background-color: rgba(255, 255, 255, 0.2);
-        }}
-        
-        .copy-button.copied {{
-            background-color: #38a169;
-            border-color: #38a169;
-        }}
-        
-        pre[class*="language-"] {{
-            margin: 0 !important;
-            border-radius: 0 !important;
-            font-family: 'Fira Code', 'SFMono-Regular', Consolas, 'Liberation Mono', Menlo, monospace !important;
-            font-size: 0.95em !important;
-        }}
-        
-        pre.line-numbers {{
-            position: relative;
-            padding-left: 3.8em;
-            counter-reset: linenumber;
-        }}
-        
-        .line-numbers .line-numbers-rows {{
-            position: absolute;
-            pointer-events: none;
-            top: 0;
-            font-size: 100%;
-            left: -3.8em;
-            width: 3em;
-            letter-spacing: -1px;
-            border-right: 1px solid #999;
-            user-select: none;
-        }}
-        
-        .line-numbers-rows > span {{
-            display: block;
-            counter-increment: linenumber;
-        }}
-        
-        .line-numbers-rows > span:before {{
-            content: counter(linenumber);
-            color: #999;
-            display: block;
-            padding-right: 0.8em;
-            text-align: right;
-        }}
-        
-        /* 标签列表 */
-        .tag-list {{
-            margin-top: 40px;
-            display: flex;
-            flex-wrap: wrap;
-            gap: 10px;
-        }}
-        
-        .tag-list span {{
-            background-color: rgba(74, 111, 165, 0.1);
-            color: var(--primary-color);
-            padding: 6px 14px;
-            border-radius: 20px;
-            font-size: 0.9rem;
-            font-weight: 500;
-            transition: all 0.2s;
-        }}
-        
-        .tag-list span:hover {{
-            background-color: rgba(74, 111, 165, 0.2);
-            transform: translateY(-1px);
-        }}
-        
-        /* 加载指示器 */
-        .loading-indicator {{
-            text-align: center;
-            padding: 60px 20px;
-            color: var(--text-light);
-            background-color: var(--card-bg);
-            border-radius: 12px;
-            margin: 40px 0;
-            box-shadow: var(--shadow);
-        }}
-        
-        .loading-indicator i {{
-            font-size: 2.5rem;
-            margin-bottom: 15px;
-            color: var(--primary-color);
-        }}
-        
-        .loading-indicator p {{
-            font-size: 1rem;
-            margin-top: 10px;
-        }}
-        
-        /* 错误提示 */
-        .error-container {{
-            text-align: center;
-            padding: 60px 20px;
-            background-color: #fff5f5;
-            border: 1px solid #fed7d7;
-            border-radius: 12px;
-            margin: 40px 0;
-            color: #c53030;
-        }}
-        
-        .error-container i {{
-            font-size: 2.5rem;
-            margin-bottom: 15px;
-        }}
-        
-        /* 页脚 */
-        footer {{
-            text-align: center;
-            padding: 40px 20px;
-            font-size: 0.9rem;
-            color: var(--text-light);
-            margin-top: 60px;
-            border-top: 1px solid var(--border-color);
-        }}
-        
-        /* 响应式设计 */
-        @media (max-width: 768px) {{
-            .container {{
-                padding: 0 15px;
-            }}
-            
-            .header-inner {{
-                padding: 12px 15px;
-            }}
-            
-            .article-title {{
-                font-size: 1.8rem;
-            }}
-            
-            .markdown-content h1 {{
-                font-size: 1.5rem;
-            }}
-            
-            .markdown-content h2 {{
-                font-size: 1.3rem;
-            }}
-            
-            .markdown-content h3 {{
-                font-size: 1.1rem;
-            }}
-            
-            .article-cover img {{
-                height: 220px;
-            }}
-            
-            .article-meta {{
-                gap: 10px;
-            }}
-            
-            .article-meta-item {{
-                font-size: 0.85rem;
-            }}
-        }}
-        
-        @media (max-width: 480px) {{
-            .article-title {{
-                font-size: 1.5rem;
-            }}
-            
-            .article-cover img {{
-                height: 180px;
-            }}
-            
-            .article-meta {{
-                flex-direction: column;
-                align-items: flex-start;
-                gap: 8px;
-            }}
-            
-            .code-block-header {{
-                flex-direction: column;
-                align-items: flex-start;
-                gap: 8px;
-                padding: 0.75em;
-            }}
-            
-            .copy-button {{
-                align-self: stretch;
-                justify-content: center;
-            }}
-        }}
-        
-        /* 动画效果 */
-        @keyframes fadeIn {{
-            from {{ opacity: 0; transform: translateY(10px); }}
-            to {{ opacity: 1; transform: translateY(0); }}
-        }}
-        
-        .markdown-content > * {{
-            animation: fadeIn 0.3s ease-out forwards;
-        }}
-
-        @media (prefers-reduced-motion: reduce) {{
-            *,
-            *::before,
-            *::after {{
-                scroll-behavior: auto !important;
-                transition-duration: 0.01ms !important;
-                animation-duration: 0.01ms !important;
-                animation-iteration-count: 1 !important;
-            }}
-        }}
-        
-        /* UI refresh: match the knowledge-base homepage */
-        :root {{
-            --primary-color: #1f4d7a;
-            --secondary-color: #b84c27;
-            --text-color: #191a1d;
-            --text-light: #62666d;
-            --background-color: #f7f3ea;
-            --card-bg: #fffdf8;
-            --border-color: #ded6c8;
-            --ink: #101820;
-            --shadow: 6px 6px 0 rgba(16, 24, 32, 0.1);
-            --shadow-heavy: 9px 9px 0 rgba(16, 24, 32, 0.16);
-        }}
-
-        body {{
-            background:
-                linear-gradient(90deg, rgba(16, 24, 32, 0.035) 1px, transparent 1px),
-                linear-gradient(180deg, rgba(16, 24, 32, 0.035) 1px, transparent 1px),
-                var(--background-color);
-            background-size: 34px 34px;
-        }}
-
-        a:hover {{
-            color: var(--secondary-color);
-        }}
-
-        a:focus-visible,
-        button:focus-visible {{
-            outline-color: rgba(184, 76, 39, 0.85);
-        }}
-
-        .container,
-        .header-inner {{
-            max-width: 980px;
-        }}
-
-        header {{
-            border-bottom: 2px solid var(--ink);
-            background: rgba(255, 253, 248, 0.94);
-            box-shadow: none;
-        }}
-
-        .header-inner {{
-            min-height: 82px;
-        }}
-
-        .logo {{
-            color: var(--ink);
-            font-size: 1.05rem;
-            letter-spacing: 0.02em;
-            text-transform: uppercase;
-        }}
-
-        .logo span {{
-            color: var(--secondary-color);
-        }}
-
-        .back-link {{
-            min-height: 44px;
-            border: 2px solid var(--ink);
-            border-radius: 0;
-            background: var(--ink);
-            color: #fffdf8;
-            padding: 0 16px;
-        }}
-
-        .back-link:hover {{
-            background: var(--secondary-color);
-            color: #fffdf8;
-            text-decoration: none;
-        }}
-
-        .article-header {{
-            margin-top: 54px;
-            padding: 30px;
-            border: 2px solid var(--ink);
-            border-radius: 0;
-            background: var(--card-bg);
-            box-shadow: var(--shadow-heavy);
-        }}
-
-        .article-title {{
-            max-width: 760px;
-            color: var(--ink);
-            font-size: clamp(2.1rem, 5vw, 4rem);
-            line-height: 1.02;
-        }}
-
-        .article-meta {{
-            gap: 10px;
-            border-top: 2px solid var(--ink);
-        }}
-
-        .article-meta-item,
-        .mode-badge {{
-            min-height: 34px;
-            padding: 0 10px;
-            border: 1px solid var(--ink);
-            background: #f1dfc8;
-            color: var(--ink);
-        }}
-
-        .mode-badge {{
-            display: inline-flex;
-            align-items: center;
-            border-radius: 0;
-            font-size: 0.86rem;
-        }}
-
-        .article-cover {{
-            border: 2px solid var(--ink);
-            border-radius: 0;
-            box-shadow: var(--shadow-heavy);
-        }}
-
-        .article-cover img {{
-            height: clamp(220px, 34vw, 380px);
-            display: block;
-            filter: saturate(0.82) contrast(1.08);
-        }}
-
-        .article-cover:hover img {{
-            transform: none;
-        }}
-
-        .markdown-content {{
-            max-width: 820px;
-            margin: 48px auto;
-            font-size: 1.04rem;
-            line-height: 1.82;
-        }}
-
-        .markdown-content p {{
-            text-align: left;
-        }}
-
-        .markdown-content a,
-        .markdown-content code:not(pre code) {{
-            overflow-wrap: anywhere;
-            word-break: break-word;
-        }}
-
-        .markdown-content h1,
-        .markdown-content h2,
-        .markdown-content h3,
-        .markdown-content h4 {{
-            color: var(--ink);
-        }}
-
-        .markdown-content h2 {{
-            padding-left: 14px;
-            border-left: 6px solid var(--secondary-color);
-        }}
-
-        .markdown-content img {{
-            border: 2px solid var(--ink);
-            border-radius: 0;
-            box-shadow: var(--shadow);
-        }}
-
-        .markdown-content blockquote {{
-            border-left-color: var(--secondary-color);
-            background: #fff8ea;
-            color: var(--text-color);
-        }}
-
-        .code-block-wrapper {{
-            max-width: 100%;
-            overflow: hidden;
-            border: 2px solid var(--ink);
-            border-radius: 0;
-            box-shadow: var(--shadow-heavy);
-        }}
-
-        .code-block-header {{
-            min-height: 48px;
-            background: var(--ink);
-        }}
-
-        .copy-button {{
-            min-height: 44px;
-            border: 1px solid rgba(255, 253, 248, 0.48);
-            border-radius: 0;
-        }}
-
-        pre[class*="language-"],
-        pre.line-numbers {{
-            max-width: 100%;
-            overflow-x: auto !important;
-            white-space: pre !important;
-        }}
-
-        .tag-list {{
-            max-width: 820px;
-            margin: 42px auto 0;
-        }}
-
-        .tag-list span {{
-            min-height: 34px;
-            display: inline-flex;
-            align-items: center;
-            border: 1px solid var(--ink);
-            border-radius: 0;
-            background: #f1dfc8;
-            color: var(--ink);
-        }}
-
-        .loading-indicator,
-        .error-container {{
-            border: 2px solid var(--ink);
-            border-radius: 0;
-            box-shadow: var(--shadow);
-        }}
-
-        footer {{
-            border-top: 2px solid var(--ink);
-            background: rgba(255, 253, 248, 0.72);
-        }}
-
-        @media (max-width: 480px) {{
-            .article-header {{
-                margin-top: 28px;
-                padding: 22px;
-            }}
-
-            .article-title {{
-                font-size: clamp(2rem, 13vw, 2.9rem);
-            }}
-
-            .article-meta-item,
-            .mode-badge {{
-                width: 100%;
-            }}
-
-            .markdown-content {{
-                margin: 34px 0;
-                font-size: 1rem;
-            }}
-
-            .copy-button {{
-                min-height: 44px;
-            }}
-        }}
-
-        /* 深色模式支持 */
-        @media (prefers-color-scheme: dark) {{
-            :root {{
-                --primary-color: #63b3ed;
-                --secondary-color: #68d391;
-                --text-color: #e2e8f0;
-                --text-light: #a0aec0;
-                --background-color: #1a202c;
-                --card-bg: #2d3748;
-                --border-color: #4a5568;
-                --shadow: 0 4px 12px rgba(0,0,0,0.3);
-                --shadow-heavy: 0 8px 24px rgba(0,0,0,0.4);
-            }}
-            
-            body {{
-                background-color: var(--background-color);
-                color: var(--text-color);
-            }}
-            
-            .markdown-content code:not(pre code) {{
-                background-color: rgba(255, 255, 255, 0.1);
-                color: #fbb6ce;
-            }}
-            
-            .markdown-content blockquote {{
-                background-color: rgba(99, 179, 237, 0.1);
-            }}
-            
-            .tag-list span {{
-                background-color: rgba(99, 179, 237, 0.2);
-                color: var(--primary-color);
-            }}
-            
-            .loading-indicator {{
-                background-color: var(--card-bg);
-            }}
-        }}
-
-        :root {{
-            --primary-color: #d85635;
-            --secondary-color: #d85635;
-            --text-color: #17202a;
-            --text-light: #5d6873;
-            --background-color: #f3f6f4;
-            --card-bg: #fbfcf8;
-            --border-color: #cdd8d2;
-            --ink: #111820;
-            --surface-muted: #e8eee8;
-            --shadow: 0 18px 40px rgba(17, 24, 32, 0.08);
-            --shadow-heavy: 0 24px 60px rgba(17, 24, 32, 0.13);
-            --radius: 10px;
-            --radius-small: 6px;
-            --radius-pill: 999px;
-        }}
-
-        @media (prefers-color-scheme: dark) {{
-            :root {{
-                --primary-color: #ff8a63;
-                --secondary-color: #ff8a63;
-                --text-color: #edf3ec;
-                --text-light: #aebaae;
-                --background-color: #111713;
-                --card-bg: #18211c;
-                --border-color: #344339;
-                --ink: #f6f1e8;
-                --surface-muted: #223029;
-                --shadow: 0 18px 45px rgba(0, 0, 0, 0.28);
-                --shadow-heavy: 0 24px 64px rgba(0, 0, 0, 0.36);
-            }}
-        }}
-
-        body {{
-            min-height: 100dvh;
-            background:
-                radial-gradient(circle at 12% 0%, rgba(216, 86, 53, 0.12), transparent 26rem),
-                linear-gradient(90deg, rgba(17, 24, 32, 0.045) 1px, transparent 1px),
-                linear-gradient(180deg, rgba(17, 24, 32, 0.04) 1px, transparent 1px),
-                var(--background-color);
-            background-size: auto, 42px 42px, 42px 42px, auto;
-            font-family: "Aptos", "Segoe UI", "Microsoft YaHei UI", "PingFang SC", sans-serif;
-        }}
-
-        a {{
-            color: var(--primary-color);
-        }}
-
-        a:hover {{
-            color: var(--primary-color);
-            text-decoration-thickness: 2px;
-            text-underline-offset: 4px;
-        }}
-
-        a:focus-visible,
-        button:focus-visible {{
-            outline-color: color-mix(in srgb, var(--primary-color), transparent 15%);
-        }}
-
-        .container,
-        .header-inner {{
-            max-width: 1040px;
-        }}
-
-        header {{
-            border-bottom: 1px solid color-mix(in srgb, var(--border-color), var(--text-color) 18%);
-            background: color-mix(in srgb, var(--card-bg), transparent 9%);
-            box-shadow: none;
-        }}
-
-        .header-inner {{
-            min-height: 72px;
-        }}
-
-        .logo {{
-            color: var(--text-color);
-            font-size: 1.02rem;
-            font-weight: 850;
-            letter-spacing: 0;
-            text-transform: none;
-        }}
-
-        .logo span {{
-            color: var(--primary-color);
-        }}
-
-        .back-link {{
-            min-height: 42px;
-            border: 1px solid var(--border-color);
-            border-radius: var(--radius-pill);
-            background: var(--card-bg);
-            color: var(--text-color);
-            box-shadow: 0 12px 26px rgba(17, 24, 32, 0.06);
-        }}
-
-        .back-link:hover {{
-            background: var(--ink);
-            color: var(--background-color);
-            text-decoration: none;
-        }}
-
-        .article-header {{
-            margin-top: 56px;
-            padding: clamp(24px, 5vw, 46px);
-            border: 1px solid var(--border-color);
-            border-radius: var(--radius);
-            background: color-mix(in srgb, var(--card-bg), transparent 1%);
-            box-shadow: var(--shadow-heavy);
-        }}
-
-        .article-title {{
-            max-width: 820px;
-            color: var(--text-color);
-            font-size: clamp(2.2rem, 6vw, 4.75rem);
-            line-height: 1.02;
-            text-wrap: balance;
-        }}
-
-        .article-meta {{
-            gap: 10px;
-            border-top: 1px solid var(--border-color);
-        }}
-
-        .article-meta-item,
-        .mode-badge {{
-            min-height: 34px;
-            padding: 0 11px;
-            border: 1px solid var(--border-color);
-            border-radius: var(--radius-pill);
-            background: color-mix(in srgb, var(--surface-muted), transparent 22%);
-            color: var(--text-color);
-        }}
-
-        .article-cover {{
-            margin: 32px 0 0;
-            border: 1px solid var(--border-color);
-            border-radius: var(--radius);
-            box-shadow: var(--shadow-heavy);
-        }}
-
-        .article-cover img {{
-            height: clamp(240px, 38vw, 430px);
-            display: block;
-            filter: saturate(0.78) contrast(1.08);
-        }}
-
-        .article-cover:hover img {{
-            transform: none;
-        }}
-
-        .markdown-content {{
-            max-width: 820px;
-            margin: 54px auto;
-            color: var(--text-color);
-            font-size: clamp(1rem, 1.1vw, 1.08rem);
-            line-height: 1.86;
-        }}
-
-        .markdown-content p {{
-            text-align: left;
-        }}
-
-        .markdown-content a,
-        .markdown-content code:not(pre code) {{
-            overflow-wrap: anywhere;
-            word-break: break-word;
-        }}
-
-        .markdown-content h1,
-        .markdown-content h2,
-        .markdown-content h3,
-        .markdown-content h4 {{
-            color: var(--text-color);
-            font-weight: 800;
-        }}
-
-        .markdown-content h1 {{
-            border-bottom: 1px solid var(--border-color);
-        }}
-
-        .markdown-content h2 {{
-            padding-left: 14px;
-            border-left: 5px solid var(--primary-color);
-        }}
-
-        .markdown-content img {{
-            border: 1px solid var(--border-color);
-            border-radius: var(--radius);
-            box-shadow: var(--shadow);
-        }}
-
-        .markdown-content blockquote {{
-            border-left-color: var(--primary-color);
-            border-radius: var(--radius-small);
-            background: color-mix(in srgb, var(--surface-muted), transparent 28%);
-            color: var(--text-color);
-        }}
-
-        .markdown-content table {{
-            border-collapse: separate;
-            border-spacing: 0;
-            overflow: hidden;
-            border: 1px solid var(--border-color);
-            border-radius: var(--radius);
-        }}
-
-        .markdown-content th,
-        .markdown-content td {{
-            border: 0;
-            border-bottom: 1px solid var(--border-color);
-        }}
-
-        .markdown-content th {{
-            background: var(--surface-muted);
-            color: var(--text-color);
-        }}
-
-        .markdown-content code:not(pre code) {{
-            border: 1px solid color-mix(in srgb, var(--primary-color), transparent 72%);
-            border-radius: var(--radius-small);
-            background: color-mix(in srgb, var(--primary-color), transparent 90%);
-            color: var(--text-color);
-        }}
-
-        .code-block-wrapper {{
-            max-width: 100%;
-            overflow: hidden;
-            border: 1px solid color-mix(in srgb, var(--border-color), var(--text-color) 14%);
-            border-radius: var(--radius);
-            box-shadow: var(--shadow-heavy);
-        }}
-
-        .code-block-header {{
-            min-height: 50px;
-            background: #111820;
-        }}
-
-        .copy-button {{
-            min-height: 42px;
-            border: 1px solid rgba(251, 252, 248, 0.38);
-            border-radius: var(--radius-pill);
-        }}
-
-        .copy-button:hover {{
-            background: rgba(255, 255, 255, 0.18);
-        }}
-
-        pre[class*="language-"],
-        pre.line-numbers {{
-            max-width: 100%;
-            overflow-x: auto !important;
-            white-space: pre !important;
-        }}
-
-        .tag-list {{
-            max-width: 820px;
-            margin: 42px auto 0;
-        }}
-
-        .tag-list span {{
-            min-height: 34px;
-            display: inline-flex;
-            align-items: center;
-            border: 1px solid color-mix(in srgb, var(--primary-color), transparent 42%);
-            border-radius: var(--radius-pill);
-            background: color-mix(in srgb, var(--primary-color), transparent 90%);
-            color: var(--text-color);
-        }}
-
-        .loading-indicator,
-        .error-container {{
-            border: 1px solid var(--border-color);
-            border-radius: var(--radius);
-            background: var(--card-bg);
-            box-shadow: var(--shadow);
-        }}
-
-        footer {{
-            border-top: 1px solid var(--border-color);
-            background: color-mix(in srgb, var(--card-bg), transparent 35%);
-        }}
-
-        @media (prefers-reduced-motion: no-preference) {{
-            .article-header,
-            .article-cover,
-            .markdown-content,
-            .tag-list {{
-                animation: archive-rise 0.55s cubic-bezier(0.16, 1, 0.3, 1) both;
-            }}
-
-            .article-cover {{
-                animation-delay: 0.08s;
-            }}
-
-            .markdown-content {{
-                animation-delay: 0.14s;
-            }}
-        }}
-
-        @keyframes archive-rise {{
-            from {{
-                opacity: 0;
-                transform: translateY(16px);
-            }}
-            to {{
-                opacity: 1;
-                transform: translateY(0);
-            }}
-        }}
-
-        @media (max-width: 768px) {{
-            .article-header {{
-                margin-top: 34px;
-            }}
-
-            .article-title {{
-                font-size: clamp(2rem, 12vw, 3.35rem);
-            }}
-
-            .markdown-content {{
-                margin: 38px 0;
-            }}
-        }}
-
-        @media (max-width: 480px) {{
-            .article-meta-item,
-            .mode-badge {{
-                width: 100%;
-            }}
-
-            .copy-button {{
-                min-height: 44px;
-            }}
-        }}
-    </style>
+    <link rel="stylesheet" href="{post_css}">
+{head_scripts}    <script defer src="{post_js}"></script>
     <link rel="stylesheet" href="art-theme.css">
 </head>
 <body>
@@ -1396,31 +1966,18 @@ def create_post_html(post_data, post_filename):
             </header>
 
             <div class="article-cover">
-                <img src="{cover_image}" alt="{title}" width="1170" height="780" loading="eager" fetchpriority="high">
+                {cover}
             </div>
             
-            <div class="loading-indicator" id="loading">
-                <i class="fas fa-spinner fa-spin"></i>
-                <p>正在加载文章内容...</p>
-                <p class="loading-hint">正在准备阅读内容</p>
-            </div>
-            
-            <div class="error-container" id="error-container" style="display: none;">
-                <i class="fas fa-exclamation-triangle"></i>
-                <h3>内容加载失败</h3>
-                <p id="error-message">未知错误</p>
-                <button type="button" id="retry-load" class="copy-button" style="margin-top: 15px;">
-                    <i class="fas fa-redo"></i> 重试加载
-                </button>
-            </div>
-            
-            <div class="markdown-content" id="markdown-content" style="display: none;">
-                <!-- Markdown内容将通过JavaScript动态渲染到这里 -->
-            </div>
-            
+{article_body}            
             <div class="tag-list">
 {tags}
             </div>
+
+            <section class="related-posts" id="related-posts" data-src="{related_source}" hidden>
+                <h2>相关文章</h2>
+                <ul id="related-list"></ul>
+            </section>
         </article>
     </main>
 
@@ -1428,224 +1985,1493 @@ def create_post_html(post_data, post_filename):
         <p>© {current_year} 博客世界. 保留所有权利.</p>
     </footer>
     
-    <script>
-    // 等待所有外部库加载完成
-    let librariesLoaded = false;
-    let markdownLoaded = false;
-    let prismLoaded = false;
-    
-    // 检查marked库是否已加载
-    function checkMarkedLoaded() {{
-        if (typeof marked !== 'undefined') {{
-            console.log('marked.js 已加载');
-            markdownLoaded = true;
-            checkAllLibrariesLoaded();
-        }} else {{
-            console.warn('marked.js 未加载，正在重试...');
-            setTimeout(checkMarkedLoaded, 500);
-        }}
-    }}
-    
-    // 检查Prism库是否已加载
-    function checkPrismLoaded() {{
-        if (typeof Prism !== 'undefined') {{
-            console.log('Prism.js 已加载');
-            prismLoaded = true;
-            checkAllLibrariesLoaded();
-        }} else {{
-            console.warn('Prism.js 未加载，正在重试...');
-            setTimeout(checkPrismLoaded, 500);
-        }}
-    }}
-    
-    // 检查所有库是否已加载
-    function checkAllLibrariesLoaded() {{
-        if (markdownLoaded && prismLoaded && !librariesLoaded) {{
-            librariesLoaded = true;
-            console.log('所有库已加载完成，开始初始化');
-            initializeMarked();
-            // 延迟加载Markdown内容，确保DOM完全加载
-            if (document.readyState === 'loading') {{
-                document.addEventListener('DOMContentLoaded', startLoadingMarkdown);
-            }} else {{
-                startLoadingMarkdown();
-            }}
-        }}
-    }}
-    
-    // 初始化marked.js
-    function initializeMarked() {{
-        if (typeof marked !== 'undefined') {{
-            // 配置marked.js
-            marked.setOptions({{
-                breaks: true,           // 支持换行符
-                gfm: true,             // 支持GitHub风格的Markdown
-                headerIds: true,       // 自动生成标题ID
-                smartypants: true,     // 智能引号和破折号
-                highlight: function(code, lang) {{
-                    if (lang && typeof Prism !== 'undefined' && Prism.languages[lang]) {{
-                        try {{
-                            return Prism.highlight(code, Prism.languages[lang], lang);
-                        }} catch (e) {{
-                            console.warn('Prism高亮失败:', e);
-                            return code;
-                        }}
-                    }}
-                    return code;
-                }},
-                langPrefix: 'language-',
-            }});
-            console.log('marked.js 初始化完成');
-        }} else {{
-            console.error('marked.js 未定义，无法初始化');
-        }}
-    }}
-    
-    // 开始加载Markdown
-    function startLoadingMarkdown() {{
-        console.log('开始加载Markdown内容');
-        setTimeout(loadAndRenderMarkdown, 100);
-    }}
-    
-    // 加载和渲染Markdown文件
-    async function loadAndRenderMarkdown() {{
-        try {{
-            // 首先检查库是否已加载
-            if (!librariesLoaded) {{
-                throw new Error('必要的JavaScript库尚未加载完成，请稍后再试');
-            }}
-            
-            if (typeof marked === 'undefined') {{
+</body>
+</html>'''
+
+# 文章页面共享样式，构建时写入带内容哈希的 assets/post.*.css
+POST_CSS = '''/* 全局样式 */
+:root {
+    --primary-color: #4a6fa5;
+    --secondary-color: #32a852;
+    --text-color: #333;
+    --text-light: #6c757d;
+    --background-color: #f5f7fa;
+    --card-bg: #ffffff;
+    --border-color: #eaeaea;
+    --shadow: 0 4px 12px rgba(0,0,0,0.05);
+    --shadow-heavy: 0 8px 24px rgba(0,0,0,0.1);
+}
+
+* {
+    margin: 0;
+    padding: 0;
+    box-sizing: border-box;
+}
+
+body {
+    font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', 'Helvetica Neue', Arial, sans-serif;
+    background-color: var(--background-color);
+    color: var(--text-color);
+    line-height: 1.8;
+    font-size: 16px;
+}
+
+a {
+    color: var(--primary-color);
+    text-decoration: none;
+    transition: color 0.2s;
+}
+
+a:hover {
+    color: var(--secondary-color);
+    text-decoration: underline;
+}
+
+a:focus-visible,
+button:focus-visible {
+    outline: 3px solid rgba(50, 168, 82, 0.85);
+    outline-offset: 3px;
+}
+
+/* 布局容器 */
+.container {
+    max-width: 900px;
+    margin: 0 auto;
+    padding: 0 20px;
+}
+
+/* 头部样式 */
+header {
+    background-color: var(--card-bg);
+    box-shadow: var(--shadow);
+    position: sticky;
+    top: 0;
+    z-index: 1000;
+    backdrop-filter: blur(10px);
+    background-color: rgba(255, 255, 255, 0.95);
+}
+
+.header-inner {
+    max-width: 900px;
+    margin: 0 auto;
+    padding: 15px 20px;
+    display: flex;
+    justify-content: space-between;
+    align-items: center;
+}
+
+.logo {
+    font-size: 1.4rem;
+    font-weight: 700;
+    color: var(--primary-color);
+}
+
+.logo span {
+    color: var(--secondary-color);
+}
+
+.back-link {
+    color: var(--primary-color);
+    text-decoration: none;
+    font-size: 0.95rem;
+    display: inline-flex;
+    align-items: center;
+    padding: 6px 12px;
+    border-radius: 4px;
+    background-color: rgba(74, 111, 165, 0.1);
+}
+
+.back-link i {
+    margin-right: 6px;
+}
+
+.back-link:hover {
+    background-color: rgba(74, 111, 165, 0.2);
+    text-decoration: none;
+}
+
+/* 文章头部 */
+.article-header {
+    margin-top: 40px;
+    margin-bottom: 30px;
+    padding: 20px;
+    background-color: var(--card-bg);
+    border-radius: 12px;
+    box-shadow: var(--shadow);
+}
+
+.article-title {
+    font-size: 2.2rem;
+    margin-bottom: 15px;
+    color: #166088;
+    line-height: 1.3;
+}
+
+.article-meta {
+    display: flex;
+    flex-wrap: wrap;
+    gap: 20px;
+    align-items: center;
+    color: var(--text-light);
+    font-size: 0.9rem;
+    margin-top: 20px;
+    padding-top: 15px;
+    border-top: 1px solid var(--border-color);
+}
+
+.article-meta-item {
+    display: flex;
+    align-items: center;
+}
+
+.article-meta-item i {
+    margin-right: 6px;
+    font-size: 0.9em;
+}
+
+.mode-badge {
+    background-color: rgba(50, 168, 82, 0.1);
+    color: var(--secondary-color);
+    padding: 3px 8px;
+    border-radius: 12px;
+    font-size: 0.8rem;
+    font-weight: 500;
+}
+
+/* 封面图片 */
+.article-cover {
+    margin: 30px 0;
+    border-radius: 12px;
+    overflow: hidden;
+    box-shadow: var(--shadow-heavy);
+}
+
+.article-cover img {
+    width: 100%;
+    height: 320px;
+    aspect-ratio: 3 / 2;
+    object-fit: cover;
+    transition: transform 0.3s ease;
+}
+
+.article-cover picture {
+    display: contents;
+}
+
+.article-cover:hover img {
+    transform: scale(1.02);
+}
+
+/* Markdown 内容区域 */
+.markdown-content {
+    font-size: 1.05rem;
+    line-height: 1.7;
+    margin: 40px 0;
+}
+
+.markdown-content > *:first-child {
+    margin-top: 0 !important;
+}
+
+.markdown-content h1,
+.markdown-content h2,
+.markdown-content h3,
+.markdown-content h4 {
+    margin-top: 2em;
+    margin-bottom: 1em;
+    color: #166088;
+    font-weight: 600;
+    line-height: 1.3;
+}
+
+.markdown-content h1 {
+    font-size: 1.8rem;
+    border-bottom: 2px solid var(--border-color);
+    padding-bottom: 10px;
+}
+
+.markdown-content h2 {
+    font-size: 1.5rem;
+}
+
+.markdown-content h3 {
+    font-size: 1.2rem;
+}
+
+.markdown-content h4 {
+    font-size: 1.1rem;
+}
+
+.markdown-content p {
+    margin: 1.2em 0;
+    text-align: justify;
+}
+
+.markdown-content img {
+    max-width: 100%;
+    height: auto;
+    display: block;
+    margin: 2em auto;
+    border-radius: 8px;
+    box-shadow: var(--shadow);
+}
+
+.markdown-content ul,
+.markdown-content ol {
+    margin: 1.2em 0 1.2em 2em;
+}
+
+.markdown-content li {
+    margin-bottom: 0.5em;
+}
+
+.markdown-content li > ul,
+.markdown-content li > ol {
+    margin-top: 0.5em;
+    margin-bottom: 0.5em;
+}
+
+.markdown-content blockquote {
+    border-left: 4px solid var(--primary-color);
+    padding: 1em 1.5em;
+    margin: 2em 0;
+    background-color: rgba(74, 111, 165, 0.05);
+    border-radius: 0 8px 8px 0;
+    font-style: italic;
+    color: #555;
+}
+
+.markdown-content blockquote p:last-child {
+    margin-bottom: 0;
+}
+
+.markdown-content hr {
+    margin: 2.5em 0;
+    border: none;
+    border-top: 1px solid var(--border-color);
+}
+
+.markdown-content table {
+    width: 100%;
+    margin: 1.5em 0;
+    border-collapse: collapse;
+    font-size: 0.95em;
+}
+
+.markdown-content th,
+.markdown-content td {
+    padding: 0.75em 1em;
+    border: 1px solid var(--border-color);
+    text-align: left;
+}
+
+.markdown-content th {
+    background-color: rgba(74, 111, 165, 0.1);
+    font-weight: 600;
+}
+
+.markdown-content tr:nth-child(even) {
+    background-color: rgba(0, 0, 0, 0.02);
+}
+
+.markdown-content code:not(pre code) {
+    background-color: rgba(0, 0, 0, 0.08);
+    padding: 0.2em 0.4em;
+    border-radius: 3px;
+    font-family: 'SFMono-Regular', Consolas, 'Liberation Mono', Menlo, monospace;
+    font-size: 0.9em;
+    color: #d63384;
+}
+
+/* 代码块样式 */
+.code-block-wrapper {
+    margin: 2em 0;
+    border-radius: 8px;
+    overflow: hidden;
+    box-shadow: var(--shadow-heavy);
+}
+
+.code-block-header {
+    background-color: #1a1a1a;
+    color: #e2e8f0;
+    padding: 0.75em 1.25em;
+    display: flex;
+    justify-content: space-between;
+    align-items: center;
+    font-family: 'SFMono-Regular', Consolas, 'Liberation Mono', Menlo, monospace;
+    font-size: 0.85rem;
+}
+
+.code-language {
+    font-weight: 600;
+    text-transform: uppercase;
+    letter-spacing: 0.5px;
+}
+
+.copy-button {
+    background-color: rgba(255, 255, 255, 0.1);
+    color: white;
+    border: 1px solid rgba(255, 255, 255, 0.2);
+    padding: 0.4em 1em;
+    border-radius: 4px;
+    cursor: pointer;
+    font-size: 0.85rem;
+    display: flex;
+    align-items: center;
+    gap: 6px;
+    transition: all 0.2s;
+}
+
+.copy-button:hover {
+    background-color: rgba(255, 255, 255, 0.2);
+}
+
+.copy-button.copied {
+    background-color: #38a169;
+    border-color: #38a169;
+}
+
+pre[class*="language-"] {
+    margin: 0 !important;
+    border-radius: 0 !important;
+    font-family: 'Fira Code', 'SFMono-Regular', Consolas, 'Liberation Mono', Menlo, monospace !important;
+    font-size: 0.95em !important;
+}
+
+pre.line-numbers {
+    position: relative;
+    padding-left: 3.8em;
+    counter-reset: linenumber;
+}
+
+.line-numbers .line-numbers-rows {
+    position: absolute;
+    pointer-events: none;
+    top: 0;
+    font-size: 100%;
+    left: -3.8em;
+    width: 3em;
+    letter-spacing: -1px;
+    border-right: 1px solid #999;
+    user-select: none;
+}
+
+.line-numbers-rows > span {
+    display: block;
+    counter-increment: linenumber;
+}
+
+.line-numbers-rows > span:before {
+    content: counter(linenumber);
+    color: #999;
+    display: block;
+    padding-right: 0.8em;
+    text-align: right;
+}
+
+/* 标签列表 */
+.tag-list {
+    margin-top: 40px;
+    display: flex;
+    flex-wrap: wrap;
+    gap: 10px;
+}
+
+.tag-list span {
+    background-color: rgba(74, 111, 165, 0.1);
+    color: var(--primary-color);
+    padding: 6px 14px;
+    border-radius: 20px;
+    font-size: 0.9rem;
+    font-weight: 500;
+    transition: all 0.2s;
+}
+
+.tag-list span:hover {
+    background-color: rgba(74, 111, 165, 0.2);
+    transform: translateY(-1px);
+}
+
+/* 加载指示器 */
+.loading-indicator {
+    text-align: center;
+    padding: 60px 20px;
+    color: var(--text-light);
+    background-color: var(--card-bg);
+    border-radius: 12px;
+    margin: 40px 0;
+    box-shadow: var(--shadow);
+}
+
+.loading-indicator i {
+    font-size: 2.5rem;
+    margin-bottom: 15px;
+    color: var(--primary-color);
+}
+
+.loading-indicator p {
+    font-size: 1rem;
+    margin-top: 10px;
+}
+
+/* 错误提示 */
+.error-container {
+    text-align: center;
+    padding: 60px 20px;
+    background-color: #fff5f5;
+    border: 1px solid #fed7d7;
+    border-radius: 12px;
+    margin: 40px 0;
+    color: #c53030;
+}
+
+.error-container i {
+    font-size: 2.5rem;
+    margin-bottom: 15px;
+}
+
+/* 页脚 */
+footer {
+    text-align: center;
+    padding: 40px 20px;
+    font-size: 0.9rem;
+    color: var(--text-light);
+    margin-top: 60px;
+    border-top: 1px solid var(--border-color);
+}
+
+/* 响应式设计 */
+@media (max-width: 768px) {
+    .container {
+        padding: 0 15px;
+    }
+
+    .header-inner {
+        padding: 12px 15px;
+    }
+
+    .article-title {
+        font-size: 1.8rem;
+    }
+
+    .markdown-content h1 {
+        font-size: 1.5rem;
+    }
+
+    .markdown-content h2 {
+        font-size: 1.3rem;
+    }
+
+    .markdown-content h3 {
+        font-size: 1.1rem;
+    }
+
+    .article-cover img {
+        height: 220px;
+    }
+
+    .article-meta {
+        gap: 10px;
+    }
+
+    .article-meta-item {
+        font-size: 0.85rem;
+    }
+}
+
+@media (max-width: 480px) {
+    .article-title {
+        font-size: 1.5rem;
+    }
+
+    .article-cover img {
+        height: 180px;
+    }
+
+    .article-meta {
+        flex-direction: column;
+        align-items: flex-start;
+        gap: 8px;
+    }
+
+    .code-block-header {
+        flex-direction: column;
+        align-items: flex-start;
+        gap: 8px;
+        padding: 0.75em;
+    }
+
+    .copy-button {
+        align-self: stretch;
+        justify-content: center;
+    }
+}
+
+/* 动画效果 */
+@keyframes fadeIn {
+    from { opacity: 0; transform: translateY(10px); }
+    to { opacity: 1; transform: translateY(0); }
+}
+
+.markdown-content > * {
+    animation: fadeIn 0.3s ease-out forwards;
+}
+
+@media (prefers-reduced-motion: reduce) {
+    *,
+    *::before,
+    *::after {
+        scroll-behavior: auto !important;
+        transition-duration: 0.01ms !important;
+        animation-duration: 0.01ms !important;
+        animation-iteration-count: 1 !important;
+    }
+}
+
+/* UI refresh: match the knowledge-base homepage */
+:root {
+    --primary-color: #1f4d7a;
+    --secondary-color: #b84c27;
+    --text-color: #191a1d;
+    --text-light: #62666d;
+    --background-color: #f7f3ea;
+    --card-bg: #fffdf8;
+    --border-color: #ded6c8;
+    --ink: #101820;
+    --shadow: 6px 6px 0 rgba(16, 24, 32, 0.1);
+    --shadow-heavy: 9px 9px 0 rgba(16, 24, 32, 0.16);
+}
+
+body {
+    background:
+        linear-gradient(90deg, rgba(16, 24, 32, 0.035) 1px, transparent 1px),
+        linear-gradient(180deg, rgba(16, 24, 32, 0.035) 1px, transparent 1px),
+        var(--background-color);
+    background-size: 34px 34px;
+}
+
+a:hover {
+    color: var(--secondary-color);
+}
+
+a:focus-visible,
+button:focus-visible {
+    outline-color: rgba(184, 76, 39, 0.85);
+}
+
+.container,
+.header-inner {
+    max-width: 980px;
+}
+
+header {
+    border-bottom: 2px solid var(--ink);
+    background: rgba(255, 253, 248, 0.94);
+    box-shadow: none;
+}
+
+.header-inner {
+    min-height: 82px;
+}
+
+.logo {
+    color: var(--ink);
+    font-size: 1.05rem;
+    letter-spacing: 0.02em;
+    text-transform: uppercase;
+}
+
+.logo span {
+    color: var(--secondary-color);
+}
+
+.back-link {
+    min-height: 44px;
+    border: 2px solid var(--ink);
+    border-radius: 0;
+    background: var(--ink);
+    color: #fffdf8;
+    padding: 0 16px;
+}
+
+.back-link:hover {
+    background: var(--secondary-color);
+    color: #fffdf8;
+    text-decoration: none;
+}
+
+.article-header {
+    margin-top: 54px;
+    padding: 30px;
+    border: 2px solid var(--ink);
+    border-radius: 0;
+    background: var(--card-bg);
+    box-shadow: var(--shadow-heavy);
+}
+
+.article-title {
+    max-width: 760px;
+    color: var(--ink);
+    font-size: clamp(2.1rem, 5vw, 4rem);
+    line-height: 1.02;
+}
+
+.article-meta {
+    gap: 10px;
+    border-top: 2px solid var(--ink);
+}
+
+.article-meta-item,
+.mode-badge {
+    min-height: 34px;
+    padding: 0 10px;
+    border: 1px solid var(--ink);
+    background: #f1dfc8;
+    color: var(--ink);
+}
+
+.mode-badge {
+    display: inline-flex;
+    align-items: center;
+    border-radius: 0;
+    font-size: 0.86rem;
+}
+
+.article-cover {
+    border: 2px solid var(--ink);
+    border-radius: 0;
+    box-shadow: var(--shadow-heavy);
+}
+
+.article-cover img {
+    height: clamp(220px, 34vw, 380px);
+    display: block;
+    filter: saturate(0.82) contrast(1.08);
+}
+
+.article-cover:hover img {
+    transform: none;
+}
+
+.markdown-content {
+    max-width: 820px;
+    margin: 48px auto;
+    font-size: 1.04rem;
+    line-height: 1.82;
+}
+
+.markdown-content p {
+    text-align: left;
+}
+
+.markdown-content a,
+.markdown-content code:not(pre code) {
+    overflow-wrap: anywhere;
+    word-break: break-word;
+}
+
+.markdown-content h1,
+.markdown-content h2,
+.markdown-content h3,
+.markdown-content h4 {
+    color: var(--ink);
+}
+
+.markdown-content h2 {
+    padding-left: 14px;
+    border-left: 6px solid var(--secondary-color);
+}
+
+.markdown-content img {
+    border: 2px solid var(--ink);
+    border-radius: 0;
+    box-shadow: var(--shadow);
+}
+
+.markdown-content blockquote {
+    border-left-color: var(--secondary-color);
+    background: #fff8ea;
+    color: var(--text-color);
+}
+
+.code-block-wrapper {
+    max-width: 100%;
+    overflow: hidden;
+    border: 2px solid var(--ink);
+    border-radius: 0;
+    box-shadow: var(--shadow-heavy);
+}
+
+.code-block-header {
+    min-height: 48px;
+    background: var(--ink);
+}
+
+.copy-button {
+    min-height: 44px;
+    border: 1px solid rgba(255, 253, 248, 0.48);
+    border-radius: 0;
+}
+
+pre[class*="language-"],
+pre.line-numbers {
+    max-width: 100%;
+    overflow-x: auto !important;
+    white-space: pre !important;
+}
+
+.tag-list {
+    max-width: 820px;
+    margin: 42px auto 0;
+}
+
+.tag-list span {
+    min-height: 34px;
+    display: inline-flex;
+    align-items: center;
+    border: 1px solid var(--ink);
+    border-radius: 0;
+    background: #f1dfc8;
+    color: var(--ink);
+}
+
+.loading-indicator,
+.error-container {
+    border: 2px solid var(--ink);
+    border-radius: 0;
+    box-shadow: var(--shadow);
+}
+
+footer {
+    border-top: 2px solid var(--ink);
+    background: rgba(255, 253, 248, 0.72);
+}
+
+@media (max-width: 480px) {
+    .article-header {
+        margin-top: 28px;
+        padding: 22px;
+    }
+
+    .article-title {
+        font-size: clamp(2rem, 13vw, 2.9rem);
+    }
+
+    .article-meta-item,
+    .mode-badge {
+        width: 100%;
+    }
+
+    .markdown-content {
+        margin: 34px 0;
+        font-size: 1rem;
+    }
+
+    .copy-button {
+        min-height: 44px;
+    }
+}
+
+/* 深色模式支持 */
+@media (prefers-color-scheme: dark) {
+    :root {
+        --primary-color: #63b3ed;
+        --secondary-color: #68d391;
+        --text-color: #e2e8f0;
+        --text-light: #a0aec0;
+        --background-color: #1a202c;
+        --card-bg: #2d3748;
+        --border-color: #4a5568;
+        --shadow: 0 4px 12px rgba(0,0,0,0.3);
+        --shadow-heavy: 0 8px 24px rgba(0,0,0,0.4);
+    }
+
+    body {
+        background-color: var(--background-color);
+        color: var(--text-color);
+    }
+
+    .markdown-content code:not(pre code) {
+        background-color: rgba(255, 255, 255, 0.1);
+        color: #fbb6ce;
+    }
+
+    .markdown-content blockquote {
+        background-color: rgba(99, 179, 237, 0.1);
+    }
+
+    .tag-list span {
+        background-color: rgba(99, 179, 237, 0.2);
+        color: var(--primary-color);
+    }
+
+    .loading-indicator {
+        background-color: var(--card-bg);
+    }
+}
+
+:root {
+    --primary-color: #d85635;
+    --secondary-color: #d85635;
+    --text-color: #17202a;
+    --text-light: #5d6873;
+    --background-color: #f3f6f4;
+    --card-bg: #fbfcf8;
+    --border-color: #cdd8d2;
+    --ink: #111820;
+    --surface-muted: #e8eee8;
+    --shadow: 0 18px 40px rgba(17, 24, 32, 0.08);
+    --shadow-heavy: 0 24px 60px rgba(17, 24, 32, 0.13);
+    --radius: 10px;
+    --radius-small: 6px;
+    --radius-pill: 999px;
+}
+
+@media (prefers-color-scheme: dark) {
+    :root {
+        --primary-color: #ff8a63;
+        --secondary-color: #ff8a63;
+        --text-color: #edf3ec;
+        --text-light: #aebaae;
+        --background-color: #111713;
+        --card-bg: #18211c;
+        --border-color: #344339;
+        --ink: #f6f1e8;
+        --surface-muted: #223029;
+        --shadow: 0 18px 45px rgba(0, 0, 0, 0.28);
+        --shadow-heavy: 0 24px 64px rgba(0, 0, 0, 0.36);
+    }
+}
+
+body {
+    min-height: 100dvh;
+    background:
+        radial-gradient(circle at 12% 0%, rgba(216, 86, 53, 0.12), transparent 26rem),
+        linear-gradient(90deg, rgba(17, 24, 32, 0.045) 1px, transparent 1px),
+        linear-gradient(180deg, rgba(17, 24, 32, 0.04) 1px, transparent 1px),
+        var(--background-color);
+    background-size: auto, 42px 42px, 42px 42px, auto;
+    font-family: "Aptos", "Segoe UI", "Microsoft YaHei UI", "PingFang SC", sans-serif;
+}
+
+a {
+    color: var(--primary-color);
+}
+
+a:hover {
+    color: var(--primary-color);
+    text-decoration-thickness: 2px;
+    text-underline-offset: 4px;
+}
+
+a:focus-visible,
+button:focus-visible {
+    outline-color: color-mix(in srgb, var(--primary-color), transparent 15%);
+}
+
+.container,
+.header-inner {
+    max-width: 1040px;
+}
+
+header {
+    border-bottom: 1px solid color-mix(in srgb, var(--border-color), var(--text-color) 18%);
+    background: color-mix(in srgb, var(--card-bg), transparent 9%);
+    box-shadow: none;
+}
+
+.header-inner {
+    min-height: 72px;
+}
+
+.logo {
+    color: var(--text-color);
+    font-size: 1.02rem;
+    font-weight: 850;
+    letter-spacing: 0;
+    text-transform: none;
+}
+
+.logo span {
+    color: var(--primary-color);
+}
+
+.back-link {
+    min-height: 42px;
+    border: 1px solid var(--border-color);
+    border-radius: var(--radius-pill);
+    background: var(--card-bg);
+    color: var(--text-color);
+    box-shadow: 0 12px 26px rgba(17, 24, 32, 0.06);
+}
+
+.back-link:hover {
+    background: var(--ink);
+    color: var(--background-color);
+    text-decoration: none;
+}
+
+.article-header {
+    margin-top: 56px;
+    padding: clamp(24px, 5vw, 46px);
+    border: 1px solid var(--border-color);
+    border-radius: var(--radius);
+    background: color-mix(in srgb, var(--card-bg), transparent 1%);
+    box-shadow: var(--shadow-heavy);
+}
+
+.article-title {
+    max-width: 820px;
+    color: var(--text-color);
+    font-size: clamp(2.2rem, 6vw, 4.75rem);
+    line-height: 1.02;
+    text-wrap: balance;
+}
+
+.article-meta {
+    gap: 10px;
+    border-top: 1px solid var(--border-color);
+}
+
+.article-meta-item,
+.mode-badge {
+    min-height: 34px;
+    padding: 0 11px;
+    border: 1px solid var(--border-color);
+    border-radius: var(--radius-pill);
+    background: color-mix(in srgb, var(--surface-muted), transparent 22%);
+    color: var(--text-color);
+}
+
+.article-cover {
+    margin: 32px 0 0;
+    border: 1px solid var(--border-color);
+    border-radius: var(--radius);
+    box-shadow: var(--shadow-heavy);
+}
+
+.article-cover img {
+    height: clamp(240px, 38vw, 430px);
+    display: block;
+    filter: saturate(0.78) contrast(1.08);
+}
+
+.article-cover:hover img {
+    transform: none;
+}
+
+.markdown-content {
+    max-width: 820px;
+    margin: 54px auto;
+    color: var(--text-color);
+    font-size: clamp(1rem, 1.1vw, 1.08rem);
+    line-height: 1.86;
+}
+
+.markdown-content p {
+    text-align: left;
+}
+
+.markdown-content a,
+.markdown-content code:not(pre code) {
+    overflow-wrap: anywhere;
+    word-break: break-word;
+}
+
+.markdown-content h1,
+.markdown-content h2,
+.markdown-content h3,
+.markdown-content h4 {
+    color: var(--text-color);
+    font-weight: 800;
+}
+
+.markdown-content h1 {
+    border-bottom: 1px solid var(--border-color);
+}
+
+.markdown-content h2 {
+    padding-left: 14px;
+    border-left: 5px solid var(--primary-color);
+}
+
+.markdown-content img {
+    border: 1px solid var(--border-color);
+    border-radius: var(--radius);
+    box-shadow: var(--shadow);
+}
+
+.markdown-content blockquote {
+    border-left-color: var(--primary-color);
+    border-radius: var(--radius-small);
+    background: color-mix(in srgb, var(--surface-muted), transparent 28%);
+    color: var(--text-color);
+}
+
+.markdown-content table {
+    border-collapse: separate;
+    border-spacing: 0;
+    overflow: hidden;
+    border: 1px solid var(--border-color);
+    border-radius: var(--radius);
+}
+
+.markdown-content th,
+.markdown-content td {
+    border: 0;
+    border-bottom: 1px solid var(--border-color);
+}
+
+.markdown-content th {
+    background: var(--surface-muted);
+    color: var(--text-color);
+}
+
+.markdown-content code:not(pre code) {
+    border: 1px solid color-mix(in srgb, var(--primary-color), transparent 72%);
+    border-radius: var(--radius-small);
+    background: color-mix(in srgb, var(--primary-color), transparent 90%);
+    color: var(--text-color);
+}
+
+.code-block-wrapper {
+    max-width: 100%;
+    overflow: hidden;
+    border: 1px solid color-mix(in srgb, var(--border-color), var(--text-color) 14%);
+    border-radius: var(--radius);
+    box-shadow: var(--shadow-heavy);
+}
+
+.code-block-header {
+    min-height: 50px;
+    background: #111820;
+}
+
+.copy-button {
+    min-height: 42px;
+    border: 1px solid rgba(251, 252, 248, 0.38);
+    border-radius: var(--radius-pill);
+}
+
+.copy-button:hover {
+    background: rgba(255, 255, 255, 0.18);
+}
+
+pre[class*="language-"],
+pre.line-numbers {
+    max-width: 100%;
+    overflow-x: auto !important;
+    white-space: pre !important;
+}
+
+.tag-list {
+    max-width: 820px;
+    margin: 42px auto 0;
+}
+
+.tag-list span {
+    min-height: 34px;
+    display: inline-flex;
+    align-items: center;
+    border: 1px solid color-mix(in srgb, var(--primary-color), transparent 42%);
+    border-radius: var(--radius-pill);
+    background: color-mix(in srgb, var(--primary-color), transparent 90%);
+    color: var(--text-color);
+}
+
+.loading-indicator,
+.error-container {
+    border: 1px solid var(--border-color);
+    border-radius: var(--radius);
+    background: var(--card-bg);
+    box-shadow: var(--shadow);
+}
+
+footer {
+    border-top: 1px solid var(--border-color);
+    background: color-mix(in srgb, var(--card-bg), transparent 35%);
+}
+
+@media (prefers-reduced-motion: no-preference) {
+    .article-header,
+    .article-cover,
+    .markdown-content,
+    .tag-list {
+        animation: archive-rise 0.55s cubic-bezier(0.16, 1, 0.3, 1) both;
+    }
+
+    .article-cover {
+        animation-delay: 0.08s;
+    }
+
+    .markdown-content {
+        animation-delay: 0.14s;
+    }
+}
+
+@keyframes archive-rise {
+    from {
+        opacity: 0;
+        transform: translateY(16px);
+    }
+    to {
+        opacity: 1;
+        transform: translateY(0);
+    }
+}
+
+@media (max-width: 768px) {
+    .article-header {
+        margin-top: 34px;
+    }
+
+    .article-title {
+        font-size: clamp(2rem, 12vw, 3.35rem);
+    }
+
+    .markdown-content {
+        margin: 38px 0;
+    }
+}
+
+@media (max-width: 480px) {
+    .article-meta-item,
+    .mode-badge {
+        width: 100%;
+    }
+
+    .copy-button {
+        min-height: 44px;
+    }
+}
+
+/* 相关文章 */
+.related-posts {
+    max-width: 820px;
+    margin: 42px auto 0;
+    padding-top: 24px;
+    border-top: 1px solid var(--border-color);
+}
+
+.related-posts h2 {
+    margin-bottom: 14px;
+    font-size: 1.2rem;
+}
+
+.related-posts ul {
+    list-style: none;
+    display: grid;
+    gap: 10px;
+}
+
+.related-posts li {
+    display: flex;
+    flex-wrap: wrap;
+    align-items: baseline;
+    justify-content: space-between;
+    gap: 4px 16px;
+}
+
+.related-posts a {
+    color: var(--primary-color);
+    font-weight: 600;
+    text-decoration: none;
+}
+
+.related-posts a:hover {
+    text-decoration: underline;
+}
+
+.related-posts span {
+    color: var(--text-light);
+    font-size: 0.9rem;
+}
+'''
+
+# 动态模式：浏览器端加载 Markdown 解析和代码高亮库
+DYNAMIC_HEAD_SCRIPTS = '''    <!-- Marked.js 库 -->
+    <script defer src="https://cdn.jsdelivr.net/npm/marked@18.0.5/lib/marked.umd.js" integrity="sha384-ZD0fTOwPMHi7zM6WTVIWJR21I07lq0ccnqz3J6WMvQKG9thh4y7TA1QE6PJu0Af8" crossorigin="anonymous"></script>
+    <script defer src="https://cdn.jsdelivr.net/npm/dompurify@3.4.10/dist/purify.min.js" integrity="sha384-eguRoJERj8ghOpzO//Rl7+ScQsQIR1cH+ajll7+fG+IpbNPlkZsQn9h8ccr+wPXx" crossorigin="anonymous"></script>
+    <!-- Prism.js 代码高亮 -->
+    <script defer src="https://cdnjs.cloudflare.com/ajax/libs/prism/1.29.0/prism.min.js" integrity="sha384-06z5D//U/xpvxZHuUz92xBvq3DqBBFi7Up53HRrbV7Jlv7Yvh/MZ7oenfUe9iCEt" crossorigin="anonymous"></script>
+    <script defer src="https://cdnjs.cloudflare.com/ajax/libs/prism/1.29.0/components/prism-python.min.js" integrity="sha384-WJdEkJKrbsqw0evQ4GB6mlsKe5cGTxBOw4KAEIa52ZLB7DDpliGkwdme/HMa5n1m" crossorigin="anonymous"></script>
+    <script defer src="https://cdnjs.cloudflare.com/ajax/libs/prism/1.29.0/components/prism-javascript.min.js" integrity="sha384-D44bgYYKvaiDh4cOGlj1dbSDpSctn2FSUj118HZGmZEShZcO2v//Q5vvhNy206pp" crossorigin="anonymous"></script>
+    <script defer src="https://cdnjs.cloudflare.com/ajax/libs/prism/1.29.0/components/prism-css.min.js" integrity="sha384-0mV13Neu0xhJFylI+HV43C+XiR13bGSeL7D0/7e6hK7sJgvyvK6HVjeQwmvXTstY" crossorigin="anonymous"></script>
+    <script defer src="https://cdnjs.cloudflare.com/ajax/libs/prism/1.29.0/components/prism-bash.min.js" integrity="sha384-9WmlN8ABpoFSSHvBGGjhvB3E/D8UkNB9HpLJjBQFC2VSQsM1odiQDv4NbEo+7l15" crossorigin="anonymous"></script>
+    <script defer src="https://cdnjs.cloudflare.com/ajax/libs/prism/1.29.0/components/prism-json.min.js" integrity="sha384-RhrmFFMb0ZCHImjFMpR/UE3VEtIVTCtNrtKQqXCzqXZNJala02N3UbVhi+qzw3CY" crossorigin="anonymous"></script>
+    <script defer src="https://cdnjs.cloudflare.com/ajax/libs/prism/1.29.0/components/prism-markdown.min.js" integrity="sha384-s888ApkYHxfPsp8n81g77Unl/0XYnYltLvWbwqKHcheRE8/dZPlT4IjW3mRGv/Hd" crossorigin="anonymous"></script>
+    <script defer src="https://cdnjs.cloudflare.com/ajax/libs/prism/1.29.0/components/prism-yaml.min.js" integrity="sha384-AKAiycghK0jDCjD+aavMHzDkLzRR7Yzcwh3+xL/295cvyVMe+cxQfyQC8xxGGcI8" crossorigin="anonymous"></script>
+    <script defer src="https://cdnjs.cloudflare.com/ajax/libs/prism/1.29.0/components/prism-csharp.min.js" integrity="sha384-nMKYzg6yfy0qgpaRpVhHvZp0gT5sgvmZYlFC0XAKZSp+zFUB9rE6zsdmIEiou4bV" crossorigin="anonymous"></script>
+    <script defer src="https://cdnjs.cloudflare.com/ajax/libs/prism/1.29.0/plugins/line-numbers/prism-line-numbers.min.js" integrity="sha384-6QJu8apxMmB9TiPVWzYKF5pRgKcz7snO0/QU+MrWmgBLECQjoa6erxX2VQ5t41Jd" crossorigin="anonymous"></script>
+'''
+
+# 动态模式：加载提示、错误提示和待渲染的内容容器
+DYNAMIC_ARTICLE_BODY = '''            <div class="loading-indicator" id="loading">
+                <i class="fas fa-spinner fa-spin"></i>
+                <p>正在加载文章内容...</p>
+                <p class="loading-hint">正在准备阅读内容</p>
+            </div>
+            
+            <div class="error-container" id="error-container" style="display: none;">
+                <i class="fas fa-exclamation-triangle"></i>
+                <h3>内容加载失败</h3>
+                <p id="error-message">未知错误</p>
+                <button type="button" id="retry-load" class="copy-button" style="margin-top: 15px;">
+                    <i class="fas fa-redo"></i> 重试加载
+                </button>
+            </div>
+            
+            <div class="markdown-content" id="markdown-content" data-source="{md_source}" data-images="{images}" style="display: none;">
+                <!-- Markdown内容将通过JavaScript动态渲染到这里 -->
+            </div>
+'''
+
+# 静态模式：构建时已渲染好的文章内容
+STATIC_ARTICLE_BODY = '''            <div class="markdown-content" id="markdown-content">
+{content}
+            </div>
+'''
+
+# 动态模式：等待库加载后请求 Markdown 并在浏览器中渲染
+DYNAMIC_POST_SCRIPT = '''    // 等待所有外部库加载完成
+    let librariesLoaded = false;
+    let markdownLoaded = false;
+    let prismLoaded = false;
+    
+    // 检查marked库是否已加载
+    function checkMarkedLoaded() {
+        if (typeof marked !== 'undefined') {
+            console.log('marked.js 已加载');
+            markdownLoaded = true;
+            checkAllLibrariesLoaded();
+        } else {
+            console.warn('marked.js 未加载，正在重试...');
+            setTimeout(checkMarkedLoaded, 500);
+        }
+    }
+    
+    // 检查Prism库是否已加载
+    function checkPrismLoaded() {
+        if (typeof Prism !== 'undefined') {
+            console.log('Prism.js 已加载');
+            prismLoaded = true;
+            checkAllLibrariesLoaded();
+        } else {
+            console.warn('Prism.js 未加载，正在重试...');
+            setTimeout(checkPrismLoaded, 500);
+        }
+    }
+    
+    // 检查所有库是否已加载
+    function checkAllLibrariesLoaded() {
+        if (markdownLoaded && prismLoaded && !librariesLoaded) {
+            librariesLoaded = true;
+            console.log('所有库已加载完成，开始初始化');
+            initializeMarked();
+            // 延迟加载Markdown内容，确保DOM完全加载
+            if (document.readyState === 'loading') {
+                document.addEventListener('DOMContentLoaded', startLoadingMarkdown);
+            } else {
+                startLoadingMarkdown();
+            }
+        }
+    }
+    
+    // 初始化marked.js
+    function initializeMarked() {
+        if (typeof marked !== 'undefined') {
+            // 配置marked.js
+            marked.setOptions({
+                breaks: true,           // 支持换行符
+                gfm: true,             // 支持GitHub风格的Markdown
+                headerIds: true,       // 自动生成标题ID
+                smartypants: true,     // 智能引号和破折号
+                highlight: function(code, lang) {
+                    if (lang && typeof Prism !== 'undefined' && Prism.languages[lang]) {
+                        try {
+                            return Prism.highlight(code, Prism.languages[lang], lang);
+                        } catch (e) {
+                            console.warn('Prism高亮失败:', e);
+                            return code;
+                        }
+                    }
+                    return code;
+                },
+                langPrefix: 'language-',
+            });
+            console.log('marked.js 初始化完成');
+        } else {
+            console.error('marked.js 未定义，无法初始化');
+        }
+    }
+    
+    // 开始加载Markdown
+    function startLoadingMarkdown() {
+        console.log('开始加载Markdown内容');
+        setTimeout(loadAndRenderMarkdown, 100);
+    }
+    
+    // 加载和渲染Markdown文件
+    async function loadAndRenderMarkdown() {
+        try {
+            // 首先检查库是否已加载
+            if (!librariesLoaded) {
+                throw new Error('必要的JavaScript库尚未加载完成，请稍后再试');
+            }
+            
+            if (typeof marked === 'undefined') {
                 throw new Error('marked.js 库加载失败');
-            }}
+            }
 
-            if (typeof DOMPurify === 'undefined') {{
+            if (typeof DOMPurify === 'undefined') {
                 throw new Error('DOMPurify 库加载失败');
-            }}
-            
-            // 隐藏错误提示，显示加载指示器
-            document.getElementById('error-container').style.display = 'none';
-            document.getElementById('loading').style.display = 'block';
-            document.getElementById('markdown-content').style.display = 'none';
-            
-            // 获取Markdown文件名
-            const mdFile = '{md_filename}';
-            
-            // 加载Markdown文件
-            const response = await fetch(mdFile, {{
-                cache: 'no-store'
-            }});
-            
-            if (!response.ok) {{
-                if (response.status === 404) {{
-                    throw new Error('找不到Markdown文件: ' + mdFile);
-                }} else {{
-                    throw new Error('HTTP错误! 状态码: ' + response.status);
-                }}
-            }}
-            
-            const markdownText = await response.text();
-            
-            if (!markdownText.trim()) {{
-                throw new Error('Markdown文件为空');
-            }}
-            
-            // 解析YAML front matter
-            let content = markdownText;
-            
-            // 检查是否有front matter
-            const frontMatterRegex = /^---\\s*\\n([\\s\\S]*?)\\n---\\s*\\n([\\s\\S]*)$/;
-            const match = markdownText.match(frontMatterRegex);
-            
-            if (match) {{
-                content = match[2];
-            }}
-            
+            }
+            
+            // 隐藏错误提示，显示加载指示器
+            document.getElementById('error-container').style.display = 'none';
+            document.getElementById('loading').style.display = 'block';
+            document.getElementById('markdown-content').style.display = 'none';
+            
+            // 获取Markdown文件地址（带内容版本号，内容变化时地址也会变化，可以直接使用浏览器缓存）
+            const mdFile = document.getElementById('markdown-content').dataset.source;
+            
+            // 加载Markdown文件
+            const response = await fetch(mdFile);
+            
+            if (!response.ok) {
+                if (response.status === 404) {
+                    throw new Error('找不到Markdown文件: ' + mdFile);
+                } else {
+                    throw new Error('HTTP错误! 状态码: ' + response.status);
+                }
+            }
+            
+            const markdownText = await response.text();
+            
+            if (!markdownText.trim()) {
+                throw new Error('Markdown文件为空');
+            }
+            
+            // 解析YAML front matter
+            let content = markdownText;
+            
+            // 检查是否有front matter
+            const frontMatterRegex = /^---\\s*\\n([\\s\\S]*?)\\n---\\s*\\n([\\s\\S]*)$/;
+            const match = markdownText.match(frontMatterRegex);
+            
+            if (match) {
+                content = match[2];
+            }
+            
             // 将Markdown转换为HTML
             let html = marked.parse(content);
 
-            html = html.replace(/<(\/?)h([1-5])(\s[^>]*)?>/g, function(match, closingSlash, level, attributes) {{
+            html = html.replace(/<(\/?)h([1-5])(\s[^>]*)?>/g, function(match, closingSlash, level, attributes) {
                 const nextLevel = Number(level) + 1;
                 return '<' + closingSlash + 'h' + nextLevel + (attributes || '') + '>';
-            }});
+            });
             
             // 处理代码块，添加复制按钮
             html = html.replace(
-                /<pre><code class="language-(.*?)">([\\s\\S]*?)<\\/code><\\/pre>/g,
-                function(match, lang, code) {{
-                    return `
-<div class="code-block-wrapper">
-  <div class="code-block-header">
-    <span class="code-language">${{lang}}</span>
+                /<pre><code class="language-(.*?)">([\\s\\S]*?)<\\/code><\\/pre>/g,
+                function(match, lang, code) {
+                    return `
+<div class="code-block-wrapper">
+  <div class="code-block-header">
+    <span class="code-language">${lang}</span>
     <button type="button" class="copy-button code-copy-button">
       <i class="fas fa-copy"></i> 复制代码
     </button>
-  </div>
-  <pre class="line-numbers language-${{lang}}"><code class="language-${{lang}}">${{code}}</code></pre>
-</div>`;
-                }}
-            );
-            
-            // 处理没有语言标签的代码块
-            html = html.replace(
-                /<pre><code>([\\s\\S]*?)<\\/code><\\/pre>/g,
-                function(match, code) {{
-                    return `
-<div class="code-block-wrapper">
-  <div class="code-block-header">
-    <span class="code-language">Text</span>
+  </div>
+  <pre class="line-numbers language-${lang}"><code class="language-${lang}">${code}</code></pre>
+</div>`;
+                }
+            );
+            
+            // 处理没有语言标签的代码块
+            html = html.replace(
+                /<pre><code>([\\s\\S]*?)<\\/code><\\/pre>/g,
+                function(match, code) {
+                    return `
+<div class="code-block-wrapper">
+  <div class="code-block-header">
+    <span class="code-language">Text</span>
     <button type="button" class="copy-button code-copy-button">
       <i class="fas fa-copy"></i> 复制代码
     </button>
-  </div>
-  <pre class="line-numbers"><code>${{code}}</code></pre>
-</div>`;
-                }}
-            );
-            
+  </div>
+  <pre class="line-numbers"><code>${code}</code></pre>
+</div>`;
+                }
+            );
+            
             html = DOMPurify.sanitize(html);
 
+            // 先在 <template> 中处理图片：此时还不会开始下载，浏览器可以直接按 srcset 选择变体
+            const template = document.createElement('template');
+            template.innerHTML = html;
+            // 本地图片补上宽高，有 WebP 变体时包成 <picture>（变体由生成工具写入 data-images）
+            const imageVariants = JSON.parse(document.getElementById('markdown-content').dataset.images || '{}');
+            template.content.querySelectorAll('img').forEach((img) => {
+                img.loading = 'lazy';
+                const variants = imageVariants[img.getAttribute('src')];
+                if (!variants) {
+                    return;
+                }
+                img.width = variants.width;
+                img.height = variants.height;
+                if (variants.srcset) {
+                    const picture = document.createElement('picture');
+                    const source = document.createElement('source');
+                    source.type = 'image/webp';
+                    source.srcset = variants.srcset;
+                    source.sizes = '(max-width: 900px) 100vw, 900px';
+                    img.replaceWith(picture);
+                    picture.append(source, img);
+                }
+            });
+
             // 插入到页面
-            document.getElementById('markdown-content').innerHTML = html;
-            
-            // 隐藏加载指示器，显示内容
-            document.getElementById('loading').style.display = 'none';
-            document.getElementById('markdown-content').style.display = 'block';
-            
-            // 初始化Prism.js语法高亮
-            if (typeof Prism !== 'undefined') {{
-                setTimeout(() => {{
-                    Prism.highlightAll();
-                    
-                    // 为所有代码块添加行号（如果尚未添加）
-                    document.querySelectorAll('pre[class*="language-"]').forEach((block) => {{
-                        if (!block.classList.contains('line-numbers')) {{
-                            block.classList.add('line-numbers');
-                        }}
-                    }});
-                }}, 100);
-            }}
-            
-            // 为所有图片添加懒加载和错误处理
-            document.querySelectorAll('#markdown-content img').forEach((img) => {{
-                img.loading = 'lazy';
-                img.onerror = function() {{
-                    this.alt = '图片加载失败';
-                    this.style.border = '1px solid #ff6b6b';
-                    this.style.padding = '10px';
-                }};
-            }});
-            
-        }} catch (error) {{
-            console.error('加载Markdown文件失败:', error);
-            
-            document.getElementById('loading').style.display = 'none';
-            document.getElementById('error-container').style.display = 'block';
-            document.getElementById('error-message').textContent = error.message;
-            
-            // 如果是库加载问题，提供解决方案
-            if (error.message.includes('marked') || error.message.includes('库')) {{
-                const errorMsg = document.getElementById('error-message');
+            document.getElementById('markdown-content').replaceChildren(template.content);
+            
+            // 隐藏加载指示器，显示内容
+            document.getElementById('loading').style.display = 'none';
+            document.getElementById('markdown-content').style.display = 'block';
+            
+            // 初始化Prism.js语法高亮
+            if (typeof Prism !== 'undefined') {
+                setTimeout(() => {
+                    Prism.highlightAll();
+                    
+                    // 为所有代码块添加行号（如果尚未添加）
+                    document.querySelectorAll('pre[class*="language-"]').forEach((block) => {
+                        if (!block.classList.contains('line-numbers')) {
+                            block.classList.add('line-numbers');
+                        }
+                    });
+                }, 100);
+            }
+            
+            // 为所有图片添加懒加载和错误处理
+            document.querySelectorAll('#markdown-content img').forEach((img) => {
+                img.loading = 'lazy';
+                img.onerror = function() {
+                    this.alt = '图片加载失败';
+                    this.style.border = '1px solid #ff6b6b';
+                    this.style.padding = '10px';
+                };
+            });
+            
+        } catch (error) {
+            console.error('加载Markdown文件失败:', error);
+            
+            document.getElementById('loading').style.display = 'none';
+            document.getElementById('error-container').style.display = 'block';
+            document.getElementById('error-message').textContent = error.message;
+            
+            // 如果是库加载问题，提供解决方案
+            if (error.message.includes('marked') || error.message.includes('库')) {
+                const errorMsg = document.getElementById('error-message');
                 errorMsg.replaceChildren(
                     document.createTextNode(error.message),
                     document.createElement('br'),
@@ -1658,182 +3484,549 @@ def create_post_html(post_data, post_filename):
                     document.createElement('br'),
                     document.createTextNode('3. 确保JavaScript没有被浏览器阻止')
                 );
-            }}
-        }}
-    }}
-    
-    // 复制代码功能
-    function copyCode(button) {{
-        const codeBlock = button.parentElement.nextElementSibling;
-        const codeText = codeBlock.textContent;
-        
-        const textArea = document.createElement('textarea');
-        textArea.value = codeText;
-        textArea.style.position = 'fixed';
-        textArea.style.opacity = '0';
-        document.body.appendChild(textArea);
-        
-        textArea.select();
-        textArea.setSelectionRange(0, 99999);
-        
-        let success = false;
-        try {{
-            success = document.execCommand('copy');
-        }} catch (err) {{
-            console.error('复制失败:', err);
-        }}
-        
-        document.body.removeChild(textArea);
-        
-        if (success) {{
-            const originalText = button.innerHTML;
-            button.innerHTML = '<i class="fas fa-check"></i> 已复制';
-            button.classList.add('copied');
-            
-            setTimeout(() => {{
-                button.innerHTML = originalText;
-                button.classList.remove('copied');
-            }}, 2000);
-        }} else {{
-            // 如果execCommand失败，尝试使用Clipboard API
-            if (navigator.clipboard && navigator.clipboard.writeText) {{
-                navigator.clipboard.writeText(codeText).then(() => {{
-                    const originalText = button.innerHTML;
-                    button.innerHTML = '<i class="fas fa-check"></i> 已复制';
-                    button.classList.add('copied');
-                    
-                    setTimeout(() => {{
-                        button.innerHTML = originalText;
-                        button.classList.remove('copied');
-                    }}, 2000);
-                }}).catch(err => {{
-                    console.error('复制失败:', err);
-                    button.innerHTML = '<i class="fas fa-times"></i> 复制失败';
-                    setTimeout(() => {{
-                        button.innerHTML = '<i class="fas fa-copy"></i> 复制代码';
-                    }}, 2000);
-                }});
-            }}
-        }}
-    }}
-    
-    // 页面加载后开始检查库状态
-    document.addEventListener('DOMContentLoaded', function() {{
-        console.log('DOM加载完成，开始检查外部库...');
-        
+            }
+        }
+    }
+    
+    // 页面加载后开始检查库状态
+    document.addEventListener('DOMContentLoaded', function() {
+        console.log('DOM加载完成，开始检查外部库...');
+        
         // 开始检查库加载状态
         checkMarkedLoaded();
         checkPrismLoaded();
 
         const retryButton = document.getElementById('retry-load');
-        if (retryButton) {{
+        if (retryButton) {
             retryButton.addEventListener('click', loadAndRenderMarkdown);
-        }}
+        }
+        
+        // 设置超时检查
+        setTimeout(() => {
+            if (!librariesLoaded) {
+                console.warn('库加载超时，尝试继续...');
+                // 即使库未完全加载，也尝试继续
+                if (typeof marked === 'undefined') {
+                    console.error('marked.js 加载失败，无法渲染Markdown');
+                    document.getElementById('loading').innerHTML = 
+                        '<i class="fas fa-exclamation-triangle"></i>' +
+                        '<p>JavaScript库加载失败</p>' +
+                        '<p>请刷新页面或检查网络连接</p>';
+                } else {
+                    // 如果marked已加载但其他库未加载，仍然可以继续
+                    librariesLoaded = true;
+                    initializeMarked();
+                    startLoadingMarkdown();
+                }
+            }
+        }, 10000); // 10秒超时
+        
+        // 添加键盘快捷键支持
+        document.addEventListener('keydown', function(e) {
+            // Ctrl/Cmd + F 搜索
+            if ((e.ctrlKey || e.metaKey) && e.key === 'f') {
+                e.preventDefault();
+                // 这里可以添加搜索功能
+            }
+            
+            // Esc 键清除搜索
+            if (e.key === 'Escape') {
+                // 这里可以添加清除搜索功能
+            }
+        });
+    });
+    
+    // 监听网络状态变化
+    window.addEventListener('online', function() {
+        console.log('网络已恢复，尝试重新加载内容');
+        document.querySelector('.loading-hint').textContent = '检测到网络恢复，正在重新加载...';
+        loadAndRenderMarkdown();
+    });
+    
+    window.addEventListener('offline', function() {
+        console.log('网络断开');
+        if (!document.getElementById('markdown-content').innerHTML) {
+            document.querySelector('.loading-hint').textContent = '网络连接已断开，请检查网络连接后刷新页面';
+        }
+    });
+    
+    // 提供手动重新加载函数
+    window.reloadMarkdown = function() {
+        console.log('手动重新加载Markdown');
+        loadAndRenderMarkdown();
+    };
+'''
 
-        document.getElementById('markdown-content').addEventListener('click', function(e) {{
+STATIC_POST_SCRIPT = '''    // 静态渲染：内容已在 HTML 中，只需处理图片加载失败
+    document.addEventListener('DOMContentLoaded', function() {
+        document.querySelectorAll('#markdown-content img').forEach((img) => {
+            const markBroken = function() {
+                img.alt = '图片加载失败';
+                img.style.border = '1px solid #ff6b6b';
+                img.style.padding = '10px';
+            };
+            if (img.complete && img.naturalWidth === 0) {
+                markBroken();
+            } else {
+                img.addEventListener('error', markBroken);
+            }
+        });
+    });
+    
+'''
+
+# 两种模式共用的复制代码脚本
+POST_COPY_SCRIPT = '''    // 复制代码功能
+    function copyCode(button) {
+        const codeBlock = button.parentElement.nextElementSibling;
+        const codeText = codeBlock.textContent;
+        
+        const textArea = document.createElement('textarea');
+        textArea.value = codeText;
+        textArea.style.position = 'fixed';
+        textArea.style.opacity = '0';
+        document.body.appendChild(textArea);
+        
+        textArea.select();
+        textArea.setSelectionRange(0, 99999);
+        
+        let success = false;
+        try {
+            success = document.execCommand('copy');
+        } catch (err) {
+            console.error('复制失败:', err);
+        }
+        
+        document.body.removeChild(textArea);
+        
+        if (success) {
+            const originalText = button.innerHTML;
+            button.innerHTML = '<i class="fas fa-check"></i> 已复制';
+            button.classList.add('copied');
+            
+            setTimeout(() => {
+                button.innerHTML = originalText;
+                button.classList.remove('copied');
+            }, 2000);
+        } else {
+            // 如果execCommand失败，尝试使用Clipboard API
+            if (navigator.clipboard && navigator.clipboard.writeText) {
+                navigator.clipboard.writeText(codeText).then(() => {
+                    const originalText = button.innerHTML;
+                    button.innerHTML = '<i class="fas fa-check"></i> 已复制';
+                    button.classList.add('copied');
+                    
+                    setTimeout(() => {
+                        button.innerHTML = originalText;
+                        button.classList.remove('copied');
+                    }, 2000);
+                }).catch(err => {
+                    console.error('复制失败:', err);
+                    button.innerHTML = '<i class="fas fa-times"></i> 复制失败';
+                    setTimeout(() => {
+                        button.innerHTML = '<i class="fas fa-copy"></i> 复制代码';
+                    }, 2000);
+                });
+            }
+        }
+    }
+    
+    // 代码块复制按钮使用事件委托，动态和静态渲染共用
+    document.addEventListener('DOMContentLoaded', function() {
+        document.getElementById('markdown-content').addEventListener('click', function(e) {
             const copyButton = e.target.closest('.code-copy-button');
-            if (copyButton) {{
+            if (copyButton) {
                 copyCode(copyButton);
-            }}
-        }});
+            }
+        });
+    });
+'''
+
+# 相关文章：读到文章末尾附近时才下载构建时为本文写出的 assets/related-N.json，列出其中的标题
+RELATED_POST_SCRIPT = r'''
+    document.addEventListener('DOMContentLoaded', function() {
+        const section = document.getElementById('related-posts');
+        if (!section || !('IntersectionObserver' in window)) {
+            return;
+        }
+        const observer = new IntersectionObserver((entries) => {
+            if (entries.some(entry => entry.isIntersecting)) {
+                observer.disconnect();
+                loadRelatedPosts(section);
+            }
+        }, { rootMargin: '600px 0px' });
+        observer.observe(section);
+    });
+
+    async function loadRelatedPosts(section) {
+        try {
+            // 构建时为每篇文章写出的小文件，只含相关文章的标题、链接、分类和日期，不读取整个配置
+            const response = await fetch(section.dataset.src, { cache: 'no-cache' });
+            if (!response.ok) {
+                return;
+            }
+
+            const related = (await response.json()).posts || [];
+            if (!related.length) {
+                return;
+            }
+
+            const list = document.getElementById('related-list');
+            related.forEach((post) => {
+                const item = document.createElement('li');
+                const anchor = document.createElement('a');
+                anchor.href = post.link;
+                anchor.textContent = post.title;
+                const meta = document.createElement('span');
+                meta.textContent = [post.category, post.date].filter(Boolean).join(' · ');
+                item.append(anchor, meta);
+                list.appendChild(item);
+            });
+            section.hidden = false;
+        } catch (error) {
+            console.error('相关文章加载失败:', error);
+        }
+    }
+'''
+
+def get_post_script(render_mode):
+    """拼接文章页面共享脚本"""
+    mode_script = STATIC_POST_SCRIPT if render_mode == 'static' else DYNAMIC_POST_SCRIPT
+    return textwrap.dedent(mode_script + POST_COPY_SCRIPT + RELATED_POST_SCRIPT)
+
+ASSET_FINGERPRINT_PATTERN = re.compile(r'^(.+)\.[0-9a-f]{10}\.(\w+)$')
+ASSET_REFERENCE_PATTERN = re.compile(r'assets/[\w.-]+\.[0-9a-f]{10}\.\w+')
+
+def write_fingerprinted_asset(name, extension, content):
+    """按内容哈希命名写入静态资源，内容不变时文件名不变，已存在则跳过"""
+    data = content.encode('utf-8')
+    asset_path = f"{ASSETS_DIR}/{name}.{hash_bytes(data)[:10]}.{extension}"
+    if not os.path.exists(asset_path):
+        os.makedirs(ASSETS_DIR, exist_ok=True)
+        with open(asset_path, 'wb') as f:
+            f.write(data)
+    return asset_path
+
+def get_referenced_assets():
+    """所有文章页面引用的带哈希资源，包括没有 Markdown 源文件、不再重新生成的页面"""
+    referenced = set()
+    for post_filename in get_all_post_files():
+        try:
+            with open(post_filename, 'r', encoding='utf-8') as f:
+                referenced.update(ASSET_REFERENCE_PATTERN.findall(f.read()))
+        except (OSError, UnicodeDecodeError):
+            continue
+    return referenced
+
+def remove_stale_assets(current_paths):
+    """删除与 current_paths 同名、但内容哈希不同且已没有文章页面引用的旧资源文件"""
+    stale_paths = []
+    for asset_path in current_paths:
+        name, extension = ASSET_FINGERPRINT_PATTERN.match(os.path.basename(asset_path)).groups()
+        for path in glob.glob(os.path.join(ASSETS_DIR, f'{glob.escape(name)}.*.{extension}')):
+            path = path.replace(os.sep, '/')
+            match = ASSET_FINGERPRINT_PATTERN.match(os.path.basename(path))
+            if path != asset_path and match and match.groups() == (name, extension):
+                stale_paths.append(path)
+    # 有旧版本时才扫描页面：生成失败或源文件已删除的页面仍引用旧版本，这些文件要保留
+    if stale_paths:
+        referenced = get_referenced_assets()
+        for path in stale_paths:
+            if path not in referenced:
+                os.remove(path)
+
+def get_local_image_path(src):
+    """图片地址指向站点目录内的文件时返回本地路径；外链、data: 地址和站点目录外的文件返回 None"""
+    src = unescape(src).split('#', 1)[0].split('?', 1)[0]
+    if not src or src.startswith('//') or re.match(r'^[a-zA-Z][\w+.-]*:', src):
+        return None
+    path = os.path.normpath(unquote(src).lstrip('/\\'))
+    if path.startswith('..') or os.path.isabs(path) or not os.path.isfile(path):
+        return None
+    return path
+
+def read_image_size(path):
+    """从文件头读取 PNG、GIF、JPEG、WebP 的宽高，无法识别时返回 None"""
+    try:
+        with open(path, 'rb') as f:
+            head = f.read(32)
+            if head.startswith(b'\x89PNG\r\n\x1a\n') and head[12:16] == b'IHDR':
+                return struct.unpack('>II', head[16:24])
+            if head[:6] in (b'GIF87a', b'GIF89a'):
+                return struct.unpack('<HH', head[6:10])
+            if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+                if head[12:16] == b'VP8 ':
+                    width, height = struct.unpack('<HH', head[26:30])
+                    return width & 0x3fff, height & 0x3fff
+                if head[12:16] == b'VP8L':
+                    bits = struct.unpack('<I', head[21:25])[0]
+                    return (bits & 0x3fff) + 1, ((bits >> 14) & 0x3fff) + 1
+                if head[12:16] == b'VP8X':
+                    return int.from_bytes(head[24:27], 'little') + 1, int.from_bytes(head[27:30], 'little') + 1
+                return None
+            if head[:2] == b'\xff\xd8':
+                # 逐段跳过 JPEG 标记，直到帧头（SOF）
+                f.seek(2)
+                while True:
+                    marker = f.read(2)
+                    while marker[:1] == b'\xff' and marker[1:] == b'\xff':
+                        marker = marker[1:] + f.read(1)
+                    if len(marker) < 2 or marker[0] != 0xff:
+                        return None
+                    if 0xc0 <= marker[1] <= 0xcf and marker[1] not in (0xc4, 0xc8, 0xcc):
+                        height, width = struct.unpack('>xxxHH', f.read(7))
+                        return width, height
+                    f.seek(struct.unpack('>H', f.read(2))[0] - 2, 1)
+    except (OSError, struct.error):
+        return None
+    return None
+
+def get_image_size(path):
+    """图片的显示尺寸：有 Pillow 时按 EXIF 方向换算宽高，否则从文件头读取"""
+    if Image is None:
+        return read_image_size(path)
+    try:
+        with Image.open(path) as image:
+            width, height = image.size
+            # EXIF 方向 5～8 表示旋转 90 度，浏览器显示时宽高互换
+            if image.getexif().get(0x0112) in (5, 6, 7, 8):
+                width, height = height, width
+            return width, height
+    except (OSError, ValueError):
+        return None
+
+def write_image_variants(path, width, height):
+    """生成不超过原图宽度的 WebP 变体，返回 srcset；变体已存在时跳过编码
+
+    未安装 Pillow、动图和矢量图返回空串。变体文件名带原图内容哈希和处理参数，原图或参数变化时文件名随之变化。
+    """
+    if Image is None or os.path.splitext(path)[1].lower() not in IMAGE_VARIANT_EXTENSIONS:
+        return ''
+    digest = hash_bytes(f'{IMAGE_VARIANTS_VERSION}:{IMAGE_WEBP_QUALITY}:{hash_file(path)}'.encode('utf-8'))[:10]
+    stem = re.sub(r'[^A-Za-z0-9_-]+', '-', os.path.splitext(os.path.basename(path))[0]).strip('-')[:40] or 'image'
+    widths = [variant_width for variant_width in IMAGE_VARIANT_WIDTHS if variant_width < width] + [width]
+    variants = [(variant_width, f"{ASSETS_DIR}/{stem}-{variant_width}w.{digest}.webp") for variant_width in widths]
+
+    missing = [(variant_width, variant_path) for variant_width, variant_path in variants if not os.path.exists(variant_path)]
+    if missing:
+        os.makedirs(ASSETS_DIR, exist_ok=True)
+        resample = getattr(Image, 'Resampling', Image).LANCZOS
+        with Image.open(path) as image:
+            image = ImageOps.exif_transpose(image)
+            if image.mode not in ('RGB', 'RGBA'):
+                has_alpha = 'A' in image.getbands() or 'transparency' in image.info
+                image = image.convert('RGBA' if has_alpha else 'RGB')
+            for variant_width, variant_path in missing:
+                size = (variant_width, max(1, round(height * variant_width / width)))
+                variant = image if size == image.size else image.resize(size, resample)
+                # 先写临时文件再替换，并行构建的进程不会读到写了一半的变体
+                fd, temp_path = tempfile.mkstemp(prefix='.image-', suffix='.tmp', dir=ASSETS_DIR)
+                os.close(fd)
+                try:
+                    variant.save(temp_path, 'WEBP', quality=IMAGE_WEBP_QUALITY)
+                    os.chmod(temp_path, 0o644)
+                    os.replace(temp_path, variant_path)
+                except BaseException:
+                    try:
+                        os.remove(temp_path)
+                    except OSError:
+                        pass
+                    raise
+    return ', '.join(f'{variant_path} {variant_width}w' for variant_width, variant_path in variants)
+
+IMAGE_VARIANTS = {}
+
+def get_image_variants(src):
+    """本地图片的尺寸和 WebP 变体 {"width", "height", "srcset"}，按文件签名缓存；不是本地图片或无法识别时返回 None"""
+    path = get_local_image_path(src)
+    if path is None:
+        return None
+    key = (path, tuple(get_file_signature(path)))
+    if key not in IMAGE_VARIANTS:
+        size = get_image_size(path)
+        IMAGE_VARIANTS[key] = size and {"width": size[0], "height": size[1], "srcset": write_image_variants(path, *size)}
+    return IMAGE_VARIANTS[key]
+
+def get_unsplash_srcset(url):
+    """Unsplash 图片按 w 参数生成多种宽度的 srcset，其他地址返回空串"""
+    if not UNSPLASH_WIDTH_PATTERN.match(url):
+        return ''
+    return ', '.join(
+        f"{UNSPLASH_WIDTH_PATTERN.sub(lambda match: match.group(1) + str(width), url)} {width}w"
+        for width in REMOTE_COVER_WIDTHS
+    )
+
+def apply_image_variants(html):
+    """给正文中的本地图片补上宽高（加载前先占好位置），有 WebP 变体时包成 <picture>"""
+    def replace(match):
+        variants = get_image_variants(match.group(1))
+        if variants is None:
+            return match.group(0)
+        img = f'<img src="{match.group(1)}"{match.group(2)} width="{variants["width"]}" height="{variants["height"]}">'
+        if not variants['srcset']:
+            return img
+        return f'<picture><source type="image/webp" srcset="{escape(variants["srcset"])}" sizes="{IMAGE_SIZES}">{img}</picture>'
+    return HTML_IMAGE_PATTERN.sub(replace, html)
+
+def get_image_variant_map(content):
+    """动态模式：正文中本地图片（按页面中编码后的地址）到尺寸和变体的映射，由文章页面脚本在渲染后应用"""
+    images = {}
+    for src in MD_IMAGE_SOURCE_PATTERN.findall(content):
+        url = clean_markdown_url(src)
+        variants = get_image_variants(url) if url else None
+        if variants:
+            images[unescape(url)] = variants
+    return images
+
+def get_post_image_signatures(md_filename):
+    """文章引用的本地图片（正文和封面）的签名，图片被替换后页面需要重新生成"""
+    with open(md_filename, 'r', encoding='utf-8') as f:
+        text = f.read()
+    signatures = {}
+    for src in MD_IMAGE_SOURCE_PATTERN.findall(text) + COVER_IMAGE_LINE_PATTERN.findall(text):
+        path = get_local_image_path(src)
+        if path:
+            signatures[path] = get_file_signature(path)
+    return signatures
+
+def render_cover_image(cover_image, title):
+    """文章封面：本地图片使用 WebP 变体和实际宽高，Unsplash 图片按 w 参数提供多种宽度"""
+    attributes = ' width="1170" height="780"'
+    sources = ''
+    variants = get_image_variants(cover_image)
+    if variants:
+        attributes = f' width="{variants["width"]}" height="{variants["height"]}"'
+        if variants['srcset']:
+            sources = f'<source type="image/webp" srcset="{escape(variants["srcset"])}" sizes="{IMAGE_SIZES}">'
+    elif get_unsplash_srcset(cover_image):
+        attributes = f' srcset="{get_unsplash_srcset(cover_image)}" sizes="{IMAGE_SIZES}"' + attributes
+    img = f'<img src="{cover_image}" alt="{title}"{attributes} loading="eager" fetchpriority="high">'
+    return f'<picture>{sources}{img}</picture>' if sources else img
+
+@profiled('assets')
+def write_post_assets(blog_config=None):
+    """写出文章页面共享的 CSS 和 JS，返回页面引用的路径"""
+    if blog_config is None:
+        blog_config = load_blog_config()
+    return {
+        "css": write_fingerprinted_asset('post', 'css', POST_CSS),
+        "js": write_fingerprinted_asset('post', 'js', get_post_script(get_render_mode(blog_config))),
+    }
+
+@functools.lru_cache(maxsize=None)
+def compile_template(template):
+    """把 str.format 模板预先拆成 ((静态片段, 字段名), ...)，每个模板只解析一次，批量构建时所有文章共用"""
+    parts = []
+    for literal, field, format_spec, conversion in string.Formatter().parse(template):
+        if format_spec or conversion:
+            raise ValueError(f"模板字段不支持格式说明: {{{field}}}")
+        parts.append((literal, field))
+    return tuple(parts)
+
+def iter_template(template, values):
+    """按预编译的片段依次产出模板文本，不拼接整页字符串；值为列表时逐段输出（用于嵌套模板）"""
+    for literal, field in compile_template(template):
+        if literal:
+            yield literal
+        if field is not None:
+            value = values[field]
+            if isinstance(value, list):
+                yield from value
+            else:
+                yield str(value)
+
+def get_post_html_parts(post_data, post_filename, blog_config=None, assets=None):
+    """生成文章页面 HTML 的片段列表，static 模式直接输出渲染和高亮好的正文，dynamic 模式由浏览器解析 Markdown"""
+    # 获取对应的Markdown文件名
+    md_filename = post_filename.replace('.html', '.md')
+    if blog_config is None:
+        blog_config = load_blog_config()
+    if assets is None:
+        assets = write_post_assets(blog_config)
+
+    if get_render_mode(blog_config) == 'static':
+        head_scripts = ''
+        with profile_stage('markdown', post_filename):
+            content_html = render_article_html(post_data.get('content', ''), get_code_highlighter(blog_config))
+        with profile_stage('images', post_filename):
+            article_body = list(iter_template(STATIC_ARTICLE_BODY, {'content': apply_image_variants(content_html)}))
+    else:
+        head_scripts = DYNAMIC_HEAD_SCRIPTS
+        with profile_stage('images', post_filename):
+            images = json.dumps(get_image_variant_map(post_data.get('content', '')), ensure_ascii=False, separators=(',', ':'))
+            article_body = list(iter_template(DYNAMIC_ARTICLE_BODY, {
+                'md_source': escape(get_versioned_url(md_filename)),
+                'images': escape(images),
+            }))
+
+    with profile_stage('images', post_filename):
+        cover = render_cover_image(post_data['cover_image'].replace('&amp;', '&'), escape(post_data['title']))
+    
+    with profile_stage('template', post_filename):
+        # 处理标签
+        tags_html = ''
+        for tag in post_data.get('tags', []):
+            tags_html += f'                <span>{escape(tag)}</span>\n'
         
-        // 设置超时检查
-        setTimeout(() => {{
-            if (!librariesLoaded) {{
-                console.warn('库加载超时，尝试继续...');
-                // 即使库未完全加载，也尝试继续
-                if (typeof marked === 'undefined') {{
-                    console.error('marked.js 加载失败，无法渲染Markdown');
-                    document.getElementById('loading').innerHTML = 
-                        '<i class="fas fa-exclamation-triangle"></i>' +
-                        '<p>JavaScript库加载失败</p>' +
-                        '<p>请刷新页面或检查网络连接</p>';
-                }} else {{
-                    // 如果marked已加载但其他库未加载，仍然可以继续
-                    librariesLoaded = true;
-                    initializeMarked();
-                    startLoadingMarkdown();
-                }}
-            }}
-        }}, 10000); // 10秒超时
+        # 获取当前年份
+        current_year = datetime.now().year
         
-        // 添加键盘快捷键支持
-        document.addEventListener('keydown', function(e) {{
-            // Ctrl/Cmd + F 搜索
-            if ((e.ctrlKey || e.metaKey) && e.key === 'f') {{
-                e.preventDefault();
-                // 这里可以添加搜索功能
-            }}
-            
-            // Esc 键清除搜索
-            if (e.key === 'Escape') {{
-                // 这里可以添加清除搜索功能
-            }}
-        }});
-    }});
-    
-    // 监听网络状态变化
-    window.addEventListener('online', function() {{
-        console.log('网络已恢复，尝试重新加载内容');
-        document.querySelector('.loading-hint').textContent = '检测到网络恢复，正在重新加载...';
-        loadAndRenderMarkdown();
-    }});
-    
-    window.addEventListener('offline', function() {{
-        console.log('网络断开');
-        if (!document.getElementById('markdown-content').innerHTML) {{
-            document.querySelector('.loading-hint').textContent = '网络连接已断开，请检查网络连接后刷新页面';
-        }}
-    }});
-    
-    // 提供手动重新加载函数
-    window.reloadMarkdown = function() {{
-        console.log('手动重新加载Markdown');
-        loadAndRenderMarkdown();
-    }};
-    </script>
-</body>
-</html>'''
-    
-    # 处理标签
-    tags_html = ''
-    for tag in post_data.get('tags', []):
-        tags_html += f'                <span>{escape(tag)}</span>\n'
-    
-    # 获取当前年份
-    current_year = datetime.now().year
-    
-    # 将格式化后的内容嵌入到模板中
-    full_html = post_template.format(
-        title=escape(post_data['title']),
-        category=escape(post_data['category']),
-        date=post_data['date'],
-        reading_time=post_data['reading_time'],
-        cover_image=post_data['cover_image'].replace('&amp;', '&'),
-        md_filename=md_filename,
-        tags=tags_html.rstrip(),
-        current_year=current_year
-    )
-    
-    return full_html
-
-def get_excerpt_from_config(post_filename):
-    """从 posts-config.json 中提取文章摘要"""
-    config = load_posts_config(warn=False)
-    for post in config.get('posts', []):
-        if post.get('link') == post_filename:
-            return post.get('excerpt')
-    return None
+        # 按预编译的模板片段依次填入内容，正文等大段内容直接引用，不再复制进整页字符串
+        return list(iter_template(POST_TEMPLATE, {
+            'title': escape(post_data['title']),
+            'category': escape(post_data['category']),
+            'date': post_data['date'],
+            'reading_time': post_data['reading_time'],
+            'cover': cover,
+            'post_css': assets['css'],
+            'post_js': assets['js'],
+            'head_scripts': head_scripts,
+            'article_body': article_body,
+            'tags': tags_html.rstrip(),
+            'related_source': escape(get_related_file_path(extract_post_number(post_filename))),
+            'current_year': current_year,
+        }))
+
+def create_post_html(post_data, post_filename, blog_config=None, assets=None):
+    """生成完整的文章页面 HTML 字符串"""
+    return ''.join(get_post_html_parts(post_data, post_filename, blog_config, assets))
+
+def write_post_html(post_data, post_filename, blog_config=None, assets=None):
+    """生成文章页面并把模板片段依次写入 post_filename，不在内存中拼接整页 HTML"""
+    parts = get_post_html_parts(post_data, post_filename, blog_config, assets)
+    with profile_stage('write_html', post_filename), open(post_filename, 'w', encoding='utf-8') as f:
+        f.writelines(parts)
 
-def parse_existing_post(post_filename):
-    """解析现有文章，提取信息"""
-    if not os.path.exists(post_filename):
+def get_excerpt_from_config(post_filename, posts=None):
+    """从 posts-config.json 中提取文章摘要，传入 posts 时复用已加载的配置"""
+    if posts is None:
+        posts = PostsRepository(warn=False)
+    return posts.get_excerpt(post_filename)
+
+def parse_existing_post(post_filename, posts=None):
+    """解析现有文章，提取信息"""
+    post_data = parse_post_page(post_filename)
+    if post_data is None:
+        return None
+
+    # 从 posts-config.json 提取摘要
+    post_data['excerpt'] = get_excerpt_from_config(post_filename, posts)
+    return post_data
+
+def parse_post_page(post_filename):
+    """只解析文章页面本身的元数据（摘要不在页面中，由调用方从配置补充）"""
+    if not os.path.exists(post_filename):
         return None
     
     # 只处理HTML文件
-    with open(post_filename, 'r', encoding='utf-8') as f:
+    with profile_stage('read', post_filename), open(post_filename, 'r', encoding='utf-8') as f:
         content = f.read()
-    
+
+    with profile_stage('html_extract', post_filename):
+        return extract_post_page_metadata(content, post_filename)
+
+def extract_post_page_metadata(content, post_filename):
+    """用正则从文章页面 HTML 中提取标题、分类、日期、封面、阅读时间和标签"""
     post_data = {'mode': 'dynamic'}  # 所有文章都是动态模式
     
     # 提取标题
@@ -1856,80 +4049,177 @@ def parse_existing_post(post_filename):
     if img_match:
         post_data['cover_image'] = unescape(img_match.group(1))
     
-    # 提取标签
-    tags_match = re.search(r'<div class="tag-list">(.*?)</div>', content, re.DOTALL)
+    # 提取阅读时间
+    reading_time_match = re.search(r'<span>阅读时间：(\d+) 分钟</span>', content)
+    if reading_time_match:
+        post_data['reading_time'] = int(reading_time_match.group(1))
+    
+    # 提取标签
+    tags_match = re.search(r'<div class="tag-list">(.*?)</div>', content, re.DOTALL)
     if tags_match:
         tags_html = tags_match.group(1)
         tags = re.findall(r'<span>(.*?)</span>', tags_html)
-        post_data['tags'] = [unescape(tag) for tag in tags]
-    
-    # 从 posts-config.json 提取摘要
-    post_data['excerpt'] = get_excerpt_from_config(post_filename)
-    
-    # 提取文章编号
+        post_data['tags'] = [unescape(tag) for tag in tags]
+    
+    # 提取文章编号
     post_number = extract_post_number(post_filename)
     if post_number is not None:
         post_data['post_number'] = post_number
 
     return post_data
 
-def update_posts_config(post_data, post_filename, is_new_post=True):
-    """更新 posts-config.json，添加新文章或更新现有文章"""
-    config = load_posts_config()
+def new_post_index():
+    """创建空的文章元数据索引：posts 按编号索引，titles 按标题索引"""
+    return {"version": POST_INDEX_VERSION, "posts": {}, "titles": {}}
+
+@profiled('post_index')
+def load_post_index(index_path=POST_INDEX_PATH):
+    """读取文章元数据索引，缺失、损坏或版本不符时返回空索引"""
+    if not os.path.exists(index_path):
+        return new_post_index()
+
+    try:
+        with open(index_path, 'r', encoding='utf-8') as f:
+            index = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return new_post_index()
+
+    if (not isinstance(index, dict)
+            or index.get('version') != POST_INDEX_VERSION
+            or not isinstance(index.get('posts'), dict)
+            or not isinstance(index.get('titles'), dict)):
+        return new_post_index()
+    return index
+
+@profiled('post_index')
+def save_post_index(index, index_path=POST_INDEX_PATH):
+    """保存文章元数据索引"""
+    write_json_atomic(index_path, index, **CACHE_JSON_OPTIONS)
+
+def get_post_metadata(post_data):
+    """提取需要写入索引的文章元数据"""
+    return {field: post_data[field] for field in POST_METADATA_FIELDS if field in post_data}
+
+def index_post(index, post_number, post_data):
+    """写入或更新一篇文章的索引，同时记录页面文件签名用于判断索引是否过期"""
+    unindex_post(index, post_number)
+    post_filename = f"post{post_number}.html"
+    entry = get_post_metadata(post_data)
+    entry['html_signature'] = get_file_signature(post_filename) if os.path.exists(post_filename) else None
+    index['posts'][str(post_number)] = entry
+
+    # 同名文章以编号最小的为准，与逐个扫描文件的结果一致
+    title = entry.get('title')
+    if title is not None:
+        current = index['titles'].get(title)
+        if current is None or post_number < current:
+            index['titles'][title] = post_number
+
+def unindex_post(index, post_number):
+    """从索引中移除一篇文章"""
+    entry = index['posts'].pop(str(post_number), None)
+    if not entry or index['titles'].get(entry.get('title')) != post_number:
+        return
+
+    title = entry['title']
+    del index['titles'][title]
+    same_title = [int(number) for number, other in index['posts'].items() if other.get('title') == title]
+    if same_title:
+        index['titles'][title] = min(same_title)
+
+def find_post_by_title(index, title):
+    """按标题查找文章编号"""
+    return index['titles'].get(title)
+
+def get_indexed_post(index, post_number):
+    """读取索引中的文章元数据，返回带编号的 post_data"""
+    entry = index['posts'].get(str(post_number))
+    if entry is None:
+        return None
+    post_data = get_post_metadata(entry)
+    post_data['mode'] = 'dynamic'
+    post_data['post_number'] = post_number
+    return post_data
+
+def refresh_post_index(index, jobs=None, posts=None):
+    """按文件签名检查索引，只重新解析新增或被改动的文章页面，返回索引是否有变化"""
+    post_files = get_all_post_files()
+    stale_files = []
+    for post_file in post_files:
+        entry = index['posts'].get(str(extract_post_number(post_file)))
+        if entry is None or entry.get('html_signature') != get_file_signature(post_file):
+            stale_files.append(post_file)
+
+    existing_numbers = {str(extract_post_number(post_file)) for post_file in post_files}
+    removed_numbers = [number for number in index['posts'] if number not in existing_numbers]
+    for number in removed_numbers:
+        unindex_post(index, int(number))
+
+    if stale_files and posts is None:
+        posts = PostsRepository(warn=False)
+    for post_file, post_data in zip(stale_files, map_posts(parse_post_page, stale_files, jobs)):
+        if post_data:
+            post_data['excerpt'] = posts.get_excerpt(post_file)
+            index_post(index, extract_post_number(post_file), post_data)
+
+    return bool(stale_files or removed_numbers)
+
+def load_fresh_post_index(jobs=None, posts=None):
+    """读取索引并与磁盘上的文章页面同步，有变化时写回"""
+    index = load_post_index()
+    if refresh_post_index(index, jobs, posts):
+        save_post_index(index)
+    return index
+
+def apply_post_config(posts, post_data, post_filename, is_new_post=True):
+    """在事务中添加新文章或更新现有文章的配置条目"""
     post_config = build_post_config(post_data, post_filename)
 
-    if is_new_post:
-        # 新文章：添加到列表开头（最新的文章在最前面）
-        config['posts'].insert(0, post_config)
-        print(f"✓ 新文章已添加到配置文件顶部")
-    else:
-        # 更新现有文章
-        updated = False
-        for i, post in enumerate(config['posts']):
-            if post.get('id') == post_data['post_number'] or post.get('link') == post_filename:
-                config['posts'][i] = post_config
-                updated = True
-                print(f"✓ 已更新配置中的文章信息")
-                break
-        
-        if not updated:
-            # 如果没找到，作为新文章添加
-            config['posts'].insert(0, post_config)
-            print(f"✓ 配置中未找到该文章，已作为新文章添加")
-    
-    # 保存配置文件（带缩进，便于阅读）
-    try:
-        save_posts_config(config)
-        print(f"✓ 配置文件已保存: {CONFIG_PATH}")
-        print(f"  当前共有 {len(config['posts'])} 篇文章")
+    if is_new_post:
+        # 新文章：添加到列表开头（最新的文章在最前面）
+        posts.add(post_config)
+        print(f"✓ 新文章已添加到配置文件顶部")
+    else:
+        # 更新现有文章
+        existing = posts.find(post_data['post_number'], post_filename)
+        if existing is not None:
+            posts.replace(existing, post_config)
+            print(f"✓ 已更新配置中的文章信息")
+        else:
+            # 如果没找到，作为新文章添加
+            posts.add(post_config)
+            print(f"✓ 配置中未找到该文章，已作为新文章添加")
+
+def update_posts_config(post_data, post_filename, is_new_post=True):
+    """更新 posts-config.json，添加新文章或更新现有文章"""
+    # 持锁读取最新配置后再修改，避免覆盖其他进程同时写入的内容
+    try:
+        with posts_transaction() as posts:
+            apply_post_config(posts, post_data, post_filename, is_new_post)
+        print(f"✓ 配置文件已保存: {posts.config_path}")
+        print(f"  当前共有 {len(posts.posts)} 篇文章")
         return True
-    except Exception as e:
-        print(f"✗ 错误: 保存配置文件失败 - {e}")
-        return False
-
+    except (OSError, PostsConfigError) as e:
+        print(f"✗ 错误: 保存配置文件失败 - {e}")
+        return False
+
 def delete_post_from_config(post_filename):
     """从 posts-config.json 中删除文章"""
     if not os.path.exists(CONFIG_PATH):
         print(f"警告: 找不到 {CONFIG_PATH}")
         return False
 
-    config = load_posts_config()
+    # 查找并删除文章，事务结束时保存更新后的配置
+    try:
+        with posts_transaction() as posts:
+            removed = posts.remove(post_filename)
+    except (OSError, PostsConfigError) as e:
+        print(f"错误: 保存配置文件失败 - {e}")
+        return False
 
-    # 查找并删除文章
-    original_length = len(config['posts'])
-    config['posts'] = [post for post in config['posts'] if post.get('link') != post_filename]
-    
-    if len(config['posts']) < original_length:
-        # 保存更新后的配置
-        try:
-            save_posts_config(config)
-            return True
-        except Exception as e:
-            print(f"错误: 保存配置文件失败 - {e}")
-            return False
-    else:
+    if not removed:
         print(f"警告: 无法在 {CONFIG_PATH} 中找到文章 {post_filename}")
-        return False
+    return removed
 
 def delete_post(post_filename):
     """删除文章页面"""
@@ -1937,10 +4227,11 @@ def delete_post(post_filename):
         print(f"错误: 找不到文件 {post_filename}")
         return False
     
-    try:
-        existing_data = parse_existing_post(post_filename)
-        title = existing_data.get('title', '未知标题') if existing_data else '未知标题'
-        print(f"\n将要删除文章: {post_filename}")
+    try:
+        index = load_fresh_post_index()
+        existing_data = get_indexed_post(index, extract_post_number(post_filename))
+        title = existing_data.get('title', '未知标题') if existing_data else '未知标题'
+        print(f"\n将要删除文章: {post_filename}")
         print(f"标题: {title}")
         confirm = input("确认删除? (y/n，默认: n): ").strip().lower()
         if confirm != 'y':
@@ -1954,27 +4245,36 @@ def delete_post(post_filename):
     
     # 从 posts-config.json 中删除
     print("正在从 posts-config.json 中删除...")
-    delete_post_from_config(post_filename)
+    delete_post_from_config(post_filename)
     
     # 删除HTML文件
     try:
-        os.remove(post_filename)
-        print(f"✓ 已删除文件: {post_filename}")
-        
+        os.remove(post_filename)
+        print(f"✓ 已删除文件: {post_filename}")
+
+        index = load_post_index()
+        unindex_post(index, extract_post_number(post_filename))
+        save_post_index(index)
+        
         # 删除对应的Markdown文件
         md_file = post_filename.replace('.html', '.md')
         if os.path.exists(md_file):
             os.remove(md_file)
             print(f"✓ 已删除Markdown文件: {md_file}")
+
+        with file_lock(CONFIG_PATH):
+            update_post_indexes()
         
         return True
     except Exception as e:
         print(f"✗ 删除文件失败: {e}")
         return False
 
-def list_all_posts():
+def list_all_posts(posts=None):
     """列出所有文章及其在配置中的状态"""
-    config_posts = load_posts_config(warn=False).get('posts', [])
+    if posts is None:
+        posts = PostsRepository(warn=False)
+    config_posts = posts.posts
     
     print("\n" + "=" * 80)
     print("当前博客文章列表")
@@ -2015,8 +4315,29 @@ def list_all_posts():
     
     print("=" * 80)
 
-def sync_all_posts():
-    """扫描所有文章文件并同步到配置文件"""
+def sync_post_worker(task):
+    """进程池任务：合并索引中的页面元数据和 Markdown 源文件信息，返回 (文件名, 文章数据, 错误信息)"""
+    post_file, post_data, blog_config = task
+    try:
+        if not post_data:
+            return post_file, None, "无法解析文章信息"
+
+        # 摘要只需读取 Markdown 头部；阅读时间和正文统计取自索引，索引中没有时才读取全文计算
+        md_file = post_file.replace('.html', '.md')
+        if os.path.exists(md_file):
+            with profile_stage('front_matter', md_file):
+                post_data['excerpt'] = read_post_metadata(md_file)['excerpt']
+            if any(field not in post_data for field, _ in POST_STATS_FIELDS):
+                md_data = parse_markdown_file(md_file, blog_config)
+                post_data['reading_time'] = md_data['reading_time']
+                post_data.update({field: md_data[field] for field, _ in POST_STATS_FIELDS})
+        post_data.setdefault('reading_time', 5)
+        return post_file, post_data, None
+    except Exception as e:
+        return post_file, None, str(e)
+
+def sync_all_posts(jobs=None):
+    """扫描所有文章文件并同步到配置文件，文章较多时并行解析"""
     print("\n" + "=" * 80)
     print("扫描并同步所有文章到 posts-config.json")
     print("=" * 80)
@@ -2038,63 +4359,1085 @@ def sync_all_posts():
         print("操作已取消")
         return
     
-    config = {"posts": []}
-    
-    print("\n开始同步...")
-    synced_count = 0
-    error_count = 0
-    
-    for post_file in post_files:
-        try:
-            print(f"\n处理: {post_file}")
-            post_data = parse_existing_post(post_file)
-            
-            if not post_data:
-                print(f"  ✗ 无法解析文章信息")
-                error_count += 1
-                continue
-            
-            md_file = post_file.replace('.html', '.md')
-            if os.path.exists(md_file):
-                md_data = parse_markdown_file(md_file)
-                if md_data:
-                    post_data.update({
-                        'excerpt': md_data.get('excerpt', post_data.get('excerpt')),
-                        'reading_time': md_data.get('reading_time', 5),
+    synced_posts = []
+    
+    print("\n开始同步...")
+    synced_count = 0
+    error_count = 0
+
+    # 整个同步过程在一个事务中完成：持锁读取一次 posts-config.json，最后原子写回一次
+    try:
+        with posts_transaction(warn=False) as posts:
+            # 页面元数据来自索引，只有新增或改动过的页面才会重新解析
+            index = load_post_index()
+            refresh_post_index(index, jobs, posts)
+            blog_config = load_blog_config()
+            tasks = [
+                (post_file, get_indexed_post(index, extract_post_number(post_file)), blog_config)
+                for post_file in post_files
+            ]
+
+            for post_file, post_data, error in map_posts(sync_post_worker, tasks, jobs):
+                print(f"\n处理: {post_file}")
+                if error:
+                    print(f"  ✗ 错误: {error}")
+                    error_count += 1
+                    continue
+
+                post_config = build_post_config(post_data, post_file)
+                synced_posts.append(post_config)
+                index_post(index, post_data['post_number'], post_data)
+                print(f"  ✓ 已添加: {post_config.get('title', '无标题')}")
+                synced_count += 1
+
+            save_post_index(index)
+
+            # 按ID倒序排序（最新的在前）
+            synced_posts.sort(key=lambda x: x.get('id', 0), reverse=True)
+            posts.replace_all(synced_posts)
+
+        with file_lock(CONFIG_PATH):
+            update_post_indexes(jobs)
+    except (OSError, PostsConfigError) as e:
+        print(f"\n✗ 保存配置文件失败: {e}")
+        return
+    
+    print("\n" + "=" * 80)
+    print("✓ 同步完成！")
+    print("=" * 80)
+    print(f"成功同步: {synced_count} 篇文章")
+    if error_count > 0:
+        print(f"失败: {error_count} 篇文章")
+    print(f"配置文件: {CONFIG_PATH}")
+    print("\n提示: 刷新 index.html 即可看到所有文章")
+    print("=" * 80)
+
+def get_template_version(blog_config=None):
+    """模板版本号：模板、渲染模式或高亮语言变化后所有文章都需要重新生成"""
+    if blog_config is None:
+        blog_config = load_blog_config()
+    render_mode = get_render_mode(blog_config)
+    if render_mode == 'static':
+        mode_parts = (
+            STATIC_ARTICLE_BODY,
+            STATIC_POST_SCRIPT,
+            str(MARKDOWN_RENDERER_VERSION),
+            ','.join(sorted(blog_config.get('supported_languages', []))),
+            json.dumps(HIGHLIGHT_GRAMMARS, sort_keys=True),
+        )
+    else:
+        mode_parts = (DYNAMIC_HEAD_SCRIPTS, DYNAMIC_ARTICLE_BODY, DYNAMIC_POST_SCRIPT)
+    # 阅读时间显示在页面中，统计规则或阅读速度变化后也需要重新生成
+    text_stats = f"{TEXT_STATS_VERSION}:{blog_config['reading_speed_chinese']}:{blog_config['reading_speed_english']}"
+    # 安装 Pillow 后需要重新生成页面以引用图片变体
+    images = f"{IMAGE_VARIANTS_VERSION}:{IMAGE_WEBP_QUALITY}:{','.join(map(str, IMAGE_VARIANT_WIDTHS))}:{Image is not None}"
+    parts = (
+        str(BUILD_MANIFEST_VERSION), str(FRONT_MATTER_VERSION), text_stats, images,
+        render_mode, POST_TEMPLATE, POST_CSS, POST_COPY_SCRIPT, RELATED_POST_SCRIPT,
+    ) + mode_parts
+    return hash_bytes('\0'.join(parts).encode('utf-8'))[:16]
+
+def get_all_source_files():
+    """获取所有 postN.md 源文件列表"""
+    md_files = [f for f in os.listdir('.') if POST_SOURCE_PATTERN.match(f)]
+    md_files.sort(key=lambda f: int(POST_SOURCE_PATTERN.match(f).group(1)))
+    return md_files
+
+def new_build_manifest():
+    """创建空的构建清单"""
+    return {"version": BUILD_MANIFEST_VERSION, "posts": {}}
+
+@profiled('build_manifest')
+def load_build_manifest(manifest_path=BUILD_MANIFEST_PATH):
+    """读取构建清单，缺失、损坏或版本不符时返回空清单（即全量构建）"""
+    if not os.path.exists(manifest_path):
+        return new_build_manifest()
+
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return new_build_manifest()
+
+    if (not isinstance(manifest, dict)
+            or manifest.get('version') != BUILD_MANIFEST_VERSION
+            or not isinstance(manifest.get('posts'), dict)):
+        return new_build_manifest()
+    return manifest
+
+@profiled('build_manifest')
+def save_build_manifest(manifest, manifest_path=BUILD_MANIFEST_PATH):
+    """保存构建清单"""
+    write_json_atomic(manifest_path, manifest, **CACHE_JSON_OPTIONS)
+
+def get_file_signature(path):
+    """用文件大小和修改时间做快速比对，避免每次都计算哈希"""
+    stat = os.stat(path)
+    return [stat.st_size, stat.st_mtime_ns]
+
+def without_derived_fields(post_config):
+    """去掉构建后补充的派生字段，剩下的部分由源文件决定"""
+    return {key: value for key, value in post_config.items() if key not in DERIVED_CONFIG_FIELDS}
+
+def hash_config_entry(post_config):
+    """计算单条文章配置的哈希（不含派生字段）"""
+    return hash_bytes(json.dumps(without_derived_fields(post_config), ensure_ascii=False, sort_keys=True).encode('utf-8'))
+
+def make_build_record(post_number, post_config, template_version=None):
+    """生成文章的构建记录：源文件哈希、模板版本和输出哈希"""
+    md_filename = f"post{post_number}.md"
+    post_filename = f"post{post_number}.html"
+    return {
+        "source": md_filename,
+        "source_hash": hash_file(md_filename),
+        "source_signature": get_file_signature(md_filename),
+        "template_version": template_version or get_template_version(),
+        "output": post_filename,
+        "output_hash": hash_file(post_filename),
+        "output_signature": get_file_signature(post_filename),
+        "images": get_post_image_signatures(md_filename),
+        "config_hash": hash_config_entry(post_config),
+    }
+
+def record_post_build(manifest, post_number, post_config, template_version=None):
+    """把文章的构建记录写入构建清单"""
+    manifest['posts'][str(post_number)] = make_build_record(post_number, post_config, template_version)
+
+def get_worker_count(jobs=None):
+    """并行任务数，默认使用全部 CPU 核心"""
+    return max(1, jobs or os.cpu_count() or 1)
+
+def map_posts(func, items, jobs=None):
+    """把逐篇文章的处理分发到进程池，结果顺序与输入一致；文章较少或开启性能分析时直接在当前进程处理"""
+    items = list(items)
+    workers = min(get_worker_count(jobs), len(items))
+    if workers <= 1 or len(items) < PARALLEL_MIN_POSTS or PROFILER is not None:
+        return [func(item) for item in items]
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(func, items, chunksize=max(1, len(items) // (workers * 4))))
+
+def build_post_worker(task):
+    """进程池任务：解析 Markdown、按需写出页面，返回 (编号, 配置项, 构建记录, 元数据)"""
+    post_number, write_html, blog_config, assets, template_version = task
+    md_filename = f"post{post_number}.md"
+    post_filename = f"post{post_number}.html"
+
+    post_data = parse_markdown_file(md_filename, blog_config)
+    if not post_data:
+        return post_number, None, None, None
+    post_data['post_number'] = post_number
+    return render_post_worker((post_data, write_html, blog_config, assets, template_version))
+
+def render_post_worker(task):
+    """进程池任务：按已解析的文章数据写出页面，返回 (编号, 配置项, 构建记录, 元数据)"""
+    post_data, write_html, blog_config, assets, template_version = task
+    post_number = post_data['post_number']
+    post_filename = f"post{post_number}.html"
+
+    if write_html:
+        write_post_html(post_data, post_filename, blog_config, assets)
+
+    with profile_stage('build_record', post_filename):
+        post_config = build_post_config(post_data, post_filename)
+        build_record = make_build_record(post_number, post_config, template_version)
+    return post_number, post_config, build_record, get_post_metadata(post_data)
+
+def get_post_build_status(entry, md_filename, post_filename, config_entry, template_version):
+    """判断文章是否过期，返回 (HTML 需重建, 配置需更新, 清单需刷新)"""
+    if not entry or entry.get('template_version') != template_version:
+        return True, True, True
+    if not os.path.exists(post_filename):
+        return True, True, True
+    for path, signature in entry.get('images', {}).items():
+        if not os.path.exists(path) or get_file_signature(path) != signature:
+            return True, True, True
+
+    signature_changed = False
+    if get_file_signature(md_filename) != entry.get('source_signature'):
+        # 只有大小或时间变化时才计算哈希，touch 过的文件不会触发重建
+        if hash_file(md_filename) != entry.get('source_hash'):
+            return True, True, True
+        signature_changed = True
+
+    html_stale = False
+    if get_file_signature(post_filename) != entry.get('output_signature'):
+        html_stale = hash_file(post_filename) != entry.get('output_hash')
+        signature_changed = True
+
+    config_stale = config_entry is None or hash_config_entry(config_entry) != entry.get('config_hash')
+    return html_stale, config_stale, signature_changed
+
+def iter_search_terms(text, trailing_unigrams=False):
+    """逐个产生检索词（含重复）：连续汉字取相邻两字（只有一个字时取单字），英文和数字取整个单词
+
+    trailing_unigrams 为真时连续汉字的最后一个字另作单字词：单字查询按前缀比对双字词，
+    只有这样才能找到位于末尾的字（如“国中”里的“中”）。
+    """
+    for match in SEARCH_TOKEN_PATTERN.finditer(text.lower()):
+        run = match.group()
+        if run.isascii() or len(run) == 1:
+            yield run
+        else:
+            for i in range(len(run) - 1):
+                yield run[i:i + 2]
+            if trailing_unigrams:
+                yield run[-1]
+
+def tokenize_search_text(text):
+    """把文本切成检索索引使用的检索词集合"""
+    return set(iter_search_terms(text, trailing_unigrams=True))
+
+def search_terms_worker(md_filename):
+    """进程池任务：读取一篇 Markdown 的标题、标签和正文，返回 (编号, 检索词集合)"""
+    post_number = int(POST_SOURCE_PATTERN.match(md_filename).group(1))
+    try:
+        with open(md_filename, 'r', encoding='utf-8') as f:
+            front_matter, head = read_front_matter_lines(f)
+            content = head + f.read()
+    except (OSError, UnicodeDecodeError):
+        return post_number, set()
+
+    metadata = get_front_matter_metadata(parse_front_matter(front_matter or []), md_filename)
+    text = '\n'.join([metadata['title'], ' '.join(metadata.get('tags', [])), SEARCH_SKIP_PATTERN.sub(' ', content)])
+    return post_number, tokenize_search_text(text)
+
+def get_search_source_signature(md_files, config_path=CONFIG_PATH):
+    """汇总源文件和 posts-config.json 的签名（大小、修改时间），都没变时不必重建检索索引"""
+    signatures = [[path] + get_file_signature(path) for path in md_files + [config_path] if os.path.exists(path)]
+    return hash_bytes(json.dumps([SEARCH_INDEX_VERSION, signatures]).encode('utf-8'))[:16]
+
+def get_search_shard_number(term, shard_count):
+    """检索词所在的分片：汉字按首字，英文和数字按前两个字符（按首字母分片时大小悬殊）
+
+    index.html 的 getShardNumber 使用相同的算法。
+    """
+    key = term[:2] if term.isascii() else term[0]
+    shard_number = 0
+    for char in key:
+        shard_number = (shard_number * 31 + ord(char)) % shard_count
+    return shard_number
+
+def get_id_ranges(post_ids):
+    """把递增的文章编号压缩成 [起始, 结束] 区间列表"""
+    ranges = []
+    for post_id in post_ids:
+        if ranges and ranges[-1][1] == post_id - 1:
+            ranges[-1][1] = post_id
+        else:
+            ranges.append([post_id, post_id])
+    return ranges
+
+def encode_postings(postings):
+    """递增的文章编号改存与前一个编号的差值以缩小分片体积，负数表示该词出现在配置的元数据中"""
+    encoded = []
+    previous = 0
+    for posting in postings:
+        number = abs(posting)
+        encoded.append(number - previous if posting > 0 else previous - number)
+        previous = number
+    return encoded
+
+@profiled('search_index')
+def build_search_index(jobs=None, force=False, config_path=CONFIG_PATH, index_path=SEARCH_INDEX_PATH):
+    """为全部文章建立倒排索引：检索词 → 文章编号列表，按检索词开头的字分片写入 assets/
+
+    索引覆盖 Markdown 的标题、标签和正文，以及 posts-config.json 中首页搜索框比对的
+    标题、摘要、分类和日期，浏览器可以先用索引缩小范围再做子串比对。
+    分片按内容哈希命名，index_path 只记录分片列表；源文件和配置都没有变化时直接跳过。
+    调用方需持有 posts-config.json 的锁。返回是否重新生成了索引。
+    """
+    md_files = get_all_source_files()
+    source_signature = get_search_source_signature(md_files, config_path)
+    if not force:
+        try:
+            with open(index_path, 'r', encoding='utf-8') as f:
+                if json.load(f).get('source') == source_signature:
+                    return False
+        except (OSError, ValueError, AttributeError):
+            pass
+
+    terms_by_post = dict(map_posts(search_terms_worker, md_files, jobs))
+    metadata_terms = {}
+    for post in load_posts_config(config_path, warn=False)['posts']:
+        post_id = post.get('id')
+        if isinstance(post_id, int) and post_id > 0:
+            metadata = ' '.join(str(post.get(key, '')) for key in ('title', 'excerpt', 'category', 'date'))
+            metadata_terms[post_id] = tokenize_search_text(metadata)
+            terms_by_post[post_id] = metadata_terms[post_id].union(terms_by_post.get(post_id, ()))
+
+    # 按编号顺序合并，每个检索词的编号列表天然递增；出现在元数据中的记为负数
+    postings = {}
+    for post_id in sorted(terms_by_post):
+        in_metadata = metadata_terms.get(post_id, ())
+        for term in terms_by_post[post_id]:
+            postings.setdefault(term, []).append(-post_id if term in in_metadata else post_id)
+
+    estimated_bytes = sum(len(term) * 3 + 4 + len(post_ids) * 3 for term, post_ids in postings.items())
+    shard_count = min(SEARCH_MAX_SHARDS, max(1, -(-estimated_bytes // SEARCH_SHARD_BYTES)))
+    shard_terms = [[] for _ in range(shard_count)]
+    for term in sorted(postings):
+        shard_terms[get_search_shard_number(term, shard_count)].append(term)
+
+    shard_paths = []
+    for shard_number, terms in enumerate(shard_terms):
+        shard = {"terms": terms, "postings": [encode_postings(postings[term]) for term in terms]}
+        shard_paths.append(write_fingerprinted_asset(f'search-{shard_number}', 'json', json.dumps(shard, **CACHE_JSON_OPTIONS)))
+
+    write_json_atomic(index_path, {
+        "version": SEARCH_INDEX_VERSION,
+        "source": source_signature,
+        "posts": len(terms_by_post),
+        "maxId": max(terms_by_post, default=0),
+        # 索引覆盖的文章编号；不在其中的文章（索引生成后才新增）浏览器不做排除
+        "ids": get_id_ranges(sorted(terms_by_post)),
+        "shards": shard_paths,
+    }, **CACHE_JSON_OPTIONS)
+
+    # 新索引写好后再清理不再引用的旧分片
+    for path in glob.glob(os.path.join(ASSETS_DIR, 'search-*.json')):
+        if path.replace(os.sep, '/') not in shard_paths:
+            os.remove(path)
+    return True
+
+def related_terms_worker(md_filename):
+    """进程池任务：统计一篇 Markdown 的标题、标签、分类和正文词频，返回 (编号, 词频最高的检索词)"""
+    post_number = int(POST_SOURCE_PATTERN.match(md_filename).group(1))
+    try:
+        with open(md_filename, 'r', encoding='utf-8') as f:
+            front_matter, head = read_front_matter_lines(f)
+            content = head + f.read()
+    except (OSError, UnicodeDecodeError):
+        return post_number, {}
+
+    metadata = get_front_matter_metadata(parse_front_matter(front_matter or []), md_filename)
+    counts = {}
+    for text, weight in ((metadata['title'], RELATED_TITLE_WEIGHT), (SEARCH_SKIP_PATTERN.sub(' ', content), 1)):
+        for term in iter_search_terms(text):
+            counts[term] = counts.get(term, 0) + weight
+    # 标签和分类整体作为一个词，加前缀以免与正文中的同名词混在一起
+    labels = [f'#{tag.lower()}' for tag in metadata.get('tags', [])]
+    if metadata.get('category'):
+        labels.append(f'@{normalize_category(metadata["category"])}')
+    for label in labels:
+        counts[label] = counts.get(label, 0) + RELATED_TAG_WEIGHT
+
+    top_terms = sorted(counts.items(), key=lambda item: (-item[1], item[0]))[:RELATED_TERMS_PER_POST]
+    return post_number, dict(top_terms)
+
+def get_related_keywords(terms, document_frequency, post_count):
+    """按 TF-IDF 权重取关键词并归一化，返回 {检索词: 权重}；超过半数文章都有的词不参与比较"""
+    weights = {}
+    max_frequency = RELATED_MAX_DOCUMENT_RATIO * post_count
+    for term, count in terms.items():
+        frequency = document_frequency.get(term, 1)
+        if frequency <= max_frequency:
+            weights[term] = (1 + math.log(count)) * math.log(post_count / frequency)
+    top_weights = sorted(weights.items(), key=lambda item: (-item[1], item[0]))[:RELATED_KEYWORDS_PER_POST]
+    norm = math.sqrt(sum(weight * weight for _, weight in top_weights)) or 1.0
+    return {term: round(weight / norm, 6) for term, weight in top_weights}
+
+def score_related_posts(post_number, keywords, postings):
+    """与其他文章的余弦相似度 {编号: 分数}，只沿共享关键词的倒排列表累加"""
+    scores = {}
+    for term, weight in keywords.items():
+        for other_number, other_weight in postings.get(term, ()):
+            if other_number != post_number:
+                scores[other_number] = scores.get(other_number, 0.0) + weight * other_weight
+    return scores
+
+def rank_related_posts(scores):
+    """分数最高的 RELATED_POSTS_COUNT 篇，返回 [[编号, 分数], ...]；分数相同时编号大（较新）的在前"""
+    ranked = heapq.nsmallest(RELATED_POSTS_COUNT, scores.items(), key=lambda item: (-item[1], -item[0]))
+    return [[number, round(score, 6)] for number, score in ranked]
+
+def new_related_index():
+    """创建空的相关文章缓存"""
+    return {"posts": {}, "related": {}, "documentFrequency": {}, "postCount": 0}
+
+def load_related_index(index_path=RELATED_INDEX_PATH):
+    """读取相关文章缓存，缺失、损坏或版本不符时返回空缓存（即全量计算）"""
+    try:
+        with open(index_path, 'r', encoding='utf-8') as f:
+            index = json.load(f)
+        if index.get('version') != RELATED_INDEX_VERSION:
+            return new_related_index()
+        return {
+            "posts": {int(number): entry for number, entry in index['posts'].items()},
+            "related": {int(number): items for number, items in index['related'].items()},
+            "documentFrequency": index['documentFrequency'],
+            "postCount": index['postCount'],
+        }
+    except (OSError, ValueError, KeyError, AttributeError, TypeError):
+        return new_related_index()
+
+@profiled('related')
+def update_related_posts(posts, jobs=None, force=False, index_path=RELATED_INDEX_PATH):
+    """计算每篇文章的相关文章，把编号列表写入配置条目的 related 字段，返回配置是否有改动
+
+    每篇文章的词频和关键词按源文件签名缓存在 index_path 中。只有少量文章变化时沿用上次的文档频率，
+    只把变化的文章与其他文章比较，再修补受影响文章的列表，不重新计算全部文章对。
+    调用方需持有 posts-config.json 的锁。
+    """
+    index = new_related_index() if force else load_related_index(index_path)
+    cached_posts = index['posts']
+    signatures = {
+        int(POST_SOURCE_PATTERN.match(md_filename).group(1)): get_file_signature(md_filename)
+        for md_filename in get_all_source_files()
+    }
+    stale_files = [
+        f"post{number}.md" for number, signature in signatures.items()
+        if number not in cached_posts or cached_posts[number]['signature'] != signature
+    ]
+    removed = set(cached_posts) - set(signatures)
+
+    changed = set()
+    for number, terms in map_posts(related_terms_worker, stale_files, jobs):
+        entry = cached_posts.get(number)
+        if entry is None or entry['terms'] != terms:
+            changed.add(number)
+            cached_posts[number] = {"signature": signatures[number], "terms": terms}
+        else:
+            entry['signature'] = signatures[number]
+    for number in removed:
+        del cached_posts[number]
+
+    related = index['related']
+    post_count = len(cached_posts)
+    full = (
+        index['postCount'] == 0
+        or abs(post_count - index['postCount']) > RELATED_REFRESH_RATIO * index['postCount']
+        or len(changed) + len(removed) > RELATED_REFRESH_RATIO * post_count
+    )
+    if full:
+        document_frequency = {}
+        for entry in cached_posts.values():
+            for term in entry['terms']:
+                document_frequency[term] = document_frequency.get(term, 0) + 1
+        index['documentFrequency'] = document_frequency
+        index['postCount'] = post_count
+        changed = set(cached_posts)
+    for number in changed:
+        cached_posts[number]['keywords'] = get_related_keywords(
+            cached_posts[number]['terms'], index['documentFrequency'], index['postCount']
+        )
+
+    postings = {}
+    for number, entry in cached_posts.items():
+        for term, weight in entry['keywords'].items():
+            postings.setdefault(term, []).append((number, weight))
+
+    if changed or removed:
+        gone = changed | removed
+        affected = changed | {number for number, items in related.items() if any(other in gone for other, _ in items)}
+        related = {number: items for number, items in related.items() if number in cached_posts}
+        changed_scores = {}
+        for number in affected & set(cached_posts):
+            scores = score_related_posts(number, cached_posts[number]['keywords'], postings)
+            related[number] = rank_related_posts(scores)
+            # 全量计算时每篇都已重新排名，不必保留分数（全部保留会占用与文章数平方成正比的内存）
+            if number in changed and not full:
+                changed_scores[number] = scores
+        # 相似度是对称的：变化的文章能否进入其他文章的列表，直接用变化文章一侧算出的分数判断
+        if not full:
+            for number in cached_posts.keys() - affected:
+                candidates = dict(related.get(number, []))
+                for changed_number, scores in changed_scores.items():
+                    if number in scores:
+                        candidates[changed_number] = scores[number]
+                related[number] = rank_related_posts(candidates)
+
+    if stale_files or removed or force:
+        write_json_atomic(index_path, {
+            "version": RELATED_INDEX_VERSION,
+            "postCount": index['postCount'],
+            "documentFrequency": index['documentFrequency'],
+            "posts": cached_posts,
+            "related": related,
+        }, **CACHE_JSON_OPTIONS)
+
+    config_changed = False
+    for post in posts.posts:
+        if not isinstance(post, dict):
+            continue
+        items = related.get(post.get('id')) if post.get('id') in cached_posts else None
+        related_ids = None if items is None else [number for number, _ in items if number in posts.by_id]
+        config_changed = posts.set_related(post, related_ids) or config_changed
+    write_related_files(posts)
+    return config_changed
+
+def get_related_file_path(post_number):
+    """文章页面读取的相关文章列表文件"""
+    return f'{ASSETS_DIR}/related-{post_number}.json'
+
+def write_related_files(posts):
+    """为配置中的每篇文章写出 assets/related-N.json，列出相关文章的标题、链接、分类和日期
+
+    相关文章的编号或标题变化时文件内容随之变化；内容相同的文件不重写，删除已不存在的文章的文件。
+    """
+    os.makedirs(ASSETS_DIR, exist_ok=True)
+    current = set()
+    for post in posts.posts:
+        post_id = post.get('id') if isinstance(post, dict) else None
+        if not isinstance(post_id, int) or post_id <= 0:
+            continue
+        items = []
+        for number in post.get('related') or []:
+            other = posts.by_id.get(number)
+            if other is not None:
+                items.append({
+                    "link": other.get('link'),
+                    "title": other.get('title') or '无标题',
+                    "category": re.sub(r'^\[|\]$', '', str(other.get('category') or '')),
+                    "date": other.get('date', ''),
+                })
+        path = get_related_file_path(post_id)
+        current.add(os.path.basename(path))
+        text = json.dumps({"posts": items}, **CACHE_JSON_OPTIONS)
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                if f.read() == text:
+                    continue
+        except (OSError, UnicodeDecodeError):
+            pass
+        write_text_atomic(path, text)
+
+    for name in os.listdir(ASSETS_DIR):
+        if RELATED_FILE_PATTERN.match(name) and name not in current:
+            os.remove(os.path.join(ASSETS_DIR, name))
+
+def get_precompress_encodings():
+    """可以生成的预压缩格式 {后缀: 压缩函数}，都使用最高压缩级别；mtime=0 让相同内容得到相同的 .gz"""
+    encodings = {'.gz': lambda data: gzip.compress(data, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        encodings['.br'] = lambda data: brotli.compress(data, quality=11)
+    return encodings
+
+def is_precompress_source(path):
+    """是否为生成工具负责预压缩的站点文件：文章页面和 Markdown、生成的 JSON、assets/ 中的文件和 PRECOMPRESS_SITE_FILES"""
+    directory, name = os.path.split(os.path.normpath(path))
+    if name.startswith('.') or not name.lower().endswith(PRECOMPRESS_EXTENSIONS):
+        return False
+    if directory == ASSETS_DIR:
+        return True
+    return not directory and bool(
+        POST_FILE_PATTERN.match(name) or POST_SOURCE_PATTERN.match(name)
+        or name in (CONFIG_PATH, POSTS_MANIFEST_PATH, SEARCH_INDEX_PATH) + PRECOMPRESS_SITE_FILES
+    )
+
+def get_precompress_sources():
+    """需要预压缩的站点文件，不含以点开头的本地缓存和临时文件"""
+    for directory in PRECOMPRESS_DIRS:
+        if not os.path.isdir(directory):
+            continue
+        for name in sorted(os.listdir(directory)):
+            path = os.path.normpath(os.path.join(directory, name))
+            if is_precompress_source(path) and os.path.isfile(path):
+                yield path
+
+def is_precompressed_current(compressed_path, source_stat):
+    """压缩文件写出时把修改时间设为源文件的修改时间，两者一致说明源文件之后没有改动（run_server.py 用同样的规则）"""
+    try:
+        return os.stat(compressed_path).st_mtime_ns == source_stat.st_mtime_ns
+    except OSError:
+        return False
+
+def precompress_worker(task):
+    """进程池任务：为一个文本文件写出过期的压缩文件，返回写出的文件数；压缩后没有变小时不写出"""
+    path, suffixes = task
+    encodings = get_precompress_encodings()
+    with open(path, 'rb') as f:
+        source_stat = os.fstat(f.fileno())
+        data = f.read()
+
+    written = 0
+    for suffix in suffixes:
+        compressed = encodings[suffix](data)
+        compressed_path = path + suffix
+        if len(compressed) >= len(data):
+            if os.path.exists(compressed_path):
+                os.remove(compressed_path)
+            continue
+        # 先写临时文件再替换，服务器不会读到写了一半的压缩文件
+        fd, temp_path = tempfile.mkstemp(prefix=f".{os.path.basename(path)}.", suffix='.tmp', dir=os.path.dirname(path) or '.')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(compressed)
+            os.chmod(temp_path, 0o644)
+            os.utime(temp_path, ns=(source_stat.st_atime_ns, source_stat.st_mtime_ns))
+            os.replace(temp_path, compressed_path)
+        except BaseException:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            raise
+        written += 1
+    return written
+
+@profiled('precompress')
+def write_precompressed_files(jobs=None, force=False):
+    """为新增或改动过的站点文件写出 .gz 和 .br，删除源文件已不存在的压缩文件，返回写出的文件数
+
+    只删除 is_precompress_source 认可的文件旁的压缩文件，其他 .gz 和 .br 即使没有对应的源文件也保留。
+    """
+    suffixes = tuple(get_precompress_encodings())
+    sources = set()
+    tasks = []
+    for path in get_precompress_sources():
+        sources.add(path)
+        source_stat = os.stat(path)
+        if source_stat.st_size < PRECOMPRESS_MIN_BYTES:
+            continue
+        stale = [suffix for suffix in suffixes if force or not is_precompressed_current(path + suffix, source_stat)]
+        if stale:
+            tasks.append((path, stale))
+
+    for directory in PRECOMPRESS_DIRS:
+        if not os.path.isdir(directory):
+            continue
+        for name in os.listdir(directory):
+            source, suffix = os.path.splitext(os.path.normpath(os.path.join(directory, name)))
+            if suffix in ('.gz', '.br') and source not in sources and is_precompress_source(source):
+                os.remove(source + suffix)
+
+    return sum(map_posts(precompress_worker, tasks, jobs))
+
+def update_post_indexes(jobs=None, config_path=CONFIG_PATH):
+    """posts-config.json 写回后更新相关文章、全文检索索引和预压缩文件，返回检索索引是否重建；调用方需持有锁"""
+    posts = PostsRepository(config_path, warn=False)
+    if update_related_posts(posts, jobs):
+        posts.save()
+    search_rebuilt = build_search_index(jobs, config_path=config_path)
+    write_precompressed_files(jobs)
+    return search_rebuilt
+
+def build_posts(force=False, jobs=None, config_path=CONFIG_PATH, manifest_path=BUILD_MANIFEST_PATH):
+    """非交互增量构建：只重新生成源文件或模板有变化的文章，过期文章较多时并行处理"""
+    started = time.perf_counter()
+    blog_config = load_blog_config()
+    template_version = get_template_version(blog_config)
+
+    # 整个构建在一个事务中完成：持锁读取 posts-config.json，有变化时结束后原子写回一次
+    with posts_transaction(config_path, warn=False) as posts:
+        manifest = new_build_manifest() if force else load_build_manifest(manifest_path)
+        rebuilt = []
+        updated_configs = []
+        new_configs = []
+        unchanged_count = 0
+        manifest_changed = False
+        seen_numbers = set()
+        stale_posts = []
+
+        for md_filename in get_all_source_files():
+            post_number = int(POST_SOURCE_PATTERN.match(md_filename).group(1))
+            post_filename = f"post{post_number}.html"
+            seen_numbers.add(str(post_number))
+
+            config_entry = posts.get(post_filename)
+            html_stale, config_stale, signature_changed = get_post_build_status(
+                manifest['posts'].get(str(post_number)),
+                md_filename,
+                post_filename,
+                config_entry,
+                template_version,
+            )
+
+            if not html_stale and not config_stale:
+                if signature_changed:
+                    record_post_build(manifest, post_number, config_entry, template_version)
+                    manifest_changed = True
+                unchanged_count += 1
+                continue
+
+            stale_posts.append((post_number, html_stale))
+
+        assets = write_post_assets(blog_config) if any(html_stale for _, html_stale in stale_posts) else None
+        tasks = [
+            (post_number, html_stale, blog_config, assets, template_version)
+            for post_number, html_stale in stale_posts
+        ]
+        results = map_posts(build_post_worker, tasks, jobs)
+        index = load_post_index() if results else None
+
+        # 结果按编号顺序合并，与串行构建的输出完全一致
+        for (post_number, html_stale), (_, post_config, build_record, metadata) in zip(stale_posts, results):
+            if post_config is None:
+                continue
+            post_filename = post_config['link']
+            if html_stale:
+                rebuilt.append(post_filename)
+            index_post(index, post_number, metadata)
+
+            config_entry = posts.get(post_filename)
+            if config_entry is None:
+                new_configs.append(post_config)
+            elif without_derived_fields(config_entry) != post_config:
+                posts.replace(config_entry, post_config)
+                updated_configs.append(post_filename)
+
+            manifest['posts'][str(post_number)] = build_record
+            manifest_changed = True
+
+        for stale_number in set(manifest['posts']) - seen_numbers:
+            del manifest['posts'][stale_number]
+            manifest_changed = True
+
+        if new_configs:
+            # 新文章放在配置顶部，编号大的在前
+            new_configs.sort(key=lambda x: x.get('id', 0), reverse=True)
+            posts.replace_all(new_configs + posts.posts)
+
+        if manifest_changed:
+            save_build_manifest(manifest, manifest_path)
+        if index is not None:
+            save_post_index(index)
+
+    # 相关文章、分页文件和检索索引都取自写回后的配置；配置没有变化时也要补上缺失或 posts_per_page 已修改的分页
+    with file_lock(config_path):
+        if not posts.is_current():
+            posts = PostsRepository(config_path, warn=False)
+        related_changed = update_related_posts(posts, jobs, force=force)
+        if related_changed:
+            posts.save()
+        elif force or not is_post_pages_current(posts, blog_config):
+            write_post_pages(posts, blog_config)
+        search_rebuilt = build_search_index(jobs, force=force, config_path=config_path)
+        remove_stale_assets(write_post_assets(blog_config).values())
+        compressed_count = write_precompressed_files(jobs, force=force)
+
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    print(f"构建完成: 重新生成 {len(rebuilt)} 篇, 新增配置 {len(new_configs)} 条, "
+          f"更新配置 {len(updated_configs)} 条, 未变化 {unchanged_count} 篇 ({elapsed_ms:.1f} ms)")
+    for post_filename in rebuilt:
+        print(f"  ✓ {post_filename}")
+    if related_changed:
+        print("  ✓ 相关文章")
+    if search_rebuilt:
+        print(f"  ✓ {SEARCH_INDEX_PATH}")
+    if compressed_count:
+        print(f"  ✓ 预压缩 {compressed_count} 个文件")
+
+    return {
+        "rebuilt": rebuilt,
+        "added": [post['link'] for post in new_configs],
+        "updated": updated_configs,
+        "unchanged": unchanged_count,
+        "elapsed_ms": elapsed_ms,
+    }
+
+def rebuild_post(post_number, blog_config, assets, template_version, pending, posts=None):
+    """只重新生成一篇文章，并在事务中修补它在 posts-config.json 中的条目，返回 (配置项, 仓库)
+
+    构建清单和元数据索引只是本地缓存，更新先记入 pending，由 flush_watch_caches 在空闲时写回。
+    """
+    _, post_config, build_record, metadata = build_post_worker(
+        (post_number, True, blog_config, assets, template_version)
+    )
+    if post_config is None:
+        return None, posts
+
+    with posts_transaction(warn=False, posts=posts) as posts:
+        config_entry = posts.get(post_config['link'])
+        if config_entry is None:
+            posts.add(post_config)
+        elif without_derived_fields(config_entry) != post_config:
+            posts.replace(config_entry, post_config)
+
+    pending[post_number] = (build_record, metadata)
+    return post_config, posts
+
+def flush_watch_caches(pending):
+    """把 watch 期间积累的构建记录和文章元数据写回构建清单和索引"""
+    if not pending:
+        return
+
+    with file_lock(CONFIG_PATH):
+        manifest = load_build_manifest()
+        index = load_post_index()
+        for post_number, (build_record, metadata) in pending.items():
+            manifest['posts'][str(post_number)] = build_record
+            index_post(index, post_number, metadata)
+        save_build_manifest(manifest)
+        save_post_index(index)
+        update_post_indexes()
+    pending.clear()
+
+def is_watched_file(name):
+    """watch 关心的文件：Markdown 源文件和 blog_config.json"""
+    return name == BLOG_CONFIG_PATH or (name.endswith('.md') and POST_SOURCE_PATTERN.match(name) is not None)
+
+def get_watch_signatures(names=None, signatures=None):
+    """读取被监视文件的签名（大小、修改时间），只做 stat 不读内容
+
+    传入 names 时只更新这些文件，其余沿用 signatures 中的旧值；否则扫描整个目录。
+    """
+    if names is None:
+        current = {}
+        with os.scandir('.') as entries:
+            for entry in entries:
+                if is_watched_file(entry.name):
+                    stat = entry.stat()
+                    current[entry.name] = (stat.st_size, stat.st_mtime_ns)
+        return current
+
+    current = dict(signatures)
+    for name in names:
+        if not is_watched_file(name):
+            continue
+        try:
+            stat = os.stat(name)
+        except FileNotFoundError:
+            current.pop(name, None)
+        else:
+            current[name] = (stat.st_size, stat.st_mtime_ns)
+    return current
+
+def open_inotify(path='.'):
+    """Linux 下通过 inotify 接收目录变更通知，不可用时返回 None，由调用方改用轮询"""
+    if not sys.platform.startswith('linux'):
+        return None
+    try:
+        import ctypes
+        import ctypes.util
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+    except (OSError, AttributeError):
+        return None
+    if fd < 0:
+        return None
+    if libc.inotify_add_watch(fd, os.fsencode(path), INOTIFY_EVENTS) < 0:
+        os.close(fd)
+        return None
+    return fd
+
+def read_inotify_names(fd, timeout):
+    """等待 inotify 事件，返回发生变化的文件名集合；超时返回空集合"""
+    names = set()
+    ready, _, _ = select.select([fd], [], [], timeout)
+    while ready:
+        try:
+            data = os.read(fd, 65536)
+        except BlockingIOError:
+            break
+        offset = 0
+        while offset < len(data):
+            _, _, _, length = struct.unpack_from('iIII', data, offset)
+            offset += 16
+            name = data[offset:offset + length].rstrip(b'\0')
+            offset += length
+            if name:
+                names.add(os.fsdecode(name))
+        # 编辑器保存时常会连续产生多个事件，稍等片刻一并处理
+        ready, _, _ = select.select([fd], [], [], 0.005)
+    return names
+
+def watch_posts(interval=WATCH_INTERVAL, jobs=None):
+    """监视 Markdown 源文件和模板设置，保存后只重新生成改动的文章"""
+    build_posts(jobs=jobs)
+    blog_config = load_blog_config()
+    template_version = get_template_version(blog_config)
+    assets = write_post_assets(blog_config)
+    pending = {}
+
+    # 预先读取并编码配置，之后每次保存只需重新编码改动的条目
+    posts = PostsRepository(warn=False)
+    posts.encode()
+
+    # 模板写在本脚本中，脚本改动后需要重新启动才能生效
+    script_path = os.path.abspath(__file__)
+    script_signature = get_file_signature(script_path)
+    signatures = get_watch_signatures()
+
+    inotify_fd = open_inotify()
+    if inotify_fd is not None:
+        print(f"\n正在监视 post*.md 和 {BLOG_CONFIG_PATH}（inotify 通知，按 Ctrl+C 退出）")
+    else:
+        print(f"\n正在监视 post*.md 和 {BLOG_CONFIG_PATH}（每 {interval:g} 秒检查一次，按 Ctrl+C 退出）")
+    try:
+        while True:
+            if inotify_fd is not None:
+                names = read_inotify_names(inotify_fd, 1.0)
+                current = get_watch_signatures(names, signatures)
+            else:
+                time.sleep(interval)
+                current = get_watch_signatures()
+            changed = sorted(name for name, signature in current.items() if signatures.get(name) != signature)
+            removed = sorted(set(signatures) - set(current))
+            signatures = current
+            if not changed and not removed:
+                flush_watch_caches(pending)
+
+            if BLOG_CONFIG_PATH in changed:
+                print(f"\n{BLOG_CONFIG_PATH} 已修改，重新构建受影响的文章...")
+                flush_watch_caches(pending)
+                build_posts(jobs=jobs)
+                blog_config = load_blog_config()
+                template_version = get_template_version(blog_config)
+                assets = write_post_assets(blog_config)
+                continue
+
+            for md_filename in changed:
+                started = time.perf_counter()
+                post_number = int(POST_SOURCE_PATTERN.match(md_filename).group(1))
+                post_config, posts = rebuild_post(post_number, blog_config, assets, template_version, pending, posts)
+                elapsed_ms = (time.perf_counter() - started) * 1000
+                if post_config:
+                    print(f"  ✓ {md_filename} → {post_config['link']} ({elapsed_ms:.1f} ms)")
+
+            for md_filename in removed:
+                print(f"  • {md_filename} 已删除，已生成的页面保持不变（可通过菜单选项 2 删除文章）")
+
+            if get_file_signature(script_path) != script_signature:
+                script_signature = get_file_signature(script_path)
+                print(f"\n{os.path.basename(script_path)} 已修改，请重新运行 watch 以使用新模板")
+    except KeyboardInterrupt:
+        print("\n已停止监视")
+    finally:
+        flush_watch_caches(pending)
+        if inotify_fd is not None:
+            os.close(inotify_fd)
+
+def expand_import_sources(patterns):
+    """把目录或通配符展开为 Markdown 文件列表，目录会递归查找，结果去重并保持顺序"""
+    sources = []
+    seen = set()
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            matches = glob.glob(os.path.join(glob.escape(pattern), '**', '*.md'), recursive=True)
+        else:
+            matches = glob.glob(pattern, recursive=True)
+        for path in sorted(matches):
+            key = os.path.abspath(path)
+            if key not in seen and os.path.isfile(path):
+                seen.add(key)
+                sources.append(path)
+    return sources
+
+def parse_import_source(task):
+    """进程池任务：解析一个待导入的 Markdown 文件，返回 (路径, 文章数据, 错误信息)"""
+    source, blog_config = task
+    try:
+        return source, parse_markdown_file(source, blog_config), None
+    except (OSError, UnicodeDecodeError) as e:
+        return source, None, str(e)
+
+def get_next_free_post_number():
+    """下一个未被页面或 Markdown 源文件占用的文章编号"""
+    source_numbers = [int(POST_SOURCE_PATTERN.match(f).group(1)) for f in get_all_source_files()]
+    return max([get_next_post_number()] + [number + 1 for number in source_numbers])
+
+def revert_import_copies(copied):
+    """撤销导入写出的文件：新文章删除源文件和页面，已有文章恢复备份"""
+    for path, backup in reversed(copied):
+        if backup:
+            os.replace(backup, path)
+        elif os.path.exists(path):
+            os.remove(path)
+
+def import_posts(patterns, update_existing=True, jobs=None, as_json=False):
+    """非交互批量导入 Markdown：一次分配编号、并行渲染、只提交一次 posts-config.json，返回变更摘要"""
+    started = time.perf_counter()
+    sources = expand_import_sources(patterns)
+    summary = {"added": [], "updated": [], "skipped": [], "errors": []}
+    blog_config = load_blog_config()
+    template_version = get_template_version(blog_config)
+
+    parsed = map_posts(parse_import_source, [(source, blog_config) for source in sources], jobs)
+
+    copied = []
+    try:
+        with posts_transaction(warn=False) as posts:
+            # 同名文章按标题索引匹配；同一批中标题重复时以后出现的文件为准
+            index = load_fresh_post_index(jobs, posts)
+            next_number = get_next_free_post_number()
+            planned = {}
+            for source, post_data, error in parsed:
+                if error or not post_data:
+                    summary['errors'].append({"source": source, "error": error or "无法解析文件"})
+                    continue
+
+                post_number = find_post_by_title(index, post_data['title']) if update_existing else None
+                if post_number is not None and post_number in planned:
+                    summary['skipped'].append({
+                        "source": planned[post_number][0],
+                        "reason": f"同一批中的 {source} 标题相同，已以后者为准",
                     })
-            post_data.setdefault('reading_time', 5)
-            post_config = build_post_config(post_data, post_file)
-            
-            config['posts'].append(post_config)
-            print(f"  ✓ 已添加: {post_data.get('title', '无标题')}")
-            synced_count += 1
-            
-        except Exception as e:
-            print(f"  ✗ 错误: {e}")
-            error_count += 1
-    
-    # 按ID倒序排序（最新的在前）
-    config['posts'].sort(key=lambda x: x.get('id', 0), reverse=True)
-    
-    # 保存配置文件
-    try:
-        save_posts_config(config)
-        
-        print("\n" + "=" * 80)
-        print("✓ 同步完成！")
-        print("=" * 80)
-        print(f"成功同步: {synced_count} 篇文章")
-        if error_count > 0:
-            print(f"失败: {error_count} 篇文章")
-        print(f"配置文件: {CONFIG_PATH}")
-        print("\n提示: 刷新 index.html 即可看到所有文章")
-        print("=" * 80)
-        
-    except Exception as e:
-        print(f"\n✗ 保存配置文件失败: {e}")
-
-def main():
-    """主函数"""
+                elif post_number is None:
+                    post_number = next_number
+                    next_number += 1
+                    if update_existing:
+                        index['titles'][post_data['title']] = post_number
+
+                post_data['post_number'] = post_number
+                planned[post_number] = (source, post_data)
+
+            planned = [planned[post_number] for post_number in sorted(planned)]
+            for source, post_data in planned:
+                md_target = f"post{post_data['post_number']}.md"
+                if os.path.abspath(source) != os.path.abspath(md_target):
+                    # 动态模式的页面引用带版本号的 postN.md，所以先复制再渲染，失败时由 revert_import_copies 撤销
+                    for path in (md_target, md_target[:-3] + '.html'):
+                        backup = f".{path}.import.tmp" if os.path.exists(path) else None
+                        if backup:
+                            os.replace(path, backup)
+                        copied.append((path, backup))
+                    shutil.copy2(source, md_target)
+
+            assets = write_post_assets(blog_config) if planned else None
+            tasks = [(post_data, True, blog_config, assets, template_version) for _, post_data in planned]
+            results = map_posts(render_post_worker, tasks, jobs)
+
+            manifest = load_build_manifest()
+            new_configs = []
+            for (source, _), (post_number, post_config, build_record, metadata) in zip(planned, results):
+                entry = {"source": source, "id": post_number, "link": post_config['link'], "title": post_config['title']}
+                config_entry = posts.find(post_number, post_config['link'])
+                if config_entry is None:
+                    new_configs.append(post_config)
+                    summary['added'].append(entry)
+                else:
+                    posts.replace(config_entry, post_config)
+                    summary['updated'].append(entry)
+                manifest['posts'][str(post_number)] = build_record
+                index_post(index, post_number, metadata)
+
+            if new_configs:
+                # 新文章放在配置顶部，编号大的在前
+                new_configs.sort(key=lambda x: x.get('id', 0), reverse=True)
+                posts.replace_all(new_configs + posts.posts)
+            if results:
+                save_build_manifest(manifest)
+                save_post_index(index)
+    except BaseException:
+        revert_import_copies(copied)
+        raise
+    for _, backup in copied:
+        if backup:
+            os.remove(backup)
+
+    if results:
+        with file_lock(CONFIG_PATH):
+            update_post_indexes(jobs)
+
+    summary['elapsed_ms'] = round((time.perf_counter() - started) * 1000, 1)
+    if as_json:
+        print(json.dumps(summary, ensure_ascii=False, indent=2))
+    else:
+        print(f"导入完成: 新增 {len(summary['added'])} 篇, 更新 {len(summary['updated'])} 篇, "
+              f"跳过 {len(summary['skipped'])} 个, 失败 {len(summary['errors'])} 个 ({summary['elapsed_ms']:.1f} ms)")
+        for entry in summary['added']:
+            print(f"  + {entry['source']} → {entry['link']}")
+        for entry in summary['updated']:
+            print(f"  ~ {entry['source']} → {entry['link']}")
+        for entry in summary['skipped']:
+            print(f"  - {entry['source']}: {entry['reason']}")
+        for entry in summary['errors']:
+            print(f"  ✗ {entry['source']}: {entry['error']}")
+    return summary
+
+def main():
+    """主函数"""
     try:
         print("=" * 80)
         print("博客文章管理工具 - 动态加载版")
@@ -2124,10 +5467,11 @@ def main():
                 print("没有找到文章文件")
                 return
             
-            print("\n现有文章列表:")
-            for i, f in enumerate(post_files, 1):
+            print("\n现有文章列表:")
+            index = load_fresh_post_index()
+            for i, f in enumerate(post_files, 1):
                 try:
-                    data = parse_existing_post(f)
+                    data = get_indexed_post(index, extract_post_number(f))
                     title = data.get('title', '未知标题') if data else '未知标题'
                     mode_text = '🔄动态模式'
                     print(f"  {i}. {f} - {title} [{mode_text}]")
@@ -2179,29 +5523,23 @@ def main():
             print("错误: 未指定 Markdown 文件")
             return
         
-        print(f"\n正在读取: {md_file_path}...")
-        post_data = parse_markdown_file(md_file_path)
-        if not post_data:
-            return
-        
-        print(f"标题: {post_data['title']}")
-        print(f"分类: {post_data['category']}")
-        print(f"日期: {post_data['date']}")
-        print(f"模式: 动态解析模式")
-        
-        # 检查是否要编辑现有文章
-        post_files = get_all_post_files()
-        existing_post = None
-        
-        for post_file in post_files:
-            try:
-                existing_data = parse_existing_post(post_file)
-                if existing_data and existing_data.get('title') == post_data['title']:
-                    existing_post = post_file
-                    break
-            except Exception:
-                continue
+        print(f"\n正在读取: {md_file_path}...")
+        blog_config = load_blog_config()
+        post_data = parse_markdown_file(md_file_path, blog_config)
+        if not post_data:
+            return
+        
+        print(f"标题: {post_data['title']}")
+        print(f"分类: {post_data['category']}")
+        print(f"日期: {post_data['date']}")
+        render_mode = get_render_mode(blog_config)
+        print(f"模式: {'构建时渲染' if render_mode == 'static' else '动态解析模式'}")
         
+        # 检查是否要编辑现有文章（通过元数据索引按标题查找）
+        index = load_fresh_post_index()
+        existing_number = find_post_by_title(index, post_data['title'])
+        existing_post = f"post{existing_number}.html" if existing_number is not None else None
+        
         is_new_post = True
         post_filename = None
         
@@ -2231,19 +5569,23 @@ def main():
             shutil.copy2(md_file_path, md_target)
             print(f"✓ 已复制Markdown文件: {md_target}")
         
-        html_content = create_post_html(post_data, post_filename)
-        
-        # 保存文章文件
-        with open(post_filename, 'w', encoding='utf-8') as f:
-            f.write(html_content)
-        print(f"✓ 文章已保存: {post_filename}")
-        
-        # 更新 posts-config.json
+        # 生成并保存文章文件
+        write_post_html(post_data, post_filename, blog_config)
+        print(f"✓ 文章已保存: {post_filename}")
+        index_post(index, post_data['post_number'], post_data)
+        save_post_index(index)
+        
+        # 更新 posts-config.json
         print("\n正在更新 posts-config.json...")
-        if update_posts_config(post_data, post_filename, is_new_post=is_new_post):
-            action_text = "更新" if not is_new_post else "添加"
-            print(f"\n✓ 文章已成功{action_text}到配置文件")
-        else:
+        if update_posts_config(post_data, post_filename, is_new_post=is_new_post):
+            action_text = "更新" if not is_new_post else "添加"
+            print(f"\n✓ 文章已成功{action_text}到配置文件")
+            manifest = load_build_manifest()
+            record_post_build(manifest, post_data['post_number'], build_post_config(post_data, post_filename))
+            save_build_manifest(manifest)
+            with file_lock(CONFIG_PATH):
+                update_post_indexes()
+        else:
             print("\n✗ 更新 posts-config.json 失败")
         
         print("\n" + "=" * 80)
@@ -2261,28 +5603,88 @@ def main():
         print(f"  • 阅读时间: {post_data['reading_time']} 分钟")
         print(f"  • 编号: #{post_data['post_number']}")
         
-        print(f"\n动态加载说明:")
-        print(f"  ✓ 文章内容从 Markdown 文件动态加载")
-        print(f"  ✓ 修改文章只需编辑 {md_target}")
-        print(f"  ✓ 页面会自动重新加载更新后的内容")
-        print(f"  ✓ index.html 会自动从 posts-config.json 读取文章列表")
-        print(f"  ✓ 支持代码高亮、复制功能、响应式设计")
-        
-        print(f"\n下一步:")
-        print(f"  1. 在浏览器中打开 index.html 查看博客首页")
-        print(f"  2. 点击文章卡片查看 {post_filename}")
-        print(f"  3. 编辑 {md_target} 修改文章内容")
-        print(f"  4. 刷新页面即可看到更新")
+        if render_mode == 'static':
+            print(f"\n构建时渲染说明:")
+            print(f"  ✓ 文章正文已渲染进 {post_filename}，页面无需再请求 Markdown")
+            print(f"  ✓ 修改 {md_target} 后运行 python create_post.py build 重新生成")
+        else:
+            print(f"\n动态加载说明:")
+            print(f"  ✓ 文章内容从 Markdown 文件动态加载")
+            print(f"  ✓ 修改文章只需编辑 {md_target}")
+            print(f"  ✓ 页面会自动重新加载更新后的内容")
+        print(f"  ✓ index.html 会自动从 posts-config.json 读取文章列表")
+        print(f"  ✓ 支持代码高亮、复制功能、响应式设计")
+        
+        print(f"\n下一步:")
+        print(f"  1. 在浏览器中打开 index.html 查看博客首页")
+        print(f"  2. 点击文章卡片查看 {post_filename}")
+        print(f"  3. 编辑 {md_target} 修改文章内容")
+        if render_mode == 'static':
+            print(f"  4. 运行 python create_post.py build 后刷新页面")
+        else:
+            print(f"  4. 刷新页面即可看到更新")
         
         print("=" * 80)
         
-    except KeyboardInterrupt:
-        print("\n\n操作已取消")
-    except Exception as e:
+    except KeyboardInterrupt:
+        print("\n\n操作已取消")
+    except PostsConfigError as e:
+        print(f"\n错误: {e}")
+    except Exception as e:
         print(f"\n错误: {e}")
         import traceback
         traceback.print_exc()
 
+CLI_COMMANDS = ('build', 'watch', 'import')
+
+def run_cli(argv):
+    """非交互命令入口，供脚本和 CI 调用"""
+    parser = argparse.ArgumentParser(prog='create_post.py', description='博客文章管理工具（非交互模式）')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    build_parser = subparsers.add_parser('build', help='增量构建，只重新生成有变化的文章')
+    build_parser.add_argument('--force', action='store_true', help='忽略构建缓存，重新生成全部文章')
+    build_parser.add_argument('--jobs', type=int, default=None, help='并行进程数（默认: CPU 核心数）')
+    build_parser.add_argument('--profile', nargs='?', const=PROFILE_REPORT_PATH, metavar='PATH',
+                              help=f'串行构建并统计各阶段和各篇文章的耗时与读写量（报告默认: {PROFILE_REPORT_PATH}）')
+
+    watch_parser = subparsers.add_parser('watch', help='监视 Markdown 源文件，保存后立即重新生成对应文章')
+    watch_parser.add_argument('--interval', type=float, default=WATCH_INTERVAL,
+                              help=f'检查间隔秒数（默认: {WATCH_INTERVAL:g}）')
+    watch_parser.add_argument('--jobs', type=int, default=None, help='启动时补充构建使用的并行进程数')
+
+    import_parser = subparsers.add_parser('import', help='批量导入目录或通配符匹配的 Markdown 文件')
+    import_parser.add_argument('sources', nargs='+', help='Markdown 文件、目录（递归查找 *.md）或通配符')
+    import_parser.add_argument('--no-update', action='store_true', help='同名文章也作为新文章导入，不覆盖现有文章')
+    import_parser.add_argument('--json', action='store_true', help='以 JSON 格式输出变更摘要')
+    import_parser.add_argument('--jobs', type=int, default=None, help='并行进程数（默认: CPU 核心数）')
+    import_parser.add_argument('--profile', nargs='?', const=PROFILE_REPORT_PATH, metavar='PATH',
+                               help=f'串行导入并统计各阶段和各篇文章的耗时与读写量（报告默认: {PROFILE_REPORT_PATH}）')
+
+    args = parser.parse_args(argv)
+    profile_path = getattr(args, 'profile', None)
+    try:
+        with profiling(profile_path) if profile_path else nullcontext():
+            if args.command == 'build':
+                build_posts(force=args.force, jobs=args.jobs)
+            elif args.command == 'watch':
+                watch_posts(interval=args.interval, jobs=args.jobs)
+            elif args.command == 'import':
+                summary = import_posts(args.sources, update_existing=not args.no_update, jobs=args.jobs, as_json=args.json)
+                return 1 if summary['errors'] else 0
+    except PostsConfigError as e:
+        print(f"错误: {e}", file=sys.stderr)
+        return 1
+    return 0
+
 if __name__ == '__main__':
     configure_stdio()
-    main()
+    if len(sys.argv) > 1 and sys.argv[1] in CLI_COMMANDS:
+        sys.exit(run_cli(sys.argv[1:]))
+    # 交互模式的性能分析：python create_post.py --profile[=PATH] [文章.md]
+    if len(sys.argv) > 1 and (sys.argv[1] == '--profile' or sys.argv[1].startswith('--profile=')):
+        profile_path = sys.argv.pop(1).partition('=')[2] or PROFILE_REPORT_PATH
+        with profiling(profile_path):
+            main()
+    else:
+        main()
@@ -7,44 +7,478 @@
 
 import http.server
 import socketserver
+import email.utils
+import argparse
+import hashlib
+import queue
+import socket
+import threading
 import os
+from collections import OrderedDict
+import re
 import sys
 
 # 设置端口号
 PORT = 8000
+# 工作线程数：每个保持连接的客户端占用一个线程，空闲超过 KEEP_ALIVE_TIMEOUT 秒后断开
+WORKERS = 64
+# 等待工作线程的连接数上限；队列满时暂停接受新连接，新连接在系统监听队列中等待
+QUEUE_SIZE = 256
+KEEP_ALIVE_TIMEOUT = 5
+# 内存文件缓存：总大小上限（MB），以及单个文件的大小上限，更大的文件用 sendfile 直接从磁盘发送
+FILE_CACHE_SIZE_MB = 64
+FILE_CACHE_MAX_FILE_SIZE = 1024 * 1024
+# 不缓存内容的大文件只缓存 ETag，按条目数限制
+ETAG_CACHE_SIZE = 4096
 
-# 切换到脚本所在目录
-os.chdir(os.path.dirname(os.path.abspath(__file__)))
+# create_post.py 生成的带内容哈希的资源，内容变化时文件名也会变化
+FINGERPRINTED_ASSET_PATTERN = re.compile(r'^/assets/[\w-]+\.[0-9a-f]{10}\.\w+$')
+# 带内容版本号的地址（如 post1.md?v=<哈希>），内容变化时版本号也会变化
+VERSIONED_QUERY_PATTERN = re.compile(r'(?:^|&)v=[0-9a-f]{10}(?:&|$)')
+# create_post.py 为这些文本文件预先写出的压缩文件，按客户端偏好的先后顺序排列
+PRECOMPRESSED_ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+PRECOMPRESS_EXTENSIONS = ('.html', '.md', '.css', '.js', '.json', '.svg', '.txt', '.xml')
+# 缓存策略：带指纹或版本号的资源永久缓存，图片等媒体文件缓存一小时，其余（页面、配置）每次向服务器验证
+CACHE_IMMUTABLE = 'public, max-age=31536000, immutable'
+CACHE_MEDIA = 'public, max-age=3600'
+CACHE_REVALIDATE = 'no-cache'
+# Range 请求：单个字节范围（如 0-499、500-、-500），以及一个请求最多返回的范围数，超出时按完整文件响应
+RANGE_SPEC_PATTERN = re.compile(r'^\s*(\d*)\s*-\s*(\d*)\s*$')
+MAX_RANGES = 32
+MEDIA_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.gif', '.webp', '.avif', '.ico', '.woff', '.woff2', '.ttf', '.mp3', '.mp4', '.webm')
 
 # 创建服务器
 Handler = http.server.SimpleHTTPRequestHandler
 
+def parse_accept_encoding(header):
+    """解析 Accept-Encoding，返回 {编码: q 值}"""
+    accepted = {}
+    for item in (header or '').split(','):
+        name, _, params = item.strip().partition(';')
+        if not name:
+            continue
+        quality = 1.0
+        for param in params.split(';'):
+            key, _, value = param.strip().partition('=')
+            if key == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        accepted[name.strip().lower()] = quality
+    return accepted
+
+def find_precompressed(path, accept_encoding):
+    """按 Accept-Encoding 选择可用的预压缩文件，返回 (编码, 文件路径)，没有合适的返回 None
+
+    压缩文件的修改时间与源文件一致才使用（create_post.py 写出时会设置），源文件改动后未重新生成的压缩文件不会被发送。
+    """
+    accepted = parse_accept_encoding(accept_encoding)
+    try:
+        source_mtime = os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+    candidates = []
+    for order, (encoding, suffix) in enumerate(PRECOMPRESSED_ENCODINGS):
+        quality = accepted.get(encoding, accepted.get('*', 0.0))
+        if quality > 0:
+            candidates.append((-quality, order, encoding, path + suffix))
+    for _, _, encoding, compressed_path in sorted(candidates):
+        try:
+            if os.stat(compressed_path).st_mtime_ns == source_mtime:
+                return encoding, compressed_path
+        except OSError:
+            continue
+    return None
+
+def get_cache_control(request_path):
+    """按请求地址返回 Cache-Control 头的值"""
+    path, _, query = request_path.partition('?')
+    if FINGERPRINTED_ASSET_PATTERN.match(path) or VERSIONED_QUERY_PATTERN.search(query):
+        return CACHE_IMMUTABLE
+    if path.lower().endswith(MEDIA_EXTENSIONS):
+        return CACHE_MEDIA
+    return CACHE_REVALIDATE
+
+def format_etag(digest, mtime_ns):
+    """由内容哈希和修改时间生成强 ETag"""
+    return f'"{digest.hexdigest()[:16]}-{mtime_ns:x}"'
+
+def parse_range(header, length):
+    """解析 Range 头，返回排序并合并重叠部分后的 [(起点, 终点)]，终点包含在内
+
+    格式不合法、不是字节范围或范围过多时返回 None，按完整文件响应；所有范围都超出文件长度时返回空列表。
+    """
+    unit, _, specs = header.partition('=')
+    if unit.strip().lower() != 'bytes' or not specs.strip():
+        return None
+    ranges = []
+    for spec in specs.split(','):
+        if not spec.strip():
+            continue
+        match = RANGE_SPEC_PATTERN.match(spec)
+        if not match or not (match.group(1) or match.group(2)):
+            return None
+        first, last = match.groups()
+        if first:
+            start = int(first)
+            end = int(last) if last else length - 1
+            if last and end < start:
+                return None
+        elif int(last) > 0:
+            # -N 表示最后 N 个字节
+            start, end = max(0, length - int(last)), length - 1
+        else:
+            continue
+        if start < length:
+            ranges.append((start, min(end, length - 1)))
+
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    if len(merged) > MAX_RANGES:
+        return None
+    return merged
+
+class FileCache:
+    """按总字节数限制的 LRU 文件内容缓存，另外为不缓存内容的大文件保存按条目数限制的 ETag
+
+    命中时只需一次 stat 核对大小和修改时间，不再打开、读取文件；文件变化后下次访问自动重新读取。
+    """
+
+    def __init__(self, max_bytes, max_file_size=FILE_CACHE_MAX_FILE_SIZE, max_etags=ETAG_CACHE_SIZE):
+        self.max_bytes = max_bytes
+        self.max_file_size = min(max_file_size, max_bytes)
+        self.entries = OrderedDict()
+        self.size = 0
+        # 大文件路径 -> ((大小, 修改时间), ETag)
+        self.etags = OrderedDict()
+        self.max_etags = max_etags
+        self.lock = threading.Lock()
+
+    def get(self, path, stat):
+        """返回 (内容, ETag, 修改时间)，文件太大不缓存时返回 None"""
+        if stat.st_size > self.max_file_size:
+            return None
+        key = (stat.st_size, stat.st_mtime_ns)
+        with self.lock:
+            entry = self.entries.get(path)
+            if entry is not None and entry[0] == key:
+                self.entries.move_to_end(path)
+                return entry[1]
+
+        with open(path, 'rb') as f:
+            data = f.read()
+            stat = os.fstat(f.fileno())
+        value = (data, format_etag(hashlib.sha256(data), stat.st_mtime_ns), stat.st_mtime)
+        with self.lock:
+            old = self.entries.pop(path, None)
+            if old is not None:
+                self.size -= len(old[1][0])
+            if len(data) <= self.max_file_size:
+                self.entries[path] = ((stat.st_size, stat.st_mtime_ns), value)
+                self.size += len(data)
+                # 超出总大小时淘汰最久未访问的文件
+                while self.size > self.max_bytes:
+                    _, (_, evicted) = self.entries.popitem(last=False)
+                    self.size -= len(evicted[0])
+        return value
+
+    def get_etag(self, f, path, stat):
+        """返回已打开文件的强 ETag：内容哈希加修改时间
+
+        同一文件只在大小或修改时间变化后才重新读取计算；预压缩文件按自身内容计算，
+        因此同一地址的 br、gzip 和未压缩响应各有不同的 ETag。
+        """
+        key = (stat.st_size, stat.st_mtime_ns)
+        with self.lock:
+            entry = self.etags.get(path)
+            if entry is not None and entry[0] == key:
+                self.etags.move_to_end(path)
+                return entry[1]
+
+        digest = hashlib.sha256()
+        for chunk in iter(lambda: f.read(64 * 1024), b''):
+            digest.update(chunk)
+        f.seek(0)
+        etag = format_etag(digest, stat.st_mtime_ns)
+        with self.lock:
+            self.etags[path] = (key, etag)
+            self.etags.move_to_end(path)
+            # 超出条目数时淘汰最久未访问的文件
+            while len(self.etags) > self.max_etags:
+                self.etags.popitem(last=False)
+        return etag
+
+def open_file(path):
+    """准备要发送的文件，返回 (内容, 长度, 修改时间, ETag)
+
+    小文件从 FILE_CACHE 取得 bytes；大文件返回已打开的文件对象，由调用方关闭。
+    """
+    cached = FILE_CACHE.get(path, os.stat(path))
+    if cached is not None:
+        data, etag, mtime = cached
+        return data, len(data), mtime, etag
+    f = open(path, 'rb')
+    try:
+        stat = os.fstat(f.fileno())
+        return f, stat.st_size, stat.st_mtime, FILE_CACHE.get_etag(f, path, stat)
+    except BaseException:
+        f.close()
+        raise
+
+def close_body(body):
+    """关闭 send_head 返回的文件对象，缓存中的 bytes 无需关闭"""
+    if body is not None and not isinstance(body, bytes):
+        body.close()
+
+class ThreadPoolHTTPServer(socketserver.TCPServer):
+    """固定数量工作线程的 HTTP 服务器：主线程只负责接受连接，连接放入有界队列后由工作线程处理
+
+    慢客户端只占用一个工作线程，不会阻塞其他请求；队列满时主线程暂停接受连接，而不是无限创建线程。
+    """
+    allow_reuse_address = True
+
+    def __init__(self, server_address, handler_class, workers=WORKERS, queue_size=QUEUE_SIZE):
+        if ':' in server_address[0]:
+            self.address_family = socket.AF_INET6
+        # 监听队列长度与等待队列一致
+        self.request_queue_size = queue_size
+        self.pending = queue.Queue(maxsize=queue_size)
+        super().__init__(server_address, handler_class)
+        for _ in range(workers):
+            threading.Thread(target=self.process_pending, daemon=True).start()
+
+    def process_request(self, request, client_address):
+        # 队列满时阻塞在这里，形成背压
+        self.pending.put((request, client_address))
+
+    def process_pending(self):
+        while True:
+            request, client_address = self.pending.get()
+            try:
+                self.finish_request(request, client_address)
+            except Exception:
+                self.handle_error(request, client_address)
+            finally:
+                self.shutdown_request(request)
+
 class MyHTTPRequestHandler(Handler):
+    # HTTP/1.1 默认保持连接，一次页面加载的多个请求复用同一个连接
+    protocol_version = 'HTTP/1.1'
+    timeout = KEEP_ALIVE_TIMEOUT
+    # 响应头和正文分两次写出，关闭 Nagle 算法避免保持连接时第二次写入等待确认
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        body = self.send_head()
+        if body is None:
+            return
+        try:
+            self.send_body(body)
+        finally:
+            close_body(body)
+
+    def do_HEAD(self):
+        close_body(self.send_head())
+
+    def send_body(self, body):
+        """发送响应正文：缓存的小文件直接写出，文件对象用 sendfile 由内核从文件复制到套接字
+
+        Range 请求只发送 send_head 记录的各个范围，多个范围时在每段前写出 multipart 分隔行。
+        """
+        parts = getattr(self, 'range_parts', None)
+        if parts is None:
+            if isinstance(body, bytes):
+                self.wfile.write(body)
+            else:
+                # 不支持 sendfile 的平台（如 Windows）或目录列表这类内存文件会自动改为分块读写
+                self.connection.sendfile(body)
+            return
+        for prefix, start, end in parts:
+            if prefix:
+                self.wfile.write(prefix)
+            if isinstance(body, bytes):
+                self.wfile.write(memoryview(body)[start:end + 1])
+            else:
+                self.connection.sendfile(body, start, end - start + 1)
+        if self.range_trailer:
+            self.wfile.write(self.range_trailer)
+
+    def send_head(self):
+        # 文本文件有预压缩版本时按 Accept-Encoding 直接发送压缩文件，不占用每次请求的 CPU
+        self.vary_encoding = False
+        self.cache_control = None
+        self.range_parts = None
+        self.range_trailer = b''
+        path = self.translate_path(self.path)
+        if os.path.isdir(path) and self.path.partition('?')[0].endswith('/'):
+            path = os.path.join(path, 'index.html')
+        if not os.path.isfile(path):
+            # 目录跳转、目录列表和 404 仍由 SimpleHTTPRequestHandler 处理
+            return super().send_head()
+
+        encoding, file_path = None, path
+        if path.lower().endswith(PRECOMPRESS_EXTENSIONS):
+            # 同一地址的响应内容随 Accept-Encoding 变化，缓存需要分别保存
+            self.vary_encoding = True
+            precompressed = find_precompressed(path, self.headers.get('Accept-Encoding'))
+            if precompressed is not None:
+                encoding, file_path = precompressed
+        try:
+            body, length, mtime, etag = open_file(file_path)
+        except OSError:
+            return super().send_head()
+        try:
+            # 预压缩文件的修改时间与源文件一致，可以直接用作 Last-Modified
+            self.cache_control = get_cache_control(self.path)
+            if self.is_not_modified(etag, mtime):
+                self.send_response(304)
+                self.send_header('ETag', etag)
+                self.send_header('Last-Modified', self.date_time_string(mtime))
+                self.end_headers()
+                close_body(body)
+                return None
+
+            ranges = None
+            if 'Range' in self.headers and self.range_applies(etag, mtime):
+                ranges = parse_range(self.headers['Range'], length)
+            if ranges == []:
+                # 所有范围都超出文件长度
+                close_body(body)
+                self.cache_control = None
+                self.send_response(416)
+                self.send_header('Content-Range', f'bytes */{length}')
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return None
+
+            content_type = self.guess_type(path)
+            if ranges is None:
+                self.send_response(200)
+                self.send_header('Content-type', content_type)
+                content_length = length
+            elif len(ranges) == 1:
+                start, end = ranges[0]
+                self.range_parts = [(b'', start, end)]
+                self.send_response(206)
+                self.send_header('Content-type', content_type)
+                self.send_header('Content-Range', f'bytes {start}-{end}/{length}')
+                content_length = end - start + 1
+            else:
+                # 多个范围按 multipart/byteranges 返回，每段带自己的 Content-Range
+                boundary = os.urandom(12).hex()
+                self.range_parts = [
+                    (f'\r\n--{boundary}\r\nContent-Type: {content_type}\r\n'
+                     f'Content-Range: bytes {start}-{end}/{length}\r\n\r\n'.encode('latin-1'), start, end)
+                    for start, end in ranges
+                ]
+                self.range_trailer = f'\r\n--{boundary}--\r\n'.encode('latin-1')
+                self.send_response(206)
+                self.send_header('Content-type', f'multipart/byteranges; boundary={boundary}')
+                content_length = len(self.range_trailer) + sum(
+                    len(prefix) + end - start + 1 for prefix, start, end in self.range_parts)
+            if encoding:
+                self.send_header('Content-Encoding', encoding)
+            self.send_header('Content-Length', str(content_length))
+            self.send_header('Accept-Ranges', 'bytes')
+            self.send_header('Last-Modified', self.date_time_string(mtime))
+            self.send_header('ETag', etag)
+            self.end_headers()
+            return body
+        except BaseException:
+            close_body(body)
+            raise
+
+    def range_applies(self, etag, mtime):
+        """按 If-Range 判断 Range 是否有效：客户端保存的版本已经变化时应返回完整文件"""
+        if_range = self.headers.get('If-Range')
+        if if_range is None:
+            return True
+        if_range = if_range.strip()
+        if if_range.startswith(('"', 'W/')):
+            # If-Range 使用强比较，弱 ETag 永远不匹配
+            return if_range == etag
+        try:
+            date = email.utils.parsedate_to_datetime(if_range)
+        except (TypeError, IndexError, OverflowError, ValueError):
+            return False
+        return date.tzinfo is not None and int(mtime) == int(date.timestamp())
+
+    def is_not_modified(self, etag, mtime):
+        """判断客户端缓存是否仍然有效：有 If-None-Match 时只比较 ETag，否则按 If-Modified-Since 比较时间"""
+        if_none_match = self.headers.get('If-None-Match')
+        if if_none_match is not None:
+            # GET/HEAD 使用弱比较，W/ 前缀不影响匹配
+            tags = [tag.strip() for tag in if_none_match.split(',')]
+            tags = [tag[2:] if tag.startswith('W/') else tag for tag in tags]
+            return '*' in tags or etag in tags
+        if 'If-Modified-Since' not in self.headers:
+            return False
+        try:
+            since = email.utils.parsedate_to_datetime(self.headers['If-Modified-Since'])
+        except (TypeError, IndexError, OverflowError, ValueError):
+            return False
+        if since.tzinfo is None:
+            return False
+        return int(mtime) <= since.timestamp()
+
     def end_headers(self):
+        if getattr(self, 'vary_encoding', False):
+            self.send_header('Vary', 'Accept-Encoding')
+            self.vary_encoding = False
+        # 只有文件响应（200/304）带缓存策略，错误页面和目录列表不会被缓存
+        if getattr(self, 'cache_control', None):
+            self.send_header('Cache-Control', self.cache_control)
+            self.cache_control = None
         # 添加 CORS 头，允许跨域请求
         self.send_header('Access-Control-Allow-Origin', '*')
         self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
         self.send_header('Access-Control-Allow-Headers', 'Content-Type')
         super().end_headers()
 
-try:
-    with socketserver.TCPServer(("", PORT), MyHTTPRequestHandler) as httpd:
-        print("=" * 60)
-        print(f"服务器已启动！")
-        print(f"访问地址: http://localhost:{PORT}")
-        print(f"访问地址: http://127.0.0.1:{PORT}")
-        print("=" * 60)
-        print("按 Ctrl+C 停止服务器")
-        print("=" * 60)
-        httpd.serve_forever()
-except KeyboardInterrupt:
-    print("\n\n服务器已停止")
-    sys.exit(0)
-except OSError as e:
-    if e.errno == 98 or e.errno == 48:  # Address already in use
-        print(f"错误: 端口 {PORT} 已被占用")
-        print(f"请尝试使用其他端口，或关闭占用该端口的程序")
-    else:
-        print(f"错误: {e}")
-    sys.exit(1)
+# 默认大小的文件缓存，从命令行启动时按 --cache 重新创建
+FILE_CACHE = FileCache(FILE_CACHE_SIZE_MB * 1024 * 1024)
+
+if __name__ == '__main__':
+    # 切换到脚本所在目录
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+
+    parser = argparse.ArgumentParser(description='博客本地服务器')
+    parser.add_argument('port', nargs='?', type=int, default=PORT, help=f'端口号（默认: {PORT}）')
+    parser.add_argument('--bind', '-b', default='', metavar='ADDRESS', help='监听地址（默认: 所有地址）')
+    parser.add_argument('--workers', type=int, default=WORKERS, help=f'工作线程数（默认: {WORKERS}）')
+    parser.add_argument('--queue', type=int, default=QUEUE_SIZE, help=f'等待处理的连接数上限（默认: {QUEUE_SIZE}）')
+    parser.add_argument('--cache', type=int, default=FILE_CACHE_SIZE_MB, metavar='MB', help=f'内存文件缓存大小，0 表示不缓存（默认: {FILE_CACHE_SIZE_MB}）')
+    args = parser.parse_args()
+    PORT = args.port
+    FILE_CACHE = FileCache(max(0, args.cache) * 1024 * 1024)
+
+    try:
+        with ThreadPoolHTTPServer((args.bind, PORT), MyHTTPRequestHandler, max(1, args.workers), max(1, args.queue)) as httpd:
+            print("=" * 60)
+            print(f"服务器已启动！")
+            if args.bind:
+                print(f"访问地址: http://{'[' + args.bind + ']' if ':' in args.bind else args.bind}:{PORT}")
+            else:
+                print(f"访问地址: http://localhost:{PORT}")
+                print(f"访问地址: http://127.0.0.1:{PORT}")
+            print(f"工作线程: {max(1, args.workers)}，保持连接 {KEEP_ALIVE_TIMEOUT} 秒，文件缓存 {max(0, args.cache)} MB")
+            print("=" * 60)
+            print("按 Ctrl+C 停止服务器")
+            print("=" * 60)
+            httpd.serve_forever()
+    except KeyboardInterrupt:
+        print("\n\n服务器已停止")
+        sys.exit(0)
+    except OSError as e:
+        if e.errno == 98 or e.errno == 48:  # Address already in use
+            print(f"错误: 端口 {PORT} 已被占用")
+            print(f"请尝试使用其他端口，或关闭占用该端口的程序")
+        else:
+            print(f"错误: {e}")
+        sys.exit(1)
 
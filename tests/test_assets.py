@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+"""
+共享资源旧版本清理的测试
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+import create_post
+
+
+class RemoveStaleAssetsTests(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.addCleanup(os.chdir, os.getcwd())
+        os.chdir(directory.name)
+        os.mkdir(create_post.ASSETS_DIR)
+        for name in ('post.aaaaaaaaaa.css', 'post.bbbbbbbbbb.css', 'post.cccccccccc.css', 'post.cccccccccc.js', 'post.css'):
+            self.write(f'assets/{name}', '')
+
+    def write(self, path, text):
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(text)
+
+    def test_keeps_versions_referenced_by_any_post_page(self):
+        # post7.html 没有 Markdown 源文件，不会重新生成，仍引用旧版本
+        self.write('post7.html', '<link rel="stylesheet" href="assets/post.aaaaaaaaaa.css">')
+        self.write('post8.html', '<link rel="stylesheet" href="assets/post.cccccccccc.css">')
+        create_post.remove_stale_assets(['assets/post.cccccccccc.css'])
+        self.assertEqual(
+            sorted(os.listdir(create_post.ASSETS_DIR)),
+            ['post.aaaaaaaaaa.css', 'post.cccccccccc.css', 'post.cccccccccc.js', 'post.css'],
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+"""
+front matter 读取与 YAML 子集解析的测试
+"""
+
+import io
+import os
+import sys
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+import create_post
+from create_post import parse_front_matter, read_front_matter_lines
+
+
+def read(text):
+    return read_front_matter_lines(io.StringIO(text, newline=''))
+
+
+def parse(text):
+    lines, _ = read(text)
+    return parse_front_matter(lines)
+
+
+class ReadFrontMatterTests(unittest.TestCase):
+    def test_stops_at_closing_marker(self):
+        f = io.StringIO('---\ntitle: a\n---\nbody\n')
+        lines, head = read_front_matter_lines(f)
+        self.assertEqual(lines, ['title: a\n'])
+        self.assertEqual(head, '')
+        self.assertEqual(f.read(), 'body\n')
+
+    def test_without_front_matter(self):
+        self.assertEqual(read('# 标题\n正文'), (None, '# 标题\n'))
+        # 只有一行 --- 且没有换行时不是 front matter
+        self.assertEqual(read('---'), (None, '---'))
+
+    def test_missing_closing_marker_is_body(self):
+        self.assertEqual(read('---\ntitle: a\n正文'), (None, '---\ntitle: a\n正文'))
+
+    def test_crlf_and_bom(self):
+        lines, head = read('\ufeff---\r\ntitle: a\r\n--- \r\nbody')
+        self.assertEqual((lines, head), (['title: a\r\n'], ''))
+        self.assertEqual(parse_front_matter(lines), {'title': 'a'})
+        self.assertEqual(read('\ufeff# 标题\n'), (None, '# 标题\n'))
+
+    def test_empty_front_matter(self):
+        self.assertEqual(read('---\n---\nbody'), ([], ''))
+
+
+class ParseFrontMatterTests(unittest.TestCase):
+    def test_plain_values_keep_hash(self):
+        values = parse('---\ntitle: C# 入门 #1\ndate: 2024-01-01\n# 注释行\nkey_2: v\nempty:\n---\n')
+        self.assertEqual(values, {'title': 'C# 入门 #1', 'date': '2024-01-01', 'key_2': 'v', 'empty': ''})
+
+    def test_quoted_values(self):
+        values = parse('---\na: "x: \\"y\\" \\u4e2d"\nb: \'it\'\'s\'\nc: "a # b"\nd: "q" # 注释\n---\n')
+        self.assertEqual(values, {'a': 'x: "y" 中', 'b': "it's", 'c': 'a # b', 'd': 'q'})
+
+    def test_flow_sequence(self):
+        values = parse('---\ntags: [x, "y, z", \'w\'] # 注释\nempty: []\ncs: [C#, "F#"]\n---\n')
+        self.assertEqual(values, {'tags': ['x', 'y, z', 'w'], 'empty': [], 'cs': ['C#', 'F#']})
+
+    def test_block_sequence(self):
+        values = parse('---\ntags:\n  - a\n  - "b" # 注释\n- c\ntitle: t\n---\n')
+        self.assertEqual(values, {'tags': ['a', 'b', 'c'], 'title': 't'})
+
+    def test_literal_and_folded_block_scalars(self):
+        values = parse('---\na: |\n  one\n   two\n\nb: >\n  one\n  two\n\n  three\nc: |+\n  keep\n\n---\n')
+        self.assertEqual(values, {'a': 'one\n two', 'b': 'one two\nthree', 'c': 'keep\n'})
+
+    def test_continuation_lines_are_folded(self):
+        self.assertEqual(parse('---\nexcerpt: 第一行\n  第二行\n---\n'), {'excerpt': '第一行 第二行'})
+
+    def test_metadata_defaults(self):
+        metadata = create_post.get_front_matter_metadata({'tags': 'a, b,', 'title': ''}, 'dir/笔记.md')
+        self.assertEqual(metadata, {'title': '笔记', 'tags': ['a', 'b']})
+        metadata = create_post.get_front_matter_metadata({'title': 't', 'category': ['x', 'y']}, 'p.md')
+        self.assertEqual(metadata, {'title': 't', 'category': 'x, y'})
+
+
+if __name__ == '__main__':
+    unittest.main()
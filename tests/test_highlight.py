@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+"""
+构建时代码高亮（Prism 风格 token）的测试
+"""
+
+import os
+import sys
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+import create_post
+from create_post import highlight_code
+
+ALL_LANGUAGES = set(create_post.HIGHLIGHT_GRAMMARS)
+
+
+def token(kind, text):
+    return f'<span class="token {kind}">{text}</span>'
+
+
+class HighlightTests(unittest.TestCase):
+    def test_unsupported_language_returns_none(self):
+        self.assertIsNone(highlight_code('fn main() {}', 'rust', ALL_LANGUAGES))
+        # 语法存在但不在 supported_languages 中
+        self.assertIsNone(highlight_code('x = 1', 'python', {'javascript'}))
+
+    def test_aliases(self):
+        for alias, language in (('py', 'python'), ('JS', 'javascript'), ('C#', 'csharp'), ('yml', 'yaml'), ('sh', 'bash')):
+            with self.subTest(alias=alias):
+                self.assertEqual(create_post.normalize_highlight_language(alias), language)
+                self.assertIsNotNone(highlight_code('x', alias, {language}))
+
+    def test_python_comment_and_string(self):
+        html = highlight_code('return "a#b"  # note', 'python', ALL_LANGUAGES)
+        self.assertEqual(
+            html,
+            token('keyword', 'return') + ' ' + token('string', '&quot;a#b&quot;') + '  ' + token('comment', '# note'),
+        )
+
+    def test_python_triple_quoted_string_spans_lines(self):
+        html = highlight_code('s = """a\n# not a comment\n"""', 'python', ALL_LANGUAGES)
+        self.assertIn(token('string', '&quot;&quot;&quot;a\n# not a comment\n&quot;&quot;&quot;'), html)
+        self.assertNotIn('token comment', html)
+
+    def test_output_is_escaped(self):
+        html = highlight_code('a < b && c', 'javascript', ALL_LANGUAGES)
+        self.assertEqual(html, 'a ' + token('operator', '&lt;') + ' b ' + token('operator', '&amp;&amp;') + ' c')
+
+    def test_javascript_template_string_and_hex_number(self):
+        html = highlight_code('let n = `a${b}` + 0x1F;', 'javascript', ALL_LANGUAGES)
+        self.assertIn(token('template-string string', '`a${b}`'), html)
+        self.assertIn(token('number', '0x1F'), html)
+
+    def test_csharp_verbatim_string_and_class_name(self):
+        html = highlight_code('class Foo { string s = @"x\\y"; }', 'csharp', ALL_LANGUAGES)
+        self.assertIn(token('class-name', 'Foo'), html)
+        self.assertIn(token('string', '@&quot;x\\y&quot;'), html)
+
+    def test_yaml_scalars_before_comments_and_in_flow_collections(self):
+        html = highlight_code('flag: true # c\nl: [1, null]', 'yaml', ALL_LANGUAGES)
+        self.assertIn(token('boolean important', 'true') + ' ' + token('comment', '# c'), html)
+        self.assertIn(token('number', '1'), html)
+        self.assertIn(token('null important', 'null'), html)
+
+    def test_renderer_uses_highlighter_and_falls_back(self):
+        highlighter = create_post.get_code_highlighter({'supported_languages': ['python']})
+        html = create_post.render_markdown('```py\nx = 1\n```\n\n```rust\nlet x = 1;\n```', highlighter)
+        self.assertIn('<pre><code class="language-py">x ' + token('operator', '=') + ' ' + token('number', '1') + '\n</code></pre>', html)
+        self.assertIn('<pre><code class="language-rust">let x = 1;\n</code></pre>', html)
+
+    def test_line_numbers_only_when_highlighting(self):
+        highlighter = create_post.get_code_highlighter({'supported_languages': ['python']})
+        html = create_post.render_article_html('```python\na\nb\n```', highlighter)
+        self.assertIn('<span aria-hidden="true" class="line-numbers-rows"><span></span><span></span></span>', html)
+        self.assertNotIn('line-numbers-rows', create_post.render_article_html('```python\na\nb\n```'))
+
+
+if __name__ == '__main__':
+    unittest.main()
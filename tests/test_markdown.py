@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+"""
+构建时 Markdown 渲染器（static 模式）的测试
+"""
+
+import os
+import sys
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+import create_post
+from create_post import render_markdown
+
+
+def read_post(name):
+    with open(os.path.join(ROOT, name), 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+class LinkTargetTests(unittest.TestCase):
+    def test_image_url_with_parentheses(self):
+        html = render_markdown('![image_(1).png](https://i.postimg.cc/7h8KWvxy/image_(1).png)')
+        self.assertEqual(
+            html,
+            '<p><img src="https://i.postimg.cc/7h8KWvxy/image_(1).png" alt="image_(1).png" loading="lazy"></p>\n',
+        )
+
+    def test_linked_image_with_parentheses(self):
+        html = render_markdown('[![image_(1).png](https://i.postimg.cc/7h8KWvxy/image_(1).png)](https://postimg.cc/tZkdsMZr)')
+        self.assertEqual(
+            html,
+            '<p><a href="https://postimg.cc/tZkdsMZr">'
+            '<img src="https://i.postimg.cc/7h8KWvxy/image_(1).png" alt="image_(1).png" loading="lazy"></a></p>\n',
+        )
+
+    def test_link_with_nested_parentheses_and_title(self):
+        html = render_markdown('[x](https://en.wikipedia.org/wiki/Foo_(bar)) [y](a(b)c(d)) [z](u (t))')
+        self.assertEqual(
+            html,
+            '<p><a href="https://en.wikipedia.org/wiki/Foo_(bar)">x</a> '
+            '<a href="a(b)c(d)">y</a> <a href="u" title="t">z</a></p>\n',
+        )
+
+    def test_image_alt_is_plain_text(self):
+        html = render_markdown('![a **b** `c` [d](e) x<y](p.png "t")')
+        self.assertEqual(html, '<p><img src="p.png" alt="a b c d x&lt;y" title="t" loading="lazy"></p>\n')
+
+    def test_image_source_pattern_keeps_parentheses(self):
+        sources = create_post.MD_IMAGE_SOURCE_PATTERN.findall('![a](img/x_(1).png) ![b](<y.png>)')
+        self.assertEqual(sources, ['img/x_(1).png', 'y.png'])
+
+    def test_posts_with_parenthesized_image_urls(self):
+        cases = (
+            ('post10.md', 'https://i.postimg.cc/xTbwZqsZ/20250614142013_rec_(1).gif'),
+            ('post11.md', 'https://i.postimg.cc/rw9RSyLs/480X480_(1).png'),
+            ('post17.md', 'https://i.postimg.cc/7h8KWvxy/image_(1).png'),
+        )
+        for name, url in cases:
+            with self.subTest(post=name):
+                html = render_markdown(read_post(name))
+                self.assertIn(f'<img src="{url}"', html)
+                # 链接被截断时，剩下的 ".png)" 会作为文字出现在图片后面
+                self.assertNotRegex(html, r'loading="lazy">[^<\s]*\)')
+
+
+class RawHtmlTests(unittest.TestCase):
+    """原始 HTML 按 marked 原样保留，再按 DOMPurify 的默认白名单过滤"""
+
+    def test_comments_are_removed(self):
+        self.assertEqual(render_markdown('<!-- hidden -->\n\ntext'), '\n<p>text</p>\n')
+        self.assertEqual(render_markdown('a <!-- c --> b'), '<p>a  b</p>\n')
+
+    def test_details_block_keeps_markdown_after_blank_line(self):
+        html = render_markdown('<details>\n<summary>More</summary>\n\nBody **x**\n\n</details>')
+        self.assertEqual(html, '<details>\n<summary>More</summary>\n<p>Body <strong>x</strong></p>\n</details>\n')
+
+    def test_block_html_drops_event_handlers(self):
+        html = render_markdown('<div align="center">\n<img src="a.png" width="300" onerror="alert(1)">\n</div>')
+        self.assertEqual(html, '<div align="center">\n<img src="a.png" width="300">\n</div>\n')
+
+    def test_inline_tags_and_attributes(self):
+        html = render_markdown('Press <kbd>Ctrl</kbd> and <span style="color:red" class="x">red</span>')
+        self.assertEqual(html, '<p>Press <kbd>Ctrl</kbd> and <span style="color:red" class="x">red</span></p>\n')
+
+    def test_script_and_iframe_are_removed_with_content(self):
+        self.assertEqual(render_markdown('<script>alert(1)</script>\n\nafter'), '\n<p>after</p>\n')
+        self.assertEqual(render_markdown('<iframe src="x"></iframe>ok'), 'ok\n')
+
+    def test_unsafe_urls_are_removed(self):
+        html = render_markdown('<a href="javascript:alert(1)">x</a> <a href="https://e.com?a=1&b=2">y</a>')
+        self.assertEqual(html, '<p><a>x</a> <a href="https://e.com?a=1&amp;b=2">y</a></p>\n')
+        html = render_markdown('<img src="data:image/png;base64,AAA"> <a href="data:text/html,x">d</a>')
+        self.assertEqual(html, '<p><img src="data:image/png;base64,AAA"> <a>d</a></p>\n')
+
+    def test_unknown_tags_are_dropped_and_text_kept(self):
+        # 与浏览器中一致：正文里的 GetData<T> 被当作未知标签去掉
+        self.assertEqual(render_markdown('GetData<T> 方法'), '<p>GetData 方法</p>\n')
+
+    def test_unbalanced_tags(self):
+        self.assertEqual(render_markdown('x <b>unclosed'), '<p>x <b>unclosed</b></p>\n')
+        self.assertEqual(render_markdown('stray </div> end'), '<p>stray  end</p>\n')
+
+    def test_text_without_tags_is_escaped(self):
+        self.assertEqual(render_markdown('a < b and c > d'), '<p>a &lt; b and c &gt; d</p>\n')
+        self.assertEqual(render_markdown('`<div>`'), '<p><code>&lt;div&gt;</code></p>\n')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,30 @@
+# -*- coding: utf-8 -*-
+"""
+预压缩文件范围的测试：只压缩和清理生成工具负责的站点文件
+"""
+
+import os
+import sys
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from create_post import is_precompress_source
+
+
+class PrecompressSourceTests(unittest.TestCase):
+    def test_site_files(self):
+        for path in ('post12.html', './post3.md', 'posts-config.json', 'posts-manifest.json', 'search-index.json',
+                     'index.html', 'art-theme.css', 'favicon.svg', 'assets/post.0123456789.js', 'assets/search-0.abc.json'):
+            with self.subTest(path=path):
+                self.assertTrue(is_precompress_source(path))
+
+    def test_other_files(self):
+        for path in ('README.md', 'PRODUCT.md', 'blog_config.json', 'zznew1.md', '随笔.md', 'lang.en.json',
+                     'post1.html.bak', '.post-index.json', 'assets/.image-x.tmp', 'assets/photo.png', 'drafts/post1.md'):
+            with self.subTest(path=path):
+                self.assertFalse(is_precompress_source(path))
+
+
+if __name__ == '__main__':
+    unittest.main()
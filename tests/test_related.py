@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+"""
+相关文章列表文件（assets/related-N.json）的测试
+"""
+
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+import create_post
+
+
+class RelatedFilesTests(unittest.TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.addCleanup(os.chdir, os.getcwd())
+        os.chdir(directory.name)
+
+    def write_posts(self, posts):
+        with open(create_post.CONFIG_PATH, 'w', encoding='utf-8') as f:
+            json.dump({"posts": posts}, f, ensure_ascii=False)
+        return create_post.PostsRepository(warn=False)
+
+    def read_related(self, post_number):
+        with open(create_post.get_related_file_path(post_number), 'r', encoding='utf-8') as f:
+            return json.load(f)['posts']
+
+    def test_writes_titles_of_related_posts(self):
+        create_post.write_related_files(self.write_posts([
+            {"id": 1, "link": "post1.html", "title": "A", "category": "[笔记]", "date": "2025-01-01", "related": [2, 9]},
+            {"id": 2, "link": "post2.html", "title": "", "date": "2025-01-02", "excerpt": "x" * 500},
+        ]))
+        self.assertEqual(self.read_related(1), [{"link": "post2.html", "title": "无标题", "category": "", "date": "2025-01-02"}])
+        self.assertEqual(self.read_related(2), [])
+
+    def test_unchanged_files_are_kept_and_removed_posts_cleaned_up(self):
+        posts = [{"id": 1, "link": "post1.html", "title": "A", "related": [2]}, {"id": 2, "link": "post2.html", "title": "B"}]
+        create_post.write_related_files(self.write_posts(posts))
+        path = create_post.get_related_file_path(1)
+        os.utime(path, ns=(0, 0))
+
+        create_post.write_related_files(self.write_posts(posts))
+        self.assertEqual(os.stat(path).st_mtime_ns, 0)
+
+        posts[1]['title'] = 'B2'
+        create_post.write_related_files(self.write_posts(posts))
+        self.assertEqual(self.read_related(1)[0]['title'], 'B2')
+
+        create_post.write_related_files(self.write_posts(posts[:1]))
+        self.assertFalse(os.path.exists(create_post.get_related_file_path(2)))
+        self.assertEqual(self.read_related(1), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
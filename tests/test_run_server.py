@@ -0,0 +1,98 @@
+# -*- coding: utf-8 -*-
+"""
+本地服务器中 Range 解析、缓存策略和文件缓存的测试
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+import run_server
+from run_server import parse_range
+
+
+class ParseRangeTests(unittest.TestCase):
+    def test_single_ranges(self):
+        self.assertEqual(parse_range('bytes=0-9', 100), [(0, 9)])
+        self.assertEqual(parse_range('bytes=5-', 100), [(5, 99)])
+        self.assertEqual(parse_range('bytes=-3', 100), [(97, 99)])
+        self.assertEqual(parse_range('Bytes = 1 - 2 ,', 100), [(1, 2)])
+
+    def test_ranges_are_clamped_to_length(self):
+        self.assertEqual(parse_range('bytes=0-99999', 100), [(0, 99)])
+        self.assertEqual(parse_range('bytes=-200', 100), [(0, 99)])
+
+    def test_multiple_ranges_are_sorted_and_merged(self):
+        self.assertEqual(parse_range('bytes=5-9,0-0,3-6', 100), [(0, 0), (3, 9)])
+        # 相邻的范围同样合并
+        self.assertEqual(parse_range('bytes=0-1,2-3', 100), [(0, 3)])
+
+    def test_unsatisfiable_ranges_return_empty_list(self):
+        self.assertEqual(parse_range('bytes=100-', 100), [])
+        self.assertEqual(parse_range('bytes=200-300', 100), [])
+        self.assertEqual(parse_range('bytes=-0', 100), [])
+        # 只要有一个范围可以满足就忽略其他范围
+        self.assertEqual(parse_range('bytes=100-,0-1', 100), [(0, 1)])
+
+    def test_malformed_header_is_ignored(self):
+        for header in ('items=0-1', 'bytes=', 'bytes=-', 'bytes=a-b', 'bytes=9-2', 'bytes=0-1;2-3'):
+            with self.subTest(header=header):
+                self.assertIsNone(parse_range(header, 100))
+
+    def test_too_many_ranges_are_ignored(self):
+        spread = ','.join(f'{i * 2}-{i * 2}' for i in range(run_server.MAX_RANGES + 1))
+        self.assertIsNone(parse_range('bytes=' + spread, 1000))
+        # 合并后不超过上限时照常处理
+        overlapping = ','.join(f'{i}-{i + 1}' for i in range(run_server.MAX_RANGES + 1))
+        self.assertEqual(parse_range('bytes=' + overlapping, 1000), [(0, run_server.MAX_RANGES + 1)])
+
+
+class CacheControlTests(unittest.TestCase):
+    def test_policies(self):
+        self.assertEqual(run_server.get_cache_control('/assets/post.0123456789.css'), run_server.CACHE_IMMUTABLE)
+        self.assertEqual(run_server.get_cache_control('/post1.md?v=0123456789'), run_server.CACHE_IMMUTABLE)
+        self.assertEqual(run_server.get_cache_control('/assets/photo.PNG'), run_server.CACHE_MEDIA)
+        self.assertEqual(run_server.get_cache_control('/index.html'), run_server.CACHE_REVALIDATE)
+        self.assertEqual(run_server.get_cache_control('/post1.md?v=old'), run_server.CACHE_REVALIDATE)
+
+
+class FileCacheTests(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def write(self, name, data):
+        path = os.path.join(self.directory.name, name)
+        with open(path, 'wb') as f:
+            f.write(data)
+        return path
+
+    def test_evicts_least_recently_used(self):
+        cache = run_server.FileCache(10)
+        a, b, c = (self.write(name, b'x' * 4) for name in 'abc')
+        for path in (a, b, a, c):
+            cache.get(path, os.stat(path))
+        self.assertEqual(list(cache.entries), [a, c])
+        self.assertEqual(cache.size, 8)
+
+    def test_large_files_are_not_cached(self):
+        cache = run_server.FileCache(10, max_file_size=4)
+        path = self.write('big', b'x' * 5)
+        self.assertIsNone(cache.get(path, os.stat(path)))
+
+    def test_etags_are_bounded(self):
+        cache = run_server.FileCache(0, max_etags=2)
+        paths = [self.write(name, name.encode()) for name in 'abc']
+        etags = []
+        for path in paths:
+            with open(path, 'rb') as f:
+                etags.append(cache.get_etag(f, path, os.fstat(f.fileno())))
+        self.assertEqual(list(cache.etags), paths[1:])
+        self.assertEqual(len(set(etags)), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+"""
+全文检索索引切词与编码的测试（index.html 的 getSearchTerms 按同样的规则切分查询）
+"""
+
+import os
+import sys
+import unittest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+import create_post
+from create_post import iter_search_terms, tokenize_search_text
+
+
+class TokenizeTests(unittest.TestCase):
+    def test_cjk_bigrams(self):
+        self.assertEqual(list(iter_search_terms('资源卸载')), ['资源', '源卸', '卸载'])
+        self.assertEqual(list(iter_search_terms('中')), ['中'])
+
+    def test_latin_words_and_numbers_are_lowercased(self):
+        self.assertEqual(list(iter_search_terms('Unity3D 的 GetData<T>() v2.0')), ['unity3d', '的', 'getdata', 't', 'v2', '0'])
+
+    def test_punctuation_splits_runs(self):
+        self.assertEqual(list(iter_search_terms('你好，世界！')), ['你好', '世界'])
+
+    def test_index_terms_include_trailing_unigrams(self):
+        # 单字查询按前缀比对：“中”要能找到“国中”
+        self.assertEqual(tokenize_search_text('国中 资源卸载 a'), {'国中', '中', '资源', '源卸', '卸载', '载', 'a'})
+
+    def test_related_terms_have_no_unigrams(self):
+        self.assertNotIn('中', list(iter_search_terms('国中')))
+
+    def test_every_character_is_found_by_prefix(self):
+        terms = tokenize_search_text('检索索引')
+        for char in '检索索引':
+            with self.subTest(char=char):
+                self.assertTrue(any(term.startswith(char) for term in terms))
+
+
+class EncodingTests(unittest.TestCase):
+    def test_id_ranges(self):
+        self.assertEqual(create_post.get_id_ranges([]), [])
+        self.assertEqual(create_post.get_id_ranges([1, 2, 4, 5, 6, 9]), [[1, 2], [4, 6], [9, 9]])
+
+    def test_postings_are_delta_encoded_with_metadata_sign(self):
+        self.assertEqual(create_post.encode_postings([1, -3, 4, -10]), [1, -2, 1, -6])
+
+    def test_shard_number(self):
+        # 英文按前两个字符、汉字按首字分片，同一前缀的检索词落在同一分片
+        self.assertEqual(create_post.get_search_shard_number('python', 7), create_post.get_search_shard_number('pyqt', 7))
+        self.assertEqual(create_post.get_search_shard_number('资源', 7), create_post.get_search_shard_number('资', 7))
+        self.assertEqual(create_post.get_search_shard_number('ab', 1), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()